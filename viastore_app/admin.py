@@ -1,16 +1,178 @@
-from django.contrib import admin
-from .models import Warehouse, Item, Order
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from . import barcodes, jobs, stock
+from .forms import ItemActionForm, ItemBarcodeForm
+from .pagination import EstimatedCountPaginator
+from .search import variants_q
+from .models import Warehouse, Item, ItemBarcode, StockLevel, Order, OrderArchive, Job, StockMovement, ReorderRule, ReorderSuggestion, StockSnapshot
 
 @admin.register(Warehouse)
 class WarehouseAdmin(admin.ModelAdmin):
 	list_display = ("name", "location")
 
+class StockLevelInline(admin.TabularInline):
+	# Nur Anzeige: Bestände ändern sich ausschließlich über Buchungen im Bestandsbuch
+	model = StockLevel
+	fields = ("warehouse", "bin", "quantity")
+	readonly_fields = fields
+	extra = 0
+	can_delete = False
+
+	def has_add_permission(self, request, obj=None):
+		return False
+
+class ItemBarcodeInline(admin.TabularInline):
+	model = ItemBarcode
+	form = ItemBarcodeForm
+	fields = ("code", "pack_size", "description")
+	extra = 0
+
+class ScalableAdminMixin:
+	# Große Tabellen: geschätzte bzw. gedeckelte Anzahl statt COUNT(*) über alles,
+	# Präfixsuche über B-Tree-Indizes statt LIKE '%…%'
+	paginator = EstimatedCountPaginator
+	show_full_result_count = False
+	prefix_search_fields = ()
+
+	def get_search_results(self, request, queryset, search_term):
+		term = search_term.strip()
+		if not term:
+			return queryset, False
+		condition = Q()
+		for field in self.prefix_search_fields:
+			condition |= variants_q(field, term)
+		return queryset.filter(condition), False
+
 @admin.register(Item)
-class ItemAdmin(admin.ModelAdmin):
+class ItemAdmin(ScalableAdminMixin, admin.ModelAdmin):
 	list_display = ("name", "sku", "quantity", "warehouse")
+	list_select_related = ("warehouse",)
+	list_filter = ("warehouse",)
+	# Index (warehouse, name) deckt Lagerfilter und Sortierung ab
+	ordering = ("name", "pk")
 	search_fields = ("name", "sku")
+	prefix_search_fields = ("sku", "name")
+	# Summe der Lagerplätze, per Trigger gepflegt
+	readonly_fields = ("quantity",)
+	inlines = [StockLevelInline, ItemBarcodeInline]
+	action_form = ItemActionForm
+	actions = ["move_to_warehouse", "adjust_stock"]
+
+	def save_model(self, request, obj, form, change):
+		# Nur Stammdaten schreiben: quantity gehört dem Trigger, Lagerwechsel wie im Artikelformular
+		if change:
+			stock.save_item_master(obj)
+		else:
+			obj.quantity = 0
+			obj.save()
+
+	def _selected_ids(self, queryset):
+		return queryset.order_by().values_list("pk", flat=True)
+
+	def _action_value(self, request, name):
+		# Nur das Zusatzfeld prüfen; die Aktionsauswahl hat außerhalb der Changelist keine Choices
+		try:
+			return ItemActionForm().fields[name].clean(request.POST.get(name))
+		except ValidationError:
+			return None
+
+	@admin.action(description="Ausgewählte Artikel samt Bestand ins Ziellager verschieben")
+	def move_to_warehouse(self, request, queryset):
+		warehouse = self._action_value(request, "warehouse")
+		if warehouse is None:
+			self.message_user(request, "Bitte ein Ziellager wählen.", messages.WARNING)
+			return
+		moved = stock.move_items(self._selected_ids(queryset), warehouse, user=request.user, note="Admin: Lagerwechsel")
+		self.message_user(request, f"{moved} Artikel nach {warehouse} verschoben.", messages.SUCCESS)
+
+	@admin.action(description="Bestand der ausgewählten Artikel um ± ändern")
+	def adjust_stock(self, request, queryset):
+		delta = self._action_value(request, "delta")
+		if not delta:
+			self.message_user(request, "Bitte eine Bestandsänderung ungleich 0 angeben.", messages.WARNING)
+			return
+		adjusted = stock.adjust_items(self._selected_ids(queryset), delta, user=request.user, note=f"Admin: Bestand {delta:+d}")
+		self.message_user(request, f"Bestand von {adjusted} Lagerplätzen um {delta:+d} geändert.", messages.SUCCESS)
+
+@admin.register(ItemBarcode)
+class ItemBarcodeAdmin(admin.ModelAdmin):
+	form = ItemBarcodeForm
+	list_display = ("code", "item", "pack_size", "description", "created_at")
+	search_fields = ("code",)
+	list_select_related = ("item",)
+	raw_id_fields = ("item",)
+
+	def get_search_results(self, request, queryset, search_term):
+		# Codes sind normalisiert gespeichert: exakte Suche über die Unique-Indizes statt LIKE '%…%'
+		if not search_term.strip():
+			return queryset, False
+		return queryset.filter(Q(code=barcodes.normalize(search_term)) | Q(item__sku__in=barcodes.sku_variants(search_term))), False
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(ScalableAdminMixin, admin.ModelAdmin):
 	list_display = ("order_number", "item", "quantity", "order_date")
+	list_select_related = ("item",)
+	# Datumsfilter als halboffene Bereiche über den Index (order_date, id), kein date_hierarchy
+	list_filter = (("order_date", admin.DateFieldListFilter), "item__warehouse")
+	ordering = ("-order_date", "-id")
+	search_fields = ("order_number",)
+	prefix_search_fields = ("order_number",)
+	raw_id_fields = ("item",)
+
+@admin.register(OrderArchive)
+class OrderArchiveAdmin(ScalableAdminMixin, admin.ModelAdmin):
+	list_display = ("order_number", "item", "quantity", "order_date", "archived_at")
+	list_select_related = ("item",)
+	list_filter = (("order_date", admin.DateFieldListFilter),)
+	ordering = ("-order_date", "-id")
 	search_fields = ("order_number",)
+	prefix_search_fields = ("order_number",)
+	raw_id_fields = ("item",)
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+	list_display = ("id", "kind", "status", "progress_done", "progress_total", "created_at", "finished_at")
+	list_filter = ("status", "kind")
+	actions = ["retry_jobs"]
+
+	@admin.action(description="Fehlgeschlagene Jobs erneut einreihen")
+	def retry_jobs(self, request, queryset):
+		count = jobs.retry(queryset.values_list("pk", flat=True))
+		self.message_user(request, f"{count} Jobs erneut eingereiht.")
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+	list_display = ("created_at", "item", "warehouse", "bin", "kind", "quantity", "user", "note")
+	list_filter = ("kind",)
+	list_select_related = ("item", "warehouse", "user")
+	paginator = EstimatedCountPaginator
+	show_full_result_count = False
+	raw_id_fields = ("item", "order")
+
+@admin.register(ReorderRule)
+class ReorderRuleAdmin(admin.ModelAdmin):
+	list_display = ("item", "warehouse", "reorder_point", "max_quantity")
+	list_editable = ("reorder_point", "max_quantity")
+	list_filter = ("warehouse",)
+	search_fields = ("item__sku",)
+	list_select_related = ("item", "warehouse")
+	raw_id_fields = ("item",)
+
+@admin.register(ReorderSuggestion)
+class ReorderSuggestionAdmin(admin.ModelAdmin):
+	# Vorschläge entstehen nur über replenishment.scan()
+	list_display = ("item", "warehouse", "on_hand", "quantity", "status", "order", "created_at", "closed_at")
+	list_filter = ("status",)
+	list_select_related = ("item", "warehouse", "order")
+	readonly_fields = ("rule", "item", "warehouse", "on_hand", "quantity", "order", "created_at", "updated_at", "closed_at")
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+	# Abzüge entstehen nur über snapshot_stock; Zeilen stehen in der Bestandshistorie
+	list_display = ("day", "taken_at", "row_count")
+	date_hierarchy = "day"
+	readonly_fields = ("day", "taken_at", "row_count")
+
+	def has_add_permission(self, request):
+		return False
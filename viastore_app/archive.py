@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Order, OrderArchive, ReorderSuggestion, StockMovement
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def archive_orders(older_than_days, batch_size=DEFAULT_BATCH_SIZE, dry_run=False, progress=None):
+    """Verschiebt Bestellungen vor dem Stichtag batchweise nach OrderArchive.
+
+    Jeder Batch ist eine eigene Transaktion, damit die Bestelltabelle nie lange
+    gesperrt ist. Dashboard-Zähler bleiben unverändert: archivierte Bestellungen
+    zählen weiter mit.
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    old_orders = Order.objects.filter(order_date__lt=cutoff)
+    if dry_run:
+        return old_orders.count()
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                old_orders.order_by("order_date", "id").values("id", "order_number", "item_id", "quantity", "order_date")[:batch_size]
+            )
+            if not rows:
+                break
+            ids = [row["id"] for row in rows]
+            OrderArchive.objects.bulk_create(OrderArchive(**row) for row in rows)
+            # Bestandsbuch behält die Bestellnummer als Notiz, der FK wird leer (SET_NULL)
+            number = Subquery(Order.objects.filter(pk=OuterRef("order_id")).values("order_number")[:1])
+            StockMovement.objects.filter(order_id__in=ids, note="").update(note=number)
+            StockMovement.objects.filter(order_id__in=ids).update(order=None)
+            # Bestätigte Nachschubvorschläge: die Bestellnummer folgt aus der Vorschlags-ID
+            ReorderSuggestion.objects.filter(order_id__in=ids).update(order=None)
+            # Direktes DELETE ohne Collector/Signale: sonst pro Bestellung Zählerupdates
+            Order.objects.filter(pk__in=ids)._raw_delete(Order.objects.db)
+        moved += len(rows)
+        if progress:
+            progress(moved)
+    return moved
@@ -0,0 +1,442 @@
+import asyncio
+import atexit
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from dataclasses import dataclass
+from datetime import timedelta
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import metrics
+from .models import ArticleNameCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROVIDERS = [
+    "viastore_app.article_lookup.OpenFoodFactsJsonProvider",
+    "viastore_app.article_lookup.OpenFoodFactsHtmlProvider",
+    "viastore_app.article_lookup.AutodocProvider",
+    "viastore_app.article_lookup.GoogleAutodocProvider",
+    # Headless-Chrome ist zu langsam für die Standardkette:
+    # "viastore_app.article_lookup.AutodocSeleniumProvider",
+]
+USER_AGENT = "Mozilla/5.0"
+
+
+def parse_html(text):
+    # bs4 erst beim ersten HTML-Provider laden, nicht beim Start jedes Workers
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(text, "html.parser")
+
+
+class Provider(ABC):
+    name = "provider"
+
+    @abstractmethod
+    def lookup(self, sku, session, timeout):
+        """Bezeichnung zur SKU oder None (blockierend, mit requests-Session)."""
+
+    async def alookup(self, sku, session, timeout):
+        # Standard: ``lookup()`` im Thread-Pool der Lookup-Loop, mit dem gemeinsamen Connection-Pool
+        return await asyncio.to_thread(self.lookup, sku, session, timeout)
+
+
+class HttpProvider(Provider):
+    """Ein GET je SKU; ``parse()`` wertet die requests-Antwort aus."""
+
+    @abstractmethod
+    def url(self, sku):
+        """Abfrage-URL für die SKU."""
+
+    @abstractmethod
+    def parse(self, resp):
+        """Bezeichnung aus der Antwort oder None."""
+
+    def lookup(self, sku, session, timeout):
+        return self.parse(session.get(self.url(sku), timeout=timeout))
+
+
+class OpenFoodFactsJsonProvider(HttpProvider):
+    name = "openfoodfacts"
+    base_url = "https://world.openfoodfacts.org"
+
+    def url(self, sku):
+        return f"{self.base_url}/api/v0/product/{quote(sku, safe='')}.json"
+
+    def parse(self, resp):
+        if resp.ok:
+            product = resp.json().get("product") or {}
+            return product.get("product_name") or None
+        return None
+
+
+class OpenFoodFactsHtmlProvider(HttpProvider):
+    name = "openfoodfacts-html"
+    base_url = "https://world.openfoodfacts.org"
+
+    def url(self, sku):
+        return f"{self.base_url}/product/{quote(sku, safe='')}"
+
+    def parse(self, resp):
+        if resp.ok:
+            h2 = parse_html(resp.text).find("h2", class_="title-1")
+            if h2 and h2.text.strip():
+                return h2.text.strip()
+        return None
+
+
+class AutodocProvider(HttpProvider):
+    name = "autodoc"
+    base_url = "https://www.autodoc.de"
+
+    def url(self, sku):
+        return f"{self.base_url}/search?keyword={quote(sku, safe='')}"
+
+    def parse(self, resp):
+        if resp.ok:
+            soup = parse_html(resp.text)
+            for li in soup.find_all("li", class_="product-description__item"):
+                title = li.find("span", class_="product-description__item-title")
+                value = li.find("span", class_="product-description__item-value")
+                if title and value and "Artikelnummer" in title.text:
+                    return value.text.strip() or None
+        return None
+
+
+class GoogleAutodocProvider(HttpProvider):
+    name = "google"
+    base_url = "https://www.google.com"
+
+    def url(self, sku):
+        return f"{self.base_url}/search?q={quote(sku, safe='')}"
+
+    def parse(self, resp):
+        if resp.ok:
+            # Erster Link zu autodoc.de
+            for a in parse_html(resp.text).find_all("a", href=True):
+                if "autodoc.de" in a["href"] and a.text.strip():
+                    return a.text.strip()
+        return None
+
+
+class AutodocSeleniumProvider(Provider):
+    name = "autodoc-selenium"
+
+    def lookup(self, sku, session, timeout):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.common.by import By
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        driver = webdriver.Chrome(ChromeDriverManager().install(), options=chrome_options)
+        try:
+            driver.set_page_load_timeout(timeout)
+            driver.get(f"https://www.autodoc.de/search?keyword={sku}")
+            for item in driver.find_elements(By.CLASS_NAME, "product-description__item"):
+                try:
+                    title = item.find_element(By.CLASS_NAME, "product-description__item-title")
+                    value = item.find_element(By.CLASS_NAME, "product-description__item-value")
+                except Exception:
+                    continue
+                if "Artikelnummer" in title.text and value.text.strip():
+                    return value.text.strip()
+            # Fallback: Produktname bzw. Linktext des ersten Suchergebnisses
+            for class_name in ("product-description__name", "product-link"):
+                try:
+                    text = driver.find_element(By.CLASS_NAME, class_name).text.strip()
+                except Exception:
+                    continue
+                if text:
+                    return text
+            return None
+        finally:
+            driver.quit()
+
+
+class LookupCache:
+    """Persistenter Cache mit positiven und negativen Einträgen, TTL und LRU-Verdrängung."""
+
+    def __init__(self, max_entries=50000, positive_ttl=timedelta(days=30), negative_ttl=timedelta(days=1), evict_every=500):
+        self.max_entries = max_entries
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        # last_used_at nur grob nachführen, damit Treffer keine Schreiblast erzeugen
+        self.touch_interval = timedelta(minutes=10)
+        # Aufräumen nur alle ``evict_every`` Schreibvorgänge, nicht bei jedem Lookup
+        self.evict_every = evict_every
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+    def get(self, sku):
+        now = timezone.now()
+        entry = ArticleNameCache.objects.filter(sku=sku, expires_at__gt=now).first()
+        if entry and entry.last_used_at < now - self.touch_interval:
+            ArticleNameCache.objects.filter(pk=entry.pk).update(last_used_at=now)
+        return entry
+
+    def set(self, sku, name, provider=""):
+        now = timezone.now()
+        ttl = self.positive_ttl if name else self.negative_ttl
+        values = {"name": name or "", "provider": provider, "expires_at": now + ttl, "last_used_at": now}
+        try:
+            ArticleNameCache.objects.update_or_create(sku=sku, defaults=values)
+        except IntegrityError:
+            # Paralleler Lookup derselben SKU hat den Eintrag schon angelegt
+            ArticleNameCache.objects.filter(sku=sku).update(**values)
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes >= self.evict_every
+            if due:
+                self._writes = 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Abgelaufene Einträge löschen und auf ``max_entries`` kappen – zwei DELETEs über
+        die Indizes auf expires_at bzw. last_used_at, ohne COUNT(*) über die Tabelle."""
+        ArticleNameCache.objects.filter(expires_at__lte=timezone.now()).delete()
+        # Zeitstempel des ersten Eintrags jenseits der Obergrenze (Index rückwärts)
+        cutoff = list(
+            ArticleNameCache.objects.order_by("-last_used_at").values_list("last_used_at", flat=True)[self.max_entries:self.max_entries + 1]
+        )
+        if cutoff:
+            ArticleNameCache.objects.filter(last_used_at__lte=cutoff[0]).delete()
+
+
+@dataclass
+class LookupResult:
+    name: str
+    provider: str = ""
+    cached: bool = False
+
+    @property
+    def found(self):
+        return bool(self.name)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    # Ein gemeinsamer Connection-Pool für alle Lookups
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            session.hooks["response"].append(metrics.record_http_response)
+            _session = session
+        return _session
+
+
+_lookup_loop = None
+_lookup_loop_lock = threading.Lock()
+# Gleichzeitige Provider-Aufrufe in der Lookup-Loop (blockierende requests-Aufrufe)
+LOOKUP_THREADS = 32
+
+
+def get_lookup_loop():
+    """Langlebige Event-Loop (Daemon-Thread), in der alle async Lookups des Prozesses laufen.
+
+    Unter WSGI bekommt jede async View eine frische Loop (async_to_sync); Single-Flight
+    hätte dort nichts zu teilen. In dieser Loop teilen sich alle Requests – unter WSGI
+    wie unter ASGI – laufende Lookups; die Provider blockieren nur die Threads ihres
+    Pools, die HTTP-Verbindungen kommen aus der gemeinsamen requests-Session.
+    """
+    global _lookup_loop
+    with _lookup_loop_lock:
+        if _lookup_loop is None:
+            loop = asyncio.new_event_loop()
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=LOOKUP_THREADS, thread_name_prefix="article-lookup-io"))
+            threading.Thread(target=loop.run_forever, name="article-lookup-loop", daemon=True).start()
+            atexit.register(_shutdown_lookup_loop, loop)
+            _lookup_loop = loop
+        return _lookup_loop
+
+
+def _shutdown_lookup_loop(loop):
+    # Beim Prozessende die Loop anhalten und die Pool-Verbindungen schließen
+    loop.call_soon_threadsafe(loop.stop)
+    if _session is not None:
+        _session.close()
+
+
+_PENDING = object()
+
+
+class ArticleNameResolver:
+    """Fragt alle Provider parallel ab; der erste Provider der Kette mit Ergebnis gewinnt."""
+
+    def __init__(self, providers, cache=None, deadline=3.0, executor=None, session=None):
+        self.providers = list(providers)
+        self.cache = cache
+        self.deadline = deadline
+        self.executor = executor or ThreadPoolExecutor(max_workers=16, thread_name_prefix="article-lookup")
+        self.session = session
+        # SKU -> laufender Lookup in der Lookup-Loop, für aresolve()
+        self._inflight = {}
+
+    def _query(self, provider, sku, session, timeout):
+        try:
+            return provider.lookup(sku, session, timeout)
+        except Exception:
+            logger.info("Artikel-Lookup %s für %s fehlgeschlagen", provider.name, sku, exc_info=True)
+            return None
+
+    def resolve(self, sku):
+        sku = str(sku).strip()
+        if self.cache:
+            entry = self.cache.get(sku)
+            if entry:
+                return LookupResult(entry.name, entry.provider, cached=True)
+        session = self.session or get_session()
+        deadline_at = time.monotonic() + self.deadline
+        futures = {
+            self.executor.submit(self._query, provider, sku, session, self.deadline): index
+            for index, provider in enumerate(self.providers)
+        }
+        results = [_PENDING] * len(self.providers)
+        with metrics.outbound_http():
+            try:
+                for future in as_completed(futures, timeout=max(deadline_at - time.monotonic(), 0)):
+                    results[futures[future]] = future.result()
+                    if self._settled(results):
+                        break
+            except FuturesTimeout:
+                pass
+        winner = self._best(results)
+        if winner is None:
+            result = LookupResult("")
+        else:
+            result = LookupResult(results[winner], self.providers[winner].name)
+        # Fehlschläge nur negativ cachen, wenn alle Provider geantwortet haben (kein Timeout)
+        if self.cache and (winner is not None or self._settled(results)):
+            self.cache.set(sku, result.name, result.provider)
+        return result
+
+    async def aresolve(self, sku):
+        """Wie ``resolve()``, aber ohne wartenden Request-Thread. Gleichzeitige Anfragen derselben
+        SKU teilen sich einen Lookup (Single-Flight): 20 Tablets, ein externer Aufruf."""
+        sku = str(sku).strip()
+        if self.cache:
+            entry = await sync_to_async(self.cache.get)(sku)
+            if entry:
+                return LookupResult(entry.name, entry.provider, cached=True)
+        future = asyncio.run_coroutine_threadsafe(self._shared(sku), get_lookup_loop())
+        return await asyncio.wrap_future(future)
+
+    async def _shared(self, sku):
+        # Läuft in der Lookup-Loop; nur dort wird _inflight gelesen und geschrieben
+        task = self._inflight.get(sku)
+        if task is None:
+            task = self._inflight[sku] = asyncio.ensure_future(self._aresolve(sku))
+            task.add_done_callback(lambda _: self._inflight.pop(sku, None))
+        # shield: bricht ein Tablet die Anfrage ab, läuft der Lookup für die anderen weiter
+        return await asyncio.shield(task)
+
+    async def _aquery(self, provider, sku, session, timeout):
+        try:
+            return await provider.alookup(sku, session, timeout)
+        except Exception:
+            logger.info("Artikel-Lookup %s für %s fehlgeschlagen", provider.name, sku, exc_info=True)
+            return None
+
+    async def _aresolve(self, sku):
+        session = self.session or get_session()
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + self.deadline
+        tasks = {
+            asyncio.ensure_future(self._aquery(provider, sku, session, self.deadline)): index
+            for index, provider in enumerate(self.providers)
+        }
+        results = [_PENDING] * len(self.providers)
+        pending = set(tasks)
+        with metrics.outbound_http():
+            try:
+                while pending and not self._settled(results):
+                    done, pending = await asyncio.wait(
+                        pending, timeout=max(deadline_at - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not done:
+                        break
+                    for task in done:
+                        results[tasks[task]] = task.result()
+            finally:
+                for task in pending:
+                    task.cancel()
+        winner = self._best(results)
+        if winner is None:
+            result = LookupResult("")
+        else:
+            result = LookupResult(results[winner], self.providers[winner].name)
+        if self.cache and (winner is not None or self._settled(results)):
+            # Einmal je Lookup, auch wenn mehrere Anfragen darauf warten
+            await asyncio.to_thread(self._store, sku, result)
+        return result
+
+    def _store(self, sku, result):
+        # Hilfsthread der Lookup-Loop: außerhalb eines Requests, Verbindung selbst schließen
+        try:
+            self.cache.set(sku, result.name, result.provider)
+        finally:
+            connections.close_all()
+
+    @staticmethod
+    def _settled(results):
+        # Entschieden, sobald alle höher priorisierten Provider geantwortet haben
+        for value in results:
+            if value is _PENDING:
+                return False
+            if value:
+                return True
+        return True
+
+    @staticmethod
+    def _best(results):
+        for index, value in enumerate(results):
+            if value is not _PENDING and value:
+                return index
+        return None
+
+
+_resolver = None
+
+
+def get_resolver():
+    global _resolver
+    if _resolver is None:
+        providers = [import_string(path)() for path in getattr(settings, "VIASTORE_LOOKUP_PROVIDERS", DEFAULT_PROVIDERS)]
+        _resolver = ArticleNameResolver(
+            providers,
+            cache=LookupCache(max_entries=getattr(settings, "VIASTORE_LOOKUP_CACHE_SIZE", 50000)),
+            deadline=getattr(settings, "VIASTORE_LOOKUP_DEADLINE", 3.0),
+        )
+    return _resolver
+
+
+def resolve_article_name(sku):
+    return get_resolver().resolve(sku)
+
+
+async def aresolve_article_name(sku):
+    return await get_resolver().aresolve(sku)
@@ -0,0 +1,180 @@
+"""
+Statische Dateien ohne CDN: Hash-Namen, vorkomprimierte Varianten und lange Cache-Zeiten.
+
+``CompressedManifestStaticFilesStorage`` legt bei ``collectstatic`` neben jeder
+gehashten Textdatei eine gzip-Variante (``.gz``) und – wenn das Paket
+``brotli`` installiert ist – eine Brotli-Variante (``.br``) ab.
+``StaticFilesMiddleware`` liefert STATIC_ROOT direkt aus (z.B. unter uvicorn
+ohne vorgeschalteten Webserver): passende Variante nach Accept-Encoding,
+gehashte Namen mit ``Cache-Control: immutable`` für ein Jahr.
+"""
+
+import gzip
+import mimetypes
+import os
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # optional: ohne brotli nur gzip
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".json", ".map", ".svg", ".ttf", ".txt", ".md"}
+# Kleine Dateien lohnen den Header-Overhead nicht
+MIN_COMPRESS_SIZE = 512
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Ungehashte Namen (z.B. Service-Worker-Imports) nur kurz cachen
+DEFAULT_MAX_AGE = 60
+# Reihenfolge = Vorrang, wenn der Browser beides akzeptiert
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+def compress_file(path):
+    """Schreibt .gz/.br neben ``path``, sofern die Variante kleiner ist; liefert die geschriebenen Endungen."""
+    with open(path, "rb") as handle:
+        data = handle.read()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return []
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data)
+    written = []
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(data) * 0.95:
+            with open(path + suffix, "wb") as handle:
+                handle.write(compressed)
+            written.append(suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # Ohne Manifest (Entwicklung, Tests ohne collectstatic) ungehashte Namen statt Fehler
+    manifest_strict = False
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if os.path.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS:
+                compress_file(self.path(name))
+
+
+def _accepted_encodings(request):
+    header = request.headers.get("Accept-Encoding", "")
+    return {part.split(";")[0].strip() for part in header.split(",") if "q=0" not in part.replace(" ", "")}
+
+
+class StaticFilesMiddleware:
+    """Liefert Dateien aus STATIC_ROOT unter STATIC_URL aus, vor Session, Auth und Messung."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = "/" + settings.STATIC_URL.lstrip("/") if settings.STATIC_URL else None
+        self.root = str(settings.STATIC_ROOT) if getattr(settings, "STATIC_ROOT", None) else None
+        self.immutable = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.serve(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        # Dateien sind klein (< 1 MB) und liegen im Page Cache: direkt lesen statt Thread
+        return self.serve(request) or await self.get_response(request)
+
+    def serve(self, request):
+        if not self.prefix or not self.root or request.method not in ("GET", "HEAD") or not request.path.startswith(self.prefix):
+            return None
+        name = request.path[len(self.prefix):]
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not name or not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        if not was_modified_since(request.headers.get("If-Modified-Since"), stat.st_mtime):
+            return HttpResponseNotModified()
+        content_type, _ = mimetypes.guess_type(path)
+        encoding = None
+        accepted = _accepted_encodings(request)
+        for candidate, suffix in ENCODINGS:
+            if candidate in accepted and os.path.isfile(path + suffix):
+                encoding, path = candidate, path + suffix
+                break
+        with open(path, "rb") as handle:
+            body = b"" if request.method == "HEAD" else handle.read()
+        response = HttpResponse(body, content_type=content_type or "application/octet-stream")
+        response["Content-Length"] = str(os.path.getsize(path))
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        response["Vary"] = "Accept-Encoding"
+        if encoding:
+            response["Content-Encoding"] = encoding
+        if name in self.immutable:
+            response["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            response["Cache-Control"] = f"public, max-age={DEFAULT_MAX_AGE}"
+        return response
+
+
+class _ResourceParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.resources = []
+        self.inline_script_bytes = 0
+        self._inline = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "script" and attrs.get("src"):
+            self.resources.append(("script", attrs["src"]))
+        elif tag == "script":
+            # json_script-Daten sind kein Code
+            self._inline = attrs.get("type", "text/javascript") != "application/json"
+        elif tag == "link" and "stylesheet" in (attrs.get("rel") or "").split() and attrs.get("href"):
+            self.resources.append(("stylesheet", attrs["href"]))
+        elif tag == "img" and attrs.get("src") and not attrs["src"].startswith("data:"):
+            self.resources.append(("image", attrs["src"]))
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self._inline = False
+
+    def handle_data(self, data):
+        if self._inline:
+            self.inline_script_bytes += len(data.encode())
+
+
+def is_external(url):
+    parts = urlsplit(url)
+    return bool(parts.scheme or parts.netloc)
+
+
+def page_resources(html):
+    """Skripte, Stylesheets und Bilder einer Seite: ``(resources, inline_script_bytes)``,
+    ``resources`` als Liste ``(art, url)``."""
+    parser = _ResourceParser()
+    parser.feed(html)
+    parser.close()
+    return parser.resources, parser.inline_script_bytes
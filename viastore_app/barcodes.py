@@ -0,0 +1,214 @@
+"""
+Barcode -> Artikel: Normalisierung, Alias-Tabelle und prozessinterner LRU-Cache.
+
+Gescannte Codes werden vor jedem Vergleich normalisiert: numerische Codes mit
+gültiger GTIN-Prüfziffer (EAN-8, UPC-A, EAN-13, GTIN-14) werden auf 14 Stellen
+aufgefüllt, andere numerische Codes verlieren führende Nullen, alphanumerische
+werden großgeschrieben. So finden "4006381333931", "04006381333931" und eine
+als Zahl gespeicherte Nummer ohne führende Null denselben Artikel.
+
+Aufgelöst wird mit einer Abfrage gegen ItemBarcode.code (Unique-Index) und
+Item.sku (Unique-Index). Treffer liegen in einem LRU-Cache je Prozess; Signale
+und Massenpfade invalidieren ihn lokal, die TTL begrenzt veraltete Einträge in
+anderen Worker-Prozessen. Fehlschläge werden nicht gecacht, damit neu
+angelegte Artikel sofort gefunden werden.
+"""
+
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Item, ItemBarcode
+
+GTIN_LENGTHS = (8, 12, 13, 14)
+# Symbologie-Kennung mancher Scanner (z.B. "]E0" für EAN-13, "]C1" für GS1-128)
+SYMBOLOGY_PREFIX_LENGTH = 3
+
+
+def gtin_check_digit(body):
+    """Prüfziffer nach GS1 (Gewichte 3, 1, 3, … von rechts) für beliebig lange Nummern."""
+    total = sum(int(digit) * (3 if position % 2 == 0 else 1) for position, digit in enumerate(reversed(body)))
+    return str((10 - total % 10) % 10)
+
+
+def is_valid_gtin(code):
+    return code.isdigit() and len(code) <= 14 and gtin_check_digit(code[:-1]) == code[-1]
+
+
+def normalize(code):
+    """Kanonische Form eines gescannten oder eingegebenen Codes ("" wenn leer)."""
+    code = "".join(str(code or "").split()).upper()
+    if code.startswith("]") and len(code) > SYMBOLOGY_PREFIX_LENGTH:
+        code = code[SYMBOLOGY_PREFIX_LENGTH:]
+    if code.startswith("(01)") and len(code) >= 18:
+        # GS1-Application-Identifier 01 = GTIN
+        code = code[4:18]
+    if not code.isdigit():
+        return code
+    stripped = code.lstrip("0") or "0"
+    if len(stripped) <= 14 and is_valid_gtin(stripped.zfill(14)):
+        return stripped.zfill(14)
+    return stripped
+
+
+def sku_variants(code):
+    """Schreibweisen, unter denen ein Code als Item.sku gespeichert sein kann."""
+    raw = "".join(str(code or "").split())
+    key = normalize(raw)
+    variants = {raw, key}
+    if key.isdigit():
+        stripped = key.lstrip("0") or "0"
+        variants.add(stripped)
+        variants.update(stripped.zfill(length) for length in GTIN_LENGTHS if len(stripped) <= length)
+    variants.discard("")
+    return variants
+
+
+@dataclass(frozen=True)
+class Match:
+    item_id: int
+    sku: str
+    name: str
+    pack_size: int = 1
+
+    def quantity(self, scanned):
+        # Gebindecode: ein Scan = pack_size Einzelstücke
+        return scanned * self.pack_size
+
+
+class BarcodeCache:
+    """Thread-sicherer LRU-Cache normalisierter Code -> Match mit TTL."""
+
+    def __init__(self, max_entries=50_000, ttl=60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._by_item = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            match, expires = entry
+            if expires < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return match
+
+    def set(self, key, match):
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (match, time.monotonic() + self.ttl)
+            self._by_item[match.item_id].add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_items(self, item_ids):
+        with self._lock:
+            for item_id in item_ids:
+                for key in list(self._by_item.get(item_id, ())):
+                    self._drop(key)
+
+    def invalidate_codes(self, codes):
+        with self._lock:
+            for code in codes:
+                self._drop(normalize(code))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_item.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._by_item.get(entry[0].item_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_item[entry[0].item_id]
+
+
+cache = BarcodeCache(
+    max_entries=getattr(settings, "VIASTORE_BARCODE_CACHE_SIZE", 50_000),
+    ttl=getattr(settings, "VIASTORE_BARCODE_CACHE_TTL", 60.0),
+)
+
+
+def invalidate_items(item_ids):
+    cache.invalidate_items(item_ids)
+
+
+@lru_cache(maxsize=64)
+def _lookup_sql(key_count, variant_count):
+    # Handgeschriebenes UNION statt ORM: das Übersetzen der Abfrage kostete mehr
+    # als die beiden Index-Suchen selbst
+    quote = connection.ops.quote_name
+    barcode, item = ItemBarcode._meta, Item._meta
+    barcode_table, item_table = quote(barcode.db_table), quote(item.db_table)
+
+    def column(table, meta, field):
+        return f"{table}.{quote(meta.get_field(field).column)}"
+
+    sku, name, item_pk = column(item_table, item, "sku"), column(item_table, item, "name"), f"{item_table}.{quote(item.pk.column)}"
+    return (
+        f"SELECT {column(barcode_table, barcode, 'code')}, {column(barcode_table, barcode, 'item')}, {sku}, {name}, "
+        f"{column(barcode_table, barcode, 'pack_size')}, 1 FROM {barcode_table} "
+        f"INNER JOIN {item_table} ON {item_pk} = {column(barcode_table, barcode, 'item')} "
+        f"WHERE {column(barcode_table, barcode, 'code')} IN ({', '.join(['%s'] * key_count)}) "
+        f"UNION ALL SELECT {sku}, {item_pk}, {sku}, {name}, 1, 0 FROM {item_table} "
+        f"WHERE {sku} IN ({', '.join(['%s'] * variant_count)})"
+    )
+
+
+def _query(keys, variants):
+    # Eine Abfrage, zwei Index-Suchen: Aliase (normalisiert) und Artikelnummern (Schreibweisen)
+    keys, variants = sorted(keys), sorted(variants)
+    with connection.cursor() as cursor:
+        cursor.execute(_lookup_sql(len(keys), len(variants)), keys + variants)
+        rows = cursor.fetchall()
+    found = {}
+    # Direkte Artikelnummer hat Vorrang vor einem gleichlautenden Alias
+    for code, item_id, sku, name, pack_size, source in sorted(rows, key=lambda row: -row[5]):
+        found[normalize(code)] = Match(item_id, sku, name, pack_size)
+    return found
+
+
+def resolve_many(codes):
+    """Codes -> Match (nur gefundene), höchstens eine Abfrage für alle Cache-Fehlschläge."""
+    keys = {code: normalize(code) for code in codes}
+    result = {}
+    missing = {}
+    for code, key in keys.items():
+        match = cache.get(key) if key else None
+        if match is not None:
+            result[code] = match
+        elif key:
+            missing[code] = key
+    if missing:
+        variants = set()
+        for code in missing:
+            variants |= sku_variants(code)
+        found = _query(set(missing.values()), variants)
+        for code, key in missing.items():
+            match = found.get(key)
+            if match is not None:
+                cache.set(key, match)
+                result[code] = match
+    return result
+
+
+def resolve(code):
+    """Gescannter Code -> Match oder None."""
+    return resolve_many([code]).get(code)
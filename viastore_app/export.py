@@ -0,0 +1,105 @@
+"""
+Streaming-Export von Artikeln und Bestellungen als CSV oder XLSX.
+
+Die Zeilen kommen per ``.values_list().iterator(chunk_size=...)`` direkt aus dem
+Datenbank-Cursor, ohne Model-Instanzen und ohne die Ergebnismenge im Speicher
+zu halten.
+"""
+
+import csv
+import itertools
+import tempfile
+
+from django.utils import timezone
+
+from .spreadsheets import write_only_workbook
+
+CHUNK_SIZE = 2000
+FILE_CHUNK_SIZE = 64 * 1024
+
+ITEM_COLUMNS = [
+    ("sku", "SKU"),
+    ("name", "Artikel"),
+    ("warehouse__name", "Lager"),
+    ("warehouse__location", "Standort"),
+    ("quantity", "Bestand"),
+]
+
+ORDER_COLUMNS = [
+    ("order_number", "Bestellnummer"),
+    ("order_date", "Datum"),
+    ("item__sku", "SKU"),
+    ("item__name", "Artikel"),
+    ("item__warehouse__name", "Lager"),
+    ("quantity", "Menge"),
+]
+
+
+class _Echo:
+    # csv.writer schreibt in diesen "Puffer" und bekommt die Zeile direkt zurück
+    def write(self, value):
+        return value
+
+
+def _rows(queryset, columns, ordering):
+    fields = [field for field, _ in columns]
+    return queryset.order_by(*ordering).values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+def item_rows(queryset, ordering=("name", "pk")):
+    return _rows(queryset, ITEM_COLUMNS, ordering)
+
+
+def order_rows(querysets, ordering=("order_date", "pk")):
+    # Aktuelle und archivierte Bestellungen nacheinander, jeweils nach Datum sortiert
+    rows = itertools.chain.from_iterable(_rows(queryset, ORDER_COLUMNS, ordering) for queryset in querysets)
+    for row in rows:
+        # Lokale Zeit ohne Zeitzone: Excel kennt keine zeitzonenbehafteten Datumswerte
+        yield (row[0], timezone.localtime(row[1]).replace(tzinfo=None), *row[2:])
+
+
+def stream_csv(columns, rows):
+    writer = csv.writer(_Echo(), delimiter=";")
+    # BOM, damit Excel die UTF-8-Umlaute erkennt
+    yield "\ufeff" + writer.writerow([label for _, label in columns])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_xlsx(columns, rows, title):
+    """Schreibt mit einem write-only Workbook zeilenweise in eine temporäre Datei
+    und streamt sie anschließend blockweise; der Speicherbedarf bleibt konstant."""
+    with tempfile.TemporaryFile() as buffer:
+        workbook = write_only_workbook()
+        sheet = workbook.create_sheet(title)
+        sheet.append([label for _, label in columns])
+        for row in rows:
+            sheet.append(row)
+        workbook.save(buffer)
+        buffer.seek(0)
+        while chunk := buffer.read(FILE_CHUNK_SIZE):
+            yield chunk
+
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def export_stream(fmt, columns, rows, title):
+    if fmt == "xlsx":
+        return stream_xlsx(columns, rows, title)
+    return stream_csv(columns, rows)
+
+
+def item_export(queryset, fmt, ordering=("name", "pk")):
+    return export_stream(fmt, ITEM_COLUMNS, item_rows(queryset, ordering), "Bestand")
+
+
+def order_export(querysets, fmt):
+    return export_stream(fmt, ORDER_COLUMNS, order_rows(querysets), "Bestellungen")
+
+
+def export_filename(prefix, fmt):
+    return f"{prefix}_{timezone.localdate():%Y-%m-%d}.{fmt}"
@@ -1,6 +1,43 @@
 
+from datetime import datetime, time, timedelta
+
 from django import forms
-from .models import Warehouse, Item, Order
+from django.contrib.admin.helpers import ActionForm
+from django.db.models import Q
+from django.urls import reverse_lazy
+from django.utils import timezone
+from . import barcodes
+from .models import Warehouse, Item, ItemBarcode, Order, OrderArchive
+from .search import prefix_q
+from .stock import in_warehouse
+
+
+# Artikelauswahl per Suchfeld statt <select> mit allen Artikeln
+class ItemAutocompleteWidget(forms.TextInput):
+    template_name = "item_autocomplete_widget.html"
+
+    def __init__(self, attrs=None):
+        super().__init__(attrs)
+        self.search_url = reverse_lazy("item_search_api")
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        label = ""
+        if value not in (None, ""):
+            item = Item.objects.filter(pk=value).only("sku", "name").first() if str(value).isdigit() else None
+            label = f"{item.sku} – {item.name}" if item else ""
+        context["widget"].update({"label": label, "search_url": str(self.search_url)})
+        return context
+
+
+class ItemChoiceField(forms.ModelChoiceField):
+    # Validierung lädt nur den übermittelten Primärschlüssel (queryset.get(pk=...))
+    widget = ItemAutocompleteWidget
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("queryset", Item.objects.all())
+        kwargs.setdefault("label", "Artikel")
+        super().__init__(**kwargs)
 
 class ExcelImportForm(forms.Form):
     file = forms.FileField(label="Excel-Datei (.xlsx)")
@@ -16,22 +53,146 @@ class ItemForm(forms.ModelForm):
         fields = ['name', 'sku', 'quantity', 'warehouse']
 
 class OrderForm(forms.ModelForm):
+    item = ItemChoiceField()
+
     class Meta:
         model = Order
         fields = ['order_number', 'item', 'quantity']
 
+    def clean_order_number(self):
+        order_number = self.cleaned_data["order_number"]
+        # Unique-Constraint deckt nur die aktuelle Tabelle ab
+        if OrderArchive.objects.filter(order_number=order_number).exists():
+            raise forms.ValidationError("Bestellnummer existiert bereits im Archiv.")
+        return order_number
+
+class ItemBarcodeForm(forms.ModelForm):
+    class Meta:
+        model = ItemBarcode
+        fields = ['code', 'item', 'pack_size', 'description']
+
+    def clean_code(self):
+        # Gespeichert wird die normalisierte Form, damit der Unique-Index Schreibvarianten abdeckt
+        code = barcodes.normalize(self.cleaned_data["code"])
+        if not code:
+            raise forms.ValidationError("Code darf nicht leer sein.")
+        return code
+
+    def clean_pack_size(self):
+        pack_size = self.cleaned_data["pack_size"]
+        if pack_size < 1:
+            raise forms.ValidationError("Gebindegröße muss mindestens 1 sein.")
+        return pack_size
+
+
+# Zusatzfelder der Admin-Massenaktionen für Artikel (neben der Aktionsauswahl)
+class ItemActionForm(ActionForm):
+    warehouse = forms.ModelChoiceField(queryset=Warehouse.objects.order_by("name"), required=False, label="Ziellager", empty_label="Ziellager")
+    delta = forms.IntegerField(required=False, label="Bestand ±")
 
 
 # Standard-Formular für klassische Ansicht
 class GoodsReceiptForm(forms.Form):
-    item = forms.ModelChoiceField(queryset=Item.objects.all())
+    item = ItemChoiceField()
     quantity = forms.IntegerField(min_value=1)
 
 # Touch-Formular mit Textfeld für Artikel
 class TouchGoodsReceiptForm(forms.Form):
-    item_name = forms.IntegerField(label="Artikelnummer")
+    # Text statt Zahl: führende Nullen (UPC/EAN) und alphanumerische Codes bleiben erhalten
+    item_name = forms.CharField(max_length=64, label="Artikelnummer / Barcode")
     quantity = forms.IntegerField(min_value=1, label="Menge")
 
 class StockCorrectionForm(forms.Form):
-    item = forms.ModelChoiceField(queryset=Item.objects.all())
+    item = ItemChoiceField()
     new_quantity = forms.IntegerField(min_value=0, label="Neuer Bestand")
+
+# Filter für Bestandsauskunft und Artikelübersicht (GET-Parameter)
+class ItemFilterForm(forms.Form):
+    SORT_CHOICES = [
+        ("name", "Name"),
+        ("-name", "Name (absteigend)"),
+        ("sku", "SKU"),
+        ("-sku", "SKU (absteigend)"),
+        ("quantity", "Menge"),
+        ("-quantity", "Menge (absteigend)"),
+    ]
+
+    warehouse = forms.ModelChoiceField(queryset=Warehouse.objects.order_by("name"), required=False, label="Lager", empty_label="Alle Lager")
+    sku = forms.CharField(required=False, label="SKU beginnt mit")
+    name = forms.CharField(required=False, label="Name enthält")
+    sort = forms.ChoiceField(choices=SORT_CHOICES, required=False, label="Sortierung")
+
+    def filter(self, queryset):
+        data = self.cleaned_data if self.is_valid() else {}
+        if data.get("warehouse"):
+            # Artikel mit Bestand oder Lagerplatz im Lager, nicht nur mit diesem Stammlager
+            queryset = queryset.filter(in_warehouse(data["warehouse"]))
+        if data.get("sku"):
+            queryset = queryset.filter(prefix_q("sku", data["sku"].strip()))
+        if data.get("name"):
+            queryset = queryset.filter(name__icontains=data["name"].strip())
+        return queryset
+
+    def selected_warehouse(self):
+        return self.cleaned_data.get("warehouse") if self.is_valid() else None
+
+    def ordering(self):
+        sort = (self.cleaned_data.get("sort") if self.is_valid() else None) or "name"
+        # pk als eindeutiger Tie-Breaker für die Cursor-Pagination
+        return [sort, "-pk" if sort.startswith("-") else "pk"]
+
+
+class OrderFilterForm(forms.Form):
+    date_from = forms.DateField(required=False, label="Von", widget=forms.DateInput(attrs={"type": "date"}))
+    date_to = forms.DateField(required=False, label="Bis", widget=forms.DateInput(attrs={"type": "date"}))
+    warehouse = forms.ModelChoiceField(queryset=Warehouse.objects.order_by("name"), required=False, label="Lager", empty_label="Alle Lager")
+    item = ItemChoiceField(required=False)
+    sku = forms.CharField(required=False, label="SKU beginnt mit")
+    include_archive = forms.BooleanField(required=False, label="Archiv einbeziehen")
+
+    def filter(self, queryset):
+        data = self.cleaned_data if self.is_valid() else {}
+        # Halboffene Zeitbereiche statt __date, damit der Index auf order_date greift
+        if data.get("date_from"):
+            queryset = queryset.filter(order_date__gte=_day_start(data["date_from"]))
+        if data.get("date_to"):
+            queryset = queryset.filter(order_date__lt=_day_start(data["date_to"] + timedelta(days=1)))
+        if data.get("warehouse"):
+            queryset = queryset.filter(item__warehouse=data["warehouse"])
+        if data.get("item"):
+            queryset = queryset.filter(item=data["item"])
+        if data.get("sku"):
+            queryset = queryset.filter(prefix_q("item__sku", data["sku"].strip()))
+        return queryset
+
+    def with_archive(self):
+        return self.is_valid() and self.cleaned_data["include_archive"]
+
+
+class ReplenishmentFilterForm(forms.Form):
+    warehouse = forms.ModelChoiceField(queryset=Warehouse.objects.order_by("name"), required=False, label="Lager", empty_label="Alle Lager")
+    sku = forms.CharField(required=False, label="SKU beginnt mit")
+
+    def filter(self, queryset):
+        data = self.cleaned_data if self.is_valid() else {}
+        if data.get("warehouse"):
+            # Regeln dieses Lagers und Gesamtbestandsregeln für Artikel mit diesem Stammlager
+            queryset = queryset.filter(Q(warehouse=data["warehouse"]) | Q(warehouse=None, item__warehouse=data["warehouse"]))
+        if data.get("sku"):
+            queryset = queryset.filter(prefix_q("item__sku", data["sku"].strip()))
+        return queryset
+
+
+class StockHistoryForm(forms.Form):
+    day = forms.DateField(label="Stichtag", widget=forms.DateInput(attrs={"type": "date"}))
+    compare = forms.DateField(required=False, label="Vergleich mit", widget=forms.DateInput(attrs={"type": "date"}))
+    warehouse = forms.ModelChoiceField(queryset=Warehouse.objects.order_by("name"), required=False, label="Lager", empty_label="Alle Lager")
+
+    def clean(self):
+        data = super().clean()
+        if data.get("day") and data.get("compare") == data["day"]:
+            data["compare"] = None
+        return data
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
@@ -0,0 +1,214 @@
+import time
+from dataclasses import dataclass, field
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import barcodes, push, stats
+from .spreadsheets import open_workbook
+
+from .models import Warehouse, Item, StockLevel, StockMovement
+
+# Zeilen pro Transaktion / Batch
+DEFAULT_CHUNK_SIZE = 1000
+# bulk_update erzeugt CASE-Ausdrücke, die mit der Batchgröße quadratisch teurer werden
+UPDATE_BATCH_SIZE = 100
+# Maximal gespeicherte Fehlerzeilen im Bericht
+MAX_REJECT_DETAILS = 100
+
+
+@dataclass
+class ImportReport:
+    inserted: int = 0
+    updated: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+    errors: list = field(default_factory=list)
+
+    @property
+    def processed(self):
+        return self.inserted + self.updated + self.rejected
+
+    @property
+    def rows_per_second(self):
+        if not self.seconds:
+            return 0.0
+        return self.processed / self.seconds
+
+    def reject(self, row_number, reason):
+        self.rejected += 1
+        if len(self.errors) < MAX_REJECT_DETAILS:
+            self.errors.append((row_number, reason))
+
+    def summary(self):
+        return (
+            f"{self.inserted} Artikel angelegt, {self.updated} aktualisiert, "
+            f"{self.rejected} abgelehnt ({self.rows_per_second:.0f} Zeilen/s)."
+        )
+
+
+def _clean_sku(value):
+    # Excel liefert numerische Artikelnummern oft als float (4006381333931.0)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip() if value is not None else ""
+
+
+def _clean_row(row):
+    # Format: Name | SKU | Menge | Lagername
+    row = tuple(row or ()) + (None,) * 4
+    name, sku, quantity, warehouse_name = row[:4]
+    name = str(name).strip() if name is not None else ""
+    sku = _clean_sku(sku)
+    warehouse_name = str(warehouse_name).strip() if warehouse_name is not None else ""
+    if not name and not sku and quantity is None and not warehouse_name:
+        return None, None
+    if not sku:
+        return None, "SKU fehlt"
+    if not name:
+        return None, "Name fehlt"
+    if not warehouse_name:
+        return None, "Lagername fehlt"
+    try:
+        quantity = int(quantity)
+    except (TypeError, ValueError):
+        return None, "Menge ist keine Zahl"
+    if quantity < 0:
+        return None, "Menge ist negativ"
+    return (name[:100], sku[:50], quantity, warehouse_name[:100]), None
+
+
+class ItemImporter:
+    """Importiert Artikelzeilen blockweise mit bulk_create/bulk_update."""
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, progress=None, total=None):
+        self.chunk_size = chunk_size
+        # progress(verarbeitete_zeilen, gesamt) wird nach jedem Block aufgerufen
+        self.progress = progress
+        self.total = total
+        self.report = ImportReport()
+        # Lagername -> Lager-ID, über alle Blöcke hinweg
+        self._warehouses = {}
+
+    def run(self, rows, first_row_number=2):
+        started = time.perf_counter()
+        chunk = []
+        for row_number, row in enumerate(rows, start=first_row_number):
+            values, error = _clean_row(row)
+            if error:
+                self.report.reject(row_number, error)
+            elif values:
+                chunk.append(values)
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk)
+                chunk = []
+        if chunk:
+            self._flush(chunk)
+        self._report_progress()
+        self.report.seconds = time.perf_counter() - started
+        return self.report
+
+    def _resolve_warehouses(self, names):
+        missing = {name for name in names if name not in self._warehouses}
+        if not missing:
+            return
+        # Lagernamen sind nicht eindeutig: wie get_or_create den ältesten Eintrag verwenden
+        for pk, name in Warehouse.objects.filter(name__in=missing).order_by("-pk").values_list("pk", "name"):
+            self._warehouses[name] = pk
+        new = [Warehouse(name=name, location="") for name in missing if name not in self._warehouses]
+        for warehouse in Warehouse.objects.bulk_create(new):
+            self._warehouses[warehouse.name] = warehouse.pk
+        stats.bump(stats.WAREHOUSES, len(new))
+
+    def _flush(self, chunk):
+        # Doppelte SKUs innerhalb eines Blocks: letzte Zeile gewinnt
+        rows = {sku: (name, quantity, warehouse_name) for name, sku, quantity, warehouse_name in chunk}
+        with transaction.atomic():
+            self._resolve_warehouses({row[2] for row in rows.values()})
+            existing = {
+                sku: (pk, name, warehouse_id)
+                for pk, sku, name, warehouse_id in Item.objects.filter(sku__in=list(rows)).values_list("pk", "sku", "name", "warehouse_id")
+            }
+            # Die Menge einer Zeile ist der Bestand am Standardplatz des genannten Lagers
+            levels = {
+                (item_id, warehouse_id): (pk, quantity)
+                for pk, item_id, warehouse_id, quantity in StockLevel.objects.filter(
+                    item_id__in=[entry[0] for entry in existing.values()], bin=""
+                ).values_list("pk", "item_id", "warehouse_id", "quantity")
+            }
+            to_create = []
+            to_update = []
+            levels_to_create = []
+            levels_to_update = []
+            # Bestandsdifferenzen landen als Korrekturen im Bestandsbuch
+            deltas = []
+            # bulk_create/bulk_update lösen keine Signale aus: Dashboard-Zähler selbst nachführen
+            counters = defaultdict(lambda: [0, 0])
+            unchanged = 0
+            now = timezone.now()
+            for sku, (name, quantity, warehouse_name) in rows.items():
+                warehouse_id = self._warehouses[warehouse_name]
+                if sku not in existing:
+                    # Der Datenbank-Trigger legt den Standardplatz mit dieser Menge an
+                    to_create.append(Item(name=name, sku=sku, quantity=quantity, warehouse_id=warehouse_id))
+                    counters[warehouse_id][0] += 1
+                    counters[warehouse_id][1] += quantity
+                    continue
+                pk, old_name, old_warehouse_id = existing[sku]
+                level_pk, old_quantity = levels.get((pk, warehouse_id), (None, None))
+                delta = quantity - (old_quantity or 0)
+                if (name, warehouse_id) == (old_name, old_warehouse_id) and not delta and level_pk:
+                    # Unveränderte Zeilen nicht erneut schreiben
+                    unchanged += 1
+                    continue
+                if (name, warehouse_id) != (old_name, old_warehouse_id):
+                    to_update.append(Item(pk=pk, name=name, warehouse_id=warehouse_id, updated_at=now))
+                    counters[old_warehouse_id][0] -= 1
+                    counters[warehouse_id][0] += 1
+                if level_pk is None:
+                    levels_to_create.append(StockLevel(item_id=pk, warehouse_id=warehouse_id, bin="", quantity=quantity))
+                elif delta:
+                    levels_to_update.append(StockLevel(pk=level_pk, quantity=quantity))
+                deltas.append((pk, warehouse_id, delta))
+                counters[warehouse_id][1] += delta
+            created = Item.objects.bulk_create(to_create, batch_size=self.chunk_size)
+            Item.objects.bulk_update(to_update, ["name", "warehouse", "updated_at"], batch_size=UPDATE_BATCH_SIZE)
+            # Item.quantity führen die Trigger auf StockLevel nach
+            StockLevel.objects.bulk_create(levels_to_create, batch_size=self.chunk_size)
+            StockLevel.objects.bulk_update(levels_to_update, ["quantity"], batch_size=UPDATE_BATCH_SIZE)
+            deltas.extend((item.pk, item.warehouse_id, item.quantity) for item in created)
+            StockMovement.objects.bulk_create(
+                [
+                    StockMovement(item_id=pk, warehouse_id=warehouse_id, kind=StockMovement.KIND_CORRECTION, quantity=delta, note="Excel-Import")
+                    for pk, warehouse_id, delta in deltas
+                    if delta
+                ],
+                batch_size=self.chunk_size,
+            )
+            stats.bump_warehouses(counters)
+            push.notify(item_ids=[pk for pk, _, _ in deltas])
+            # Scan-Cache: geänderte Namen und neue SKUs, die einen Alias überdecken
+            barcodes.invalidate_items([item.pk for item in to_update])
+            barcodes.cache.invalidate_codes([item.sku for item in created])
+        self.report.inserted += len(to_create)
+        self.report.updated += len(deltas) - len(created) + unchanged
+        self._report_progress()
+
+    def _report_progress(self):
+        if self.progress:
+            self.progress(self.report.processed, self.total)
+
+
+def import_workbook(file, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    # read_only: Zeilen werden gestreamt statt das ganze Blatt im Speicher aufzubauen
+    wb = open_workbook(file)
+    try:
+        ws = wb.active
+        # max_row stammt aus der Dimension-Angabe der Datei und kann fehlen
+        total = ws.max_row - 1 if ws.max_row else None
+        rows = ws.iter_rows(min_row=2, values_only=True)
+        return ItemImporter(chunk_size=chunk_size, progress=progress, total=total).run(rows)
+    finally:
+        wb.close()
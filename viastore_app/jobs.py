@@ -0,0 +1,207 @@
+import logging
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# kind -> Funktion(job, progress)
+HANDLERS = {}
+# Der Worker meldet laufende Jobs spätestens so oft (Sekunden); requeue_stale erst
+# nach deutlich längerer Stille
+HEARTBEAT_INTERVAL = 30
+
+
+def job_handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payload=None, upload=None, user=None):
+    if kind not in HANDLERS:
+        raise ValueError(f"Unbekannter Job-Typ: {kind}")
+    job = Job(kind=kind, payload=payload or {}, created_by=user if user and user.is_authenticated else None)
+    if upload is not None:
+        job.upload.save(upload.name, upload, save=False)
+    job.save()
+    if getattr(settings, "VIASTORE_JOBS_EAGER", False):
+        # Ohne Worker (z.B. in Tests) direkt im Request ausführen
+        transaction.on_commit(lambda: run_job(job.pk))
+    return job
+
+
+def claim_next():
+    # Optimistisches Claiming: nur wer den Status von queued auf running setzt, bekommt den Job
+    while True:
+        pk = Job.objects.filter(status=Job.STATUS_QUEUED).order_by("id").values_list("pk", flat=True).first()
+        if pk is None:
+            return None
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=pk, status=Job.STATUS_QUEUED).update(
+            status=Job.STATUS_RUNNING, started_at=now, heartbeat_at=now
+        )
+        if claimed:
+            return pk
+
+
+def run_job(pk):
+    job = Job.objects.get(pk=pk)
+    if job.status == Job.STATUS_QUEUED:
+        now = timezone.now()
+        Job.objects.filter(pk=pk).update(status=Job.STATUS_RUNNING, started_at=now, heartbeat_at=now)
+
+    def progress(done, total=None):
+        Job.objects.filter(pk=pk).update(progress_done=done, progress_total=total, heartbeat_at=timezone.now())
+
+    try:
+        result = HANDLERS[job.kind](job, progress)
+    except Exception:
+        logger.exception("Job %s fehlgeschlagen", pk)
+        Job.objects.filter(pk=pk).update(
+            status=Job.STATUS_FAILED, error=traceback.format_exc(), finished_at=timezone.now()
+        )
+    else:
+        Job.objects.filter(pk=pk).update(status=Job.STATUS_DONE, result=result, finished_at=timezone.now())
+        # Upload nur nach Erfolg löschen; fehlgeschlagene bleiben für retry() und zur Analyse
+        if job.upload:
+            job.upload.delete(save=False)
+            Job.objects.filter(pk=pk).update(upload="")
+
+
+def heartbeat(pks):
+    return Job.objects.filter(pk__in=list(pks), status=Job.STATUS_RUNNING).update(heartbeat_at=timezone.now())
+
+
+def requeue_stale(max_silence_seconds):
+    """Jobs eines abgestürzten Workers wieder freigeben: laufend, aber ohne
+    Lebenszeichen seit ``max_silence_seconds``. Gesunde Jobs anderer Worker
+    melden sich alle HEARTBEAT_INTERVAL Sekunden und bleiben unberührt."""
+    cutoff = timezone.now() - timedelta(seconds=max_silence_seconds)
+    # Jobs aus der Zeit vor der heartbeat-Spalte fallen auf started_at zurück
+    silent = Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    return Job.objects.filter(silent, status=Job.STATUS_RUNNING).update(
+        status=Job.STATUS_QUEUED, started_at=None, heartbeat_at=None
+    )
+
+
+def retry(pks):
+    """Fehlgeschlagene Jobs mit ihrem Upload erneut einreihen."""
+    return Job.objects.filter(pk__in=list(pks), status=Job.STATUS_FAILED).update(
+        status=Job.STATUS_QUEUED, error="", progress_done=0, progress_total=None,
+        started_at=None, heartbeat_at=None, finished_at=None,
+    )
+
+
+def purge_failed_uploads(max_age_days):
+    # Uploads fehlgeschlagener Jobs nach der Aufbewahrungsfrist entfernen
+    cutoff = timezone.now() - timedelta(days=max_age_days)
+    failed = Job.objects.filter(status=Job.STATUS_FAILED, finished_at__lt=cutoff).exclude(upload="")
+    count = 0
+    for job in failed.only("pk", "upload"):
+        job.upload.delete(save=False)
+        Job.objects.filter(pk=job.pk).update(upload="")
+        count += 1
+    return count
+
+
+def _run_in_thread(pk):
+    close_old_connections()
+    try:
+        run_job(pk)
+    finally:
+        close_old_connections()
+
+
+def run_pending():
+    # Wartende Jobs im aufrufenden Thread abarbeiten
+    count = 0
+    pk = claim_next()
+    while pk is not None:
+        run_job(pk)
+        count += 1
+        pk = claim_next()
+    return count
+
+
+def work(workers=2, poll_interval=1.0, once=False):
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="viastore-job") as pool:
+        running = {}
+        last_heartbeat = time.monotonic()
+        while True:
+            running = {future: pk for future, pk in running.items() if not future.done()}
+            while len(running) < workers:
+                pk = claim_next()
+                if pk is None:
+                    break
+                running[pool.submit(_run_in_thread, pk)] = pk
+            if once and not running:
+                return
+            if running and time.monotonic() - last_heartbeat >= HEARTBEAT_INTERVAL:
+                # Auch Jobs ohne Fortschrittsmeldung (eine lange Anweisung) gelten als lebendig
+                heartbeat(running.values())
+                last_heartbeat = time.monotonic()
+            time.sleep(poll_interval if not once else 0.05)
+
+
+def job_status(job):
+    return {
+        "id": job.pk,
+        "kind": job.kind,
+        "status": job.status,
+        "progress_done": job.progress_done,
+        "progress_total": job.progress_total,
+        "result": job.result,
+        "error": job.error.strip().splitlines()[-1] if job.error else None,
+    }
+
+
+@job_handler("import_excel")
+def import_excel_job(job, progress):
+    from .importer import import_workbook
+
+    with job.upload.open("rb") as file:
+        report = import_workbook(file, progress=progress)
+    return {
+        "inserted": report.inserted,
+        "updated": report.updated,
+        "rejected": report.rejected,
+        "rows_per_second": round(report.rows_per_second),
+        "errors": report.errors,
+        "message": report.summary(),
+    }
+
+
+@job_handler("resolve_article_names")
+def resolve_article_names_job(job, progress):
+    # Neu angelegte Artikel (Name = SKU) mit der externen Bezeichnung versehen
+    from . import barcodes
+    from .article_lookup import resolve_article_name
+    from .models import Item
+
+    item_ids = job.payload.get("item_ids", [])
+    renamed = 0
+    for done, item in enumerate(Item.objects.filter(pk__in=item_ids).only("pk", "sku", "name"), start=1):
+        result = resolve_article_name(item.sku)
+        if result.found and item.name == item.sku:
+            renamed += Item.objects.filter(pk=item.pk, name=item.sku).update(name=result.name[:100], updated_at=timezone.now())
+            barcodes.invalidate_items([item.pk])
+        progress(done, len(item_ids))
+    return {"renamed": renamed}
+
+
+@job_handler("replenishment_scan")
+def replenishment_scan_job(job, progress):
+    # Nachschubvorschläge neu berechnen (mengenbasiert, optional nur für item_ids)
+    from .replenishment import scan
+
+    return scan(item_ids=job.payload.get("item_ids"))
@@ -0,0 +1,23 @@
+from contextlib import contextmanager
+
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from viastore_app import seeding
+
+
+@contextmanager
+def bench_database():
+    # Benchmarks laufen gegen eine Wegwerf-Testdatenbank, nie gegen db.sqlite3;
+    # die Testumgebung erlaubt außerdem den Host "testserver" für den Test-Client
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def generate_dataset(warehouses=5, items=10_000, orders=20_000, seed=1, batch_size=5000):
+    """Benchmark-Daten aus dem Seed-Generator (siehe viastore_app.seeding)."""
+    return seeding.generate(warehouses, items, orders, seed=seed, batch_size=batch_size)
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from viastore_app.archive import DEFAULT_BATCH_SIZE, archive_orders
+
+
+class Command(BaseCommand):
+    help = "Verschiebt Bestellungen älter als --days Tage batchweise ins Bestellarchiv."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=365, help="Archivierungshorizont in Tagen")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Betroffene Bestellungen nur zählen")
+
+    def handle(self, *args, **options):
+        def progress(moved):
+            self.stdout.write(f"{moved} Bestellungen archiviert …")
+
+        count = archive_orders(options["days"], options["batch_size"], options["dry_run"], progress=None if options["dry_run"] else progress)
+        if options["dry_run"]:
+            self.stdout.write(f"{count} Bestellungen sind älter als {options['days']} Tage.")
+        else:
+            self.stdout.write(f"{count} Bestellungen ins Archiv verschoben.")
@@ -0,0 +1,58 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from viastore_app import barcodes
+from viastore_app.models import ItemBarcode
+from ._bench import bench_database, generate_dataset
+from .bench_touch_sync import percentile
+
+TARGET_P99_MS = 5.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Misst die Auflösung gescannter Codes (SKU mit/ohne führende Nullen, Karton-GTIN, unbekannt) "
+        f"ohne und mit Cache; Ziel p99 < {TARGET_P99_MS:g} ms."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=100_000)
+        parser.add_argument("--lookups", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with bench_database():
+            data = generate_dataset(5, options["items"], 0, seed=options["seed"])
+            eans = [sku for sku in data["skus"] if sku.isdigit()]
+            cartons = list(ItemBarcode.objects.values_list("code", flat=True))
+            kinds = {
+                "sku": lambda: rng.choice(data["skus"]),
+                "ean_gepolstert": lambda: rng.choice(eans).zfill(14),
+                "karton": lambda: rng.choice(cartons),
+                "unbekannt": lambda: f"99{rng.randrange(10 ** 10):010d}",
+            }
+            codes = [(kind, kinds[kind]()) for kind in rng.choices(list(kinds), k=options["lookups"])]
+            barcodes.cache.clear()
+            self.stdout.write(f"{options['items']} Artikel, {len(cartons)} Karton-Codes, {len(codes)} Abfragen je Durchlauf")
+            failed = False
+            # Erster Durchlauf füllt den Cache, zweiter trifft ihn (außer bei unbekannten Codes)
+            for label in ("kalt", "warm"):
+                latencies = {kind: [] for kind in kinds}
+                for kind, code in codes:
+                    started = time.perf_counter()
+                    match = barcodes.resolve(code)
+                    latencies[kind].append(time.perf_counter() - started)
+                    assert (match is None) == (kind == "unbekannt"), code
+                for kind, values in latencies.items():
+                    p99 = percentile(values, 99) * 1000
+                    failed |= p99 >= TARGET_P99_MS
+                    self.stdout.write(
+                        f"{label:5s} {kind:15s} n={len(values):5d}  p50 {percentile(values, 50) * 1000:6.3f} ms  p99 {p99:6.3f} ms"
+                    )
+        if failed:
+            self.stderr.write(f"Ziel p99 < {TARGET_P99_MS:g} ms verfehlt")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Alle p99 < {TARGET_P99_MS:g} ms"))
@@ -0,0 +1,94 @@
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, OperationalError
+
+from viastore_app import stock
+from viastore_app.models import Warehouse, Item
+from ._bench import bench_database
+from .bench_touch_sync import percentile
+
+
+class Command(BaseCommand):
+    help = "Lasttest: Buchungen/s unter N parallelen Schreibern für ein oder mehrere Datenbank-Profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", default="", help="z. B. sqlite,sqlite-basic (Standard: aktuelles Profil)")
+        parser.add_argument("--writers", default="1,4,16", help="Anzahl paralleler Schreiber, kommagetrennt")
+        parser.add_argument("--bookings", type=int, default=200, help="Buchungen je Schreiber")
+        parser.add_argument("--items", type=int, default=50, help="Größe der heißen Artikelmenge")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        profiles = [p for p in options["profiles"].split(",") if p]
+        if profiles and profiles != [settings.VIASTORE_DB_PROFILE]:
+            # Das Profil wird beim Laden der Settings gewählt, daher je Profil ein eigener Prozess
+            for profile in profiles:
+                self.run_profile(profile, options)
+            return
+        self.stdout.write(f"Profil {settings.VIASTORE_DB_PROFILE} ({connection.vendor})")
+        with bench_database():
+            warehouse = Warehouse.objects.create(name="Lager Bench", location="-")
+            Item.objects.bulk_create(Item(name=f"Artikel {i}", sku=f"W{i:06d}", warehouse=warehouse) for i in range(options["items"]))
+            item_ids = list(Item.objects.values_list("pk", flat=True))
+            for writers in (int(w) for w in options["writers"].split(",")):
+                self.run_writers(writers, item_ids, options)
+
+    def run_profile(self, profile, options):
+        command = [
+            sys.executable, sys.argv[0], "bench_db_writers",
+            "--writers", options["writers"],
+            "--bookings", str(options["bookings"]),
+            "--items", str(options["items"]),
+            "--seed", str(options["seed"]),
+        ]
+        env = {**os.environ, "VIASTORE_DB_PROFILE": profile}
+        result = subprocess.run(command, env=env, capture_output=True, text=True)
+        self.stdout.write(result.stdout.rstrip())
+        if result.returncode:
+            self.stderr.write(result.stderr.rstrip())
+
+    def run_writers(self, writers, item_ids, options):
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        start = threading.Barrier(writers + 1)
+
+        def worker(index):
+            rng = random.Random(options["seed"] + index)
+            own = []
+            try:
+                start.wait()
+                for _ in range(options["bookings"]):
+                    began = time.perf_counter()
+                    try:
+                        stock.book_receipt(rng.choice(item_ids), 1)
+                    except OperationalError as exc:
+                        with lock:
+                            errors.append(str(exc))
+                        continue
+                    own.append(time.perf_counter() - began)
+            finally:
+                connection.close()
+                with lock:
+                    latencies.extend(own)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(writers)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{writers:3d} Schreiber: {len(latencies) / elapsed:8.0f} Buchungen/s  "
+            f"p50 {percentile(latencies, 50) * 1000:6.1f} ms  p99 {percentile(latencies, 99) * 1000:7.1f} ms  "
+            f"Fehler {len(errors)}" + (f" ({errors[0]})" if errors else "")
+        )
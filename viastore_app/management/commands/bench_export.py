@@ -0,0 +1,55 @@
+import resource
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from viastore_app.models import Warehouse, Item
+from ._bench import bench_database
+
+
+def peak_rss_mb():
+    # ru_maxrss ist unter Linux in KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = "Misst Durchsatz und Spitzen-RSS des Streaming-Exports (CSV/XLSX)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500_000)
+        parser.add_argument("--warehouses", type=int, default=20)
+        parser.add_argument("--formats", default="csv,xlsx")
+        parser.add_argument("--batch", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        with bench_database():
+            self.seed(options)
+            client = Client()
+            client.force_login(User.objects.create_user("bench"))
+            for fmt in options["formats"].split(","):
+                rss_before = peak_rss_mb()
+                started = time.perf_counter()
+                response = client.get(f"/export/bestand.{fmt}")
+                size = 0
+                for chunk in response.streaming_content:
+                    size += len(chunk)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{fmt:5s}: {options['rows'] / elapsed:9.0f} Zeilen/s  {elapsed:6.1f} s  {size / 1e6:7.1f} MB  "
+                    f"Spitzen-RSS {peak_rss_mb():6.0f} MiB (+{peak_rss_mb() - rss_before:.0f} MiB durch Export)"
+                )
+
+    def seed(self, options):
+        warehouses = Warehouse.objects.bulk_create(
+            Warehouse(name=f"Lager {i}", location=f"Ort {i}") for i in range(options["warehouses"])
+        )
+        # In Batches anlegen, damit das Befüllen den RSS-Messwert nicht dominiert
+        for start in range(0, options["rows"], options["batch"]):
+            stop = min(start + options["batch"], options["rows"])
+            Item.objects.bulk_create(
+                Item(name=f"Artikel {i}", sku=f"E{i:07d}", quantity=i % 500, warehouse=warehouses[i % len(warehouses)])
+                for i in range(start, stop)
+            )
+        self.stdout.write(f"{options['rows']} Artikel angelegt, RSS {peak_rss_mb():.0f} MiB")
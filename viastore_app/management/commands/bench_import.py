@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+
+import openpyxl
+from django.core.management.base import BaseCommand
+
+from viastore_app.importer import import_workbook
+from viastore_app.models import Warehouse, Item
+from ._bench import bench_database
+
+
+def write_workbook(path, rows, warehouses=10):
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["Name", "SKU", "Menge", "Lagername"])
+    for i in range(rows):
+        ws.append([f"Artikel {i}", f"SKU{i:08d}", i % 500, f"Lager {i % warehouses}"])
+    wb.save(path)
+
+
+def legacy_import(path):
+    # Bisheriger Weg aus views.import_excel: zwei get_or_create plus save() pro Zeile
+    wb = openpyxl.load_workbook(path)
+    ws = wb.active
+    for row in ws.iter_rows(min_row=2, values_only=True):
+        name, sku, quantity, warehouse_name = row
+        warehouse, _ = Warehouse.objects.get_or_create(name=warehouse_name)
+        item, created = Item.objects.get_or_create(sku=sku, defaults={"name": name, "quantity": quantity, "warehouse": warehouse})
+        if not created:
+            item.name = name
+            item.quantity = quantity
+            item.warehouse = warehouse
+            item.save()
+
+
+class Command(BaseCommand):
+    help = "Vergleicht den Excel-Import (alt vs. Streaming) auf einer generierten Arbeitsmappe."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--skip-legacy", action="store_true", help="Nur den Streaming-Import messen")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            self.stdout.write(f"Erzeuge Arbeitsmappe mit {rows} Zeilen ...")
+            write_workbook(path, rows)
+            with bench_database():
+                if not options["skip_legacy"]:
+                    started = time.perf_counter()
+                    legacy_import(path)
+                    seconds = time.perf_counter() - started
+                    self.stdout.write(f"alt:       {seconds:8.2f} s  {rows / seconds:10.0f} Zeilen/s")
+                    Item.objects.all().delete()
+                    Warehouse.objects.all().delete()
+                # Erster Lauf legt an, zweiter Lauf aktualisiert
+                for label in ("insert", "update"):
+                    report = import_workbook(path, chunk_size=options["chunk_size"])
+                    self.stdout.write(
+                        f"streaming ({label}): {report.seconds:8.2f} s  {report.rows_per_second:10.0f} Zeilen/s  "
+                        f"(+{report.inserted} / ~{report.updated} / -{report.rejected})"
+                    )
+        finally:
+            os.remove(path)
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from viastore_app import article_lookup
+from .bench_touch_sync import percentile
+
+
+class FakeUpstream(ThreadingHTTPServer):
+    """Lokaler Ersatz für Open Food Facts: JSON-Antwort nach ``latency`` Sekunden."""
+
+    daemon_threads = True
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = 0
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), FakeUpstreamHandler)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.latency)
+        sku = self.path.rsplit("/", 1)[-1].removesuffix(".json")
+        body = json.dumps({"product": {"product_name": f"Artikel {sku}"}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Vergleicht den Artikel-Lookup synchron (Worker-Threads, wie bisher) mit dem async-Endpunkt "
+        "(ASGI, Single-Flight) gegen einen lokalen Fake-Upstream mit künstlicher Latenz."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tablets", type=int, default=20, help="Gleichzeitige Tablets")
+        parser.add_argument("--scans", type=int, default=5, help="Scans je Tablet (nacheinander)")
+        parser.add_argument("--skus", type=int, default=1, help="Verschiedene SKUs (1 = alle scannen dasselbe)")
+        parser.add_argument("--latency-ms", type=int, default=200, help="Antwortzeit des Fake-Upstreams")
+        parser.add_argument("--threads", type=int, default=4, help="Worker-Threads der synchronen Variante")
+
+    def handle(self, *args, **options):
+        upstream = FakeUpstream(options["latency_ms"] / 1000)
+        threading.Thread(target=upstream.serve_forever, daemon=True).start()
+        provider = article_lookup.OpenFoodFactsJsonProvider()
+        provider.base_url = upstream.base_url
+        skus = [f"40063813{index:05d}" for index in range(max(1, options["skus"]))]
+        plan = [
+            [skus[(tablet + scan) % len(skus)] for scan in range(options["scans"])]
+            for tablet in range(options["tablets"])
+        ]
+        # Ohne Cache, damit jeder Scan wirklich nach außen geht (bzw. koalesziert wird)
+        resolver = article_lookup.ArticleNameResolver([provider], cache=None, deadline=10 + options["latency_ms"] / 100)
+        previous = article_lookup._resolver
+        article_lookup._resolver = resolver
+        setup_test_environment()
+        try:
+            sync = self.measure(upstream, lambda: self.run_sync(resolver, plan, options["threads"]))
+            async_ = self.measure(upstream, lambda: async_to_sync(self.run_async)(plan))
+        finally:
+            teardown_test_environment()
+            article_lookup._resolver = previous
+            upstream.shutdown()
+            upstream.server_close()
+
+        total = sum(len(scans) for scans in plan)
+        self.stdout.write(
+            f"{options['tablets']} Tablets × {options['scans']} Scans, {len(skus)} SKU(s), "
+            f"Upstream-Latenz {options['latency_ms']} ms"
+        )
+        for label, result in ((f"sync ({options['threads']} Threads)", sync), ("async (ASGI)", async_)):
+            latencies, elapsed, outbound = result
+            self.stdout.write(
+                f"{label:20s} {elapsed:6.2f} s  {total / elapsed:7.1f} Scans/s  p50 {percentile(latencies, 50) * 1000:7.0f} ms  "
+                f"p95 {percentile(latencies, 95) * 1000:7.0f} ms  externe Aufrufe {outbound}"
+            )
+
+    @staticmethod
+    def measure(upstream, run):
+        before = upstream.requests
+        started = time.perf_counter()
+        latencies = run()
+        return latencies, time.perf_counter() - started, upstream.requests - before
+
+    @staticmethod
+    def run_sync(resolver, plan, threads):
+        # Je Tablet ein Client; gleichzeitig bedient werden höchstens ``threads`` Requests
+        workers = threading.Semaphore(threads)
+        latencies = []
+        lock = threading.Lock()
+
+        def tablet(scans):
+            for sku in scans:
+                started = time.perf_counter()
+                with workers:
+                    resolver.resolve(sku)
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+
+        clients = [threading.Thread(target=tablet, args=(scans,)) for scans in plan]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        return latencies
+
+    @staticmethod
+    async def run_async(plan):
+        # Durch den kompletten ASGI-Handler mit Middleware, wie unter uvicorn
+        client = AsyncClient()
+        latencies = []
+
+        async def tablet(scans):
+            for sku in scans:
+                started = time.perf_counter()
+                response = await client.get(f"/api/google-item-info/{sku}/")
+                assert response.json()["name"] == f"Artikel {sku}", response.content
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(tablet(scans) for scans in plan))
+        return latencies
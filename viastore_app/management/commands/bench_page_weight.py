@@ -0,0 +1,94 @@
+import gzip
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from viastore_app import assets
+from ._bench import bench_database, generate_dataset
+
+PAGES = [
+    ("dashboard", "/"),
+    ("touch", "/touch/"),
+    ("wareneingang_touch", "/wareneingang-touch/"),
+    ("artikel", "/artikel/"),
+    ("bestandsauskunft", "/bestandsauskunft/"),
+    ("bestellungen", "/bestellungen/"),
+    ("nachschub", "/nachschub/"),
+    ("import", "/import-excel/"),
+    ("login", "/login/"),
+]
+
+
+def _static_path(url, static_url):
+    path = urlsplit(url).path
+    return finders.find(path[len(static_url):]) if path.startswith(static_url) else None
+
+
+def _compressed_size(path):
+    with open(path, "rb") as handle:
+        data = handle.read()
+    if assets.brotli is not None:
+        return len(assets.brotli.compress(data))
+    return len(gzip.compress(data, compresslevel=9))
+
+
+class Command(BaseCommand):
+    help = (
+        "Prüft die Hauptseiten auf externe Requests und misst das Seitengewicht (HTML plus "
+        "Skripte/Stylesheets, komprimiert; Webfonts lädt der Browser erst bei Bedarf) sowie eine grobe "
+        "Time-to-Interactive für das Hallen-WLAN."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--budget-kb", type=int, default=300, help="Höchstgewicht je Seite (komprimiert, erster Aufruf)")
+        parser.add_argument("--bandwidth-kbit", type=int, default=2000, help="Angenommene Bandbreite")
+        parser.add_argument("--rtt-ms", type=int, default=80, help="Angenommene Round-Trip-Zeit")
+        parser.add_argument("--connections", type=int, default=6, help="Parallele Verbindungen des Browsers")
+
+    def handle(self, *args, **options):
+        problems = []
+        with bench_database():
+            generate_dataset(3, 500, 1000, seed=1)
+            client = Client()
+            client.force_login(User.objects.create_superuser("bench"))
+            static_url = "/" + settings.STATIC_URL.lstrip("/")
+            self.stdout.write(f"{'Seite':20s} {'HTML':>8s} {'Dateien':>7s} {'roh':>9s} {'komprimiert':>12s} {'inline JS':>9s} {'TTI':>8s}")
+            for label, url in PAGES:
+                if label == "login":
+                    client.logout()
+                response = client.get(url)
+                if response.status_code != 200:
+                    problems.append(f"{url}: HTTP {response.status_code}")
+                    continue
+                html = response.content
+                resources, inline_bytes = assets.page_resources(html.decode())
+                raw = compressed = 0
+                for _, resource_url in resources:
+                    if assets.is_external(resource_url):
+                        problems.append(f"{url}: externer Request {resource_url}")
+                        continue
+                    path = _static_path(resource_url, static_url)
+                    if path is None:
+                        problems.append(f"{url}: {resource_url} nicht in den statischen Dateien")
+                        continue
+                    with open(path, "rb") as handle:
+                        raw += len(handle.read())
+                    compressed += _compressed_size(path)
+                html_size = len(gzip.compress(html))
+                total = html_size + compressed
+                # Grobe TTI: HTML, dann alle Dateien in Wellen zu je --connections, plus Übertragungszeit
+                waves = -(-len(resources) // options["connections"]) if resources else 0
+                tti = (1 + waves) * options["rtt_ms"] / 1000 + total * 8 / (options["bandwidth_kbit"] * 1000)
+                if total > options["budget_kb"] * 1024:
+                    problems.append(f"{url}: {total / 1024:.0f} KB > Budget {options['budget_kb']} KB")
+                self.stdout.write(
+                    f"{label:20s} {html_size / 1024:7.1f}K {len(resources):7d} {raw / 1024:8.0f}K {compressed / 1024:11.0f}K "
+                    f"{inline_bytes:8d}B {tti:7.2f}s"
+                )
+        if problems:
+            raise CommandError("Seitengewicht/externe Requests:\n  " + "\n  ".join(problems))
+        self.stdout.write(self.style.SUCCESS("Keine externen Requests, alle Seiten im Budget"))
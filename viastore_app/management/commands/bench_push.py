@@ -0,0 +1,76 @@
+import asyncio
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from viastore_app.push import InMemoryBroker
+from .bench_touch_sync import percentile
+
+
+class Command(BaseCommand):
+    help = "Misst zugestellte Nachrichten/s des Push-Brokers bei vielen simulierten Abonnenten."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subscribers", type=int, default=500)
+        parser.add_argument("--events", type=int, default=20000, help="Anzahl veröffentlichter Artikeländerungen")
+        parser.add_argument("--burst", type=int, default=50, help="Artikel je Veröffentlichung (Sammelbuchung)")
+        parser.add_argument("--warehouses", type=int, default=10)
+        parser.add_argument("--filtered", type=float, default=0.5, help="Anteil Abonnenten mit Lagerfilter")
+        parser.add_argument("--windows", default="0.05,0.25", help="Sammelfenster in Sekunden")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        for window in (float(w) for w in options["windows"].split(",")):
+            asyncio.run(self.run(window, options))
+
+    async def run(self, window, options):
+        rng = random.Random(options["seed"])
+        broker = InMemoryBroker()
+        subscriptions = []
+        for _ in range(options["subscribers"]):
+            warehouses = [rng.randrange(options["warehouses"])] if rng.random() < options["filtered"] else None
+            subscriptions.append(broker.subscribe(warehouses, window=window))
+        frames = 0
+        updates = 0
+        latencies = []
+        done = asyncio.Event()
+
+        async def consume(subscription):
+            nonlocal frames, updates
+            while True:
+                frame = await subscription.queue.get()
+                received = time.perf_counter()
+                frames += 1
+                updates += len(frame.get("items", ()))
+                # Latenz der ältesten Änderung im Frame (Stichprobe je Frame)
+                latencies.append(received - min(item["ts"] for item in frame["items"]))
+
+        consumers = [asyncio.create_task(consume(subscription)) for subscription in subscriptions]
+
+        def produce():
+            for start in range(0, options["events"], options["burst"]):
+                now = time.perf_counter()
+                items = [
+                    {"id": rng.randrange(100_000), "sku": "", "warehouse_id": rng.randrange(options["warehouses"]), "quantity": 1, "ts": now}
+                    for _ in range(min(options["burst"], options["events"] - start))
+                ]
+                broker.publish(items=items)
+            loop.call_soon_threadsafe(done.set)
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        threading.Thread(target=produce).start()
+        await done.wait()
+        published_at = time.perf_counter()
+        # Letzte Sammelfenster noch ausliefern lassen
+        await asyncio.sleep(window * 2 + 0.05)
+        elapsed = time.perf_counter() - started
+        for task in consumers:
+            task.cancel()
+        self.stdout.write(
+            f"Fenster {window * 1000:5.0f} ms: {options['events'] / (published_at - started):9.0f} Änderungen/s veröffentlicht  "
+            f"{updates / elapsed:10.0f} Änderungen/s zugestellt  {frames / elapsed:8.0f} Frames/s  "
+            f"Latenz p50 {percentile(latencies, 50) * 1000:6.1f} ms  p99 {percentile(latencies, 99) * 1000:6.1f} ms"
+        )
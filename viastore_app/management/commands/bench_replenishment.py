@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from viastore_app import replenishment
+from viastore_app.models import Item, ReorderRule, ReorderSuggestion
+from ._bench import bench_database, generate_dataset
+
+
+def _create_rules():
+    # Je Artikel eine Regel per INSERT … SELECT: jede zweite auf den Gesamtbestand,
+    # die übrigen auf das Stammlager; Meldebestand 0–99, Höchstbestand +100
+    quote = connection.ops.quote_name
+    rules, items = ReorderRule._meta, Item._meta
+    columns = ", ".join(quote(rules.get_field(field).column) for field in ("item", "warehouse", "reorder_point", "max_quantity"))
+    pk, warehouse = quote(items.pk.column), quote(items.get_field("warehouse").column)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(rules.db_table)} ({columns}) "
+            f"SELECT {pk}, CASE WHEN {pk} % 2 = 0 THEN NULL ELSE {warehouse} END, {pk} * 7 % 100, {pk} * 7 % 100 + 100 "
+            f"FROM {quote(items.db_table)}"
+        )
+        return cursor.rowcount
+
+
+class Command(BaseCommand):
+    help = "Misst replenishment.scan() und confirm() mit einer Meldebestand-Regel je Artikel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=500_000)
+        parser.add_argument("--warehouses", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        with bench_database():
+            started = time.perf_counter()
+            generate_dataset(options["warehouses"], options["items"], 0, seed=options["seed"])
+            count = _create_rules()
+            self.stdout.write(f"{options['items']} Artikel, {count} Regeln ({time.perf_counter() - started:.1f} s)")
+            for label in ("erster Lauf", "zweiter Lauf"):
+                started = time.perf_counter()
+                result = replenishment.scan()
+                self.stdout.write(f"scan {label}: {result} in {time.perf_counter() - started:.2f} s")
+            ids = list(replenishment.open_suggestions().values_list("pk", flat=True))
+            started = time.perf_counter()
+            orders = replenishment.confirm(ids)
+            self.stdout.write(f"confirm: {orders} Bestellungen in {time.perf_counter() - started:.2f} s")
+            self.stdout.write(f"Aktive Vorschläge: {ReorderSuggestion.objects.filter(closed_at=None).count()}")
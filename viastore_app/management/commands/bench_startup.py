@@ -0,0 +1,78 @@
+import json
+import platform
+import statistics
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from viastore_app import startup
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "startup.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Misst die Startzeit eines Worker-Prozesses (python -X importtime) bis zur ersten Antwort, "
+        "zeigt die Importzeit je Paket und prüft Budget, Baseline und schwere optionale Abhängigkeiten."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Frische Prozesse; ausgewertet wird der Median")
+        parser.add_argument("--path", default="/health/db/", help="Erster Request (ohne Login)")
+        parser.add_argument("--budget-ms", type=float, default=1000, help="Höchstzeit bis zur ersten Antwort")
+        parser.add_argument("--top", type=int, default=12, help="Anzahl der angezeigten Pakete")
+        parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+        parser.add_argument("--save-baseline", action="store_true", help="Ergebnis als neue Baseline speichern")
+        parser.add_argument("--check", action="store_true", help="Gegen die Baseline prüfen, Exit-Code 1 bei Regression")
+        parser.add_argument("--tolerance", type=float, default=0.25, help="Erlaubte Verschlechterung (0.25 = +25 %%)")
+
+    def handle(self, *args, **options):
+        runs = [startup.probe(options["path"]) for _ in range(max(1, options["runs"]))]
+        problems = [f"{options['path']}: HTTP {run['status']}" for run in runs if run["status"] != 200][:1]
+        heavy = sorted({name for run in runs for name in run["heavy"]})
+        if heavy:
+            problems.append(f"Beim Start geladen: {', '.join(heavy)} (gehören hinter ein Service-Modul)")
+
+        report = {
+            "path": options["path"],
+            "machine": {"python": platform.python_version(), "platform": platform.platform()},
+            "runs": len(runs),
+            "first_request_ms": round(statistics.median(run["first_request_ms"] for run in runs), 1),
+            "app_loaded_ms": round(statistics.median(run["app_loaded_ms"] for run in runs), 1),
+            "import_ms": round(statistics.median(run["import_ms"] for run in runs), 1),
+            "modules": max(run["modules"] for run in runs),
+        }
+        packages = {name: statistics.median(run["packages"].get(name, 0) for run in runs) for name in runs[0]["packages"]}
+        self.stdout.write(
+            f"Erste Antwort {report['first_request_ms']:.0f} ms (Anwendung geladen nach {report['app_loaded_ms']:.0f} ms), "
+            f"Importe {report['import_ms']:.0f} ms, {report['modules']} Module – Median aus {len(runs)} Prozessen"
+        )
+        # Per importlib geladene Module (Models, Admin, URLconfs) zählen zum importierenden Paket
+        for name, ms in sorted(packages.items(), key=lambda entry: -entry[1])[:options["top"]]:
+            self.stdout.write(f"  {name:28s} {ms:8.1f} ms")
+
+        if report["first_request_ms"] > options["budget_ms"]:
+            problems.append(f"Erste Antwort nach {report['first_request_ms']:.0f} ms > Budget {options['budget_ms']:.0f} ms")
+        if options["save_baseline"]:
+            path = Path(options["baseline"])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2) + "\n")
+            self.stdout.write(f"Baseline gespeichert: {path}")
+        if options["check"]:
+            problems.extend(self.check_baseline(report, Path(options["baseline"]), options["tolerance"]))
+        if problems:
+            raise CommandError("Startzeit:\n  " + "\n  ".join(problems))
+        self.stdout.write(self.style.SUCCESS("Startzeit im Budget, keine schweren Abhängigkeiten beim Start"))
+
+    def check_baseline(self, report, path, tolerance):
+        if not path.exists():
+            raise CommandError(f"Keine Baseline unter {path}; zuerst mit --save-baseline erzeugen")
+        baseline = json.loads(path.read_text())
+        if baseline.get("path") != report["path"]:
+            raise CommandError(f"Baseline wurde mit {baseline.get('path')} gemessen, nicht mit {report['path']}")
+        regressions = []
+        for key in ("first_request_ms", "import_ms"):
+            if report[key] > baseline[key] * (1 + tolerance):
+                regressions.append(f"{key}: {report[key]:.0f} ms gegenüber {baseline[key]:.0f} ms")
+        return regressions
@@ -0,0 +1,219 @@
+import json
+import platform
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from viastore_app import jobs
+from viastore_app.models import Warehouse
+from viastore_app.spreadsheets import write_only_workbook
+from ._bench import bench_database, generate_dataset
+from .bench_touch_sync import percentile
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "baseline.json"
+
+
+def _workbook(rows, skus, warehouse_name):
+    workbook = write_only_workbook()
+    sheet = workbook.create_sheet()
+    sheet.append(["Name", "SKU", "Menge", "Lagername"])
+    for index in range(rows):
+        sheet.append([f"Import {index}", skus[index % len(skus)], index % 300, warehouse_name])
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+class Scenarios:
+    """Ein Request je Aufruf; ``data`` kommt aus generate_dataset."""
+
+    def __init__(self, data, import_rows):
+        self.data = data
+        # Touch-Eingabe ist numerisch: nur die EAN-SKUs
+        self.skus = [sku for sku in data["skus"] if sku.isdigit()]
+        warehouse_name = Warehouse.objects.get(pk=data["warehouse_ids"][0]).name
+        self.workbook = _workbook(import_rows, self.skus, warehouse_name) if import_rows else None
+
+    def touch_get(self, client, rng):
+        return client.get("/touch/")
+
+    def touch_post(self, client, rng):
+        return client.post("/touch/", {"item_name": rng.choice(self.skus), "quantity": 1})
+
+    def wareneingang_get(self, client, rng):
+        return client.get("/wareneingang/")
+
+    def wareneingang_post(self, client, rng):
+        return client.post("/wareneingang/", {"item": rng.choice(self.data["item_ids"]), "quantity": 1})
+
+    def bestandsauskunft(self, client, rng):
+        params = rng.choice([
+            {},
+            {"warehouse": rng.choice(self.data["warehouse_ids"])},
+            {"sku": rng.choice(self.skus)[:9]},
+            {"sort": "-quantity"},
+        ])
+        return client.get("/bestandsauskunft/", params)
+
+    def import_excel(self, client, rng):
+        upload = SimpleUploadedFile("bench.xlsx", self.workbook)
+        response = client.post("/import-excel/", {"file": upload})
+        # Verarbeitung durch den Worker gehört zur gemessenen Zeit
+        jobs.run_pending()
+        return response
+
+
+SCENARIOS = ["touch_get", "touch_post", "wareneingang_get", "wareneingang_post", "bestandsauskunft", "import_excel"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark der Buchungs-Hotpaths (/touch/, /wareneingang/, /bestandsauskunft/, Excel-Import) "
+        "mit Perzentilen, Durchsatz und Abfragezahlen; optional Vergleich mit gespeicherter Baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--warehouses", type=int, default=5)
+        parser.add_argument("--items", type=int, default=20_000)
+        parser.add_argument("--orders", type=int, default=50_000)
+        parser.add_argument("--requests", type=int, default=200, help="Requests je Szenario")
+        parser.add_argument("--concurrency", type=int, default=1, help="Parallele Clients (Threads)")
+        parser.add_argument("--import-rows", type=int, default=2000)
+        parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+        parser.add_argument("--save-baseline", action="store_true", help="Ergebnis als neue Baseline speichern")
+        parser.add_argument("--check", action="store_true", help="Gegen die Baseline prüfen, Exit-Code 1 bei Regression")
+        parser.add_argument("--tolerance", type=float, default=0.25, help="Erlaubte p95-Verschlechterung (0.25 = +25 %%)")
+        parser.add_argument("--output", help="Ergebnis zusätzlich als JSON schreiben")
+
+    def handle(self, *args, **options):
+        names = [name for name in options["scenarios"].split(",") if name]
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unbekannte Szenarien: {', '.join(sorted(unknown))}")
+        media_root = tempfile.mkdtemp(prefix="viastore-bench-")
+        # Keine externen Lookups und kein Sampling-Overhead während der Messung
+        overrides = override_settings(MEDIA_ROOT=media_root, VIASTORE_LOOKUP_PROVIDERS=[], VIASTORE_METRICS_SAMPLE_RATE=0)
+        try:
+            with overrides, bench_database():
+                started = time.perf_counter()
+                data = generate_dataset(options["warehouses"], options["items"], options["orders"], seed=options["seed"])
+                self.stdout.write(
+                    f"Daten: {options['warehouses']} Lager, {options['items']} Artikel, {options['orders']} Bestellungen "
+                    f"({time.perf_counter() - started:.1f} s)"
+                )
+                User.objects.create_user("bench")
+                scenarios = Scenarios(data, options["import_rows"] if "import_excel" in names else 0)
+                results = {name: self.run_scenario(getattr(scenarios, name), name, options) for name in names}
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        report = {
+            "dataset": {key: options[key] for key in ("warehouses", "items", "orders", "requests", "concurrency", "import_rows", "seed")},
+            "machine": {"python": platform.python_version(), "platform": platform.platform(), "database": connection.vendor},
+            "scenarios": results,
+        }
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2) + "\n")
+        if options["save_baseline"]:
+            path = Path(options["baseline"])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2) + "\n")
+            self.stdout.write(f"Baseline gespeichert: {path}")
+        if options["check"]:
+            self.check_baseline(report, Path(options["baseline"]), options["tolerance"])
+
+    def run_scenario(self, scenario, name, options):
+        latencies = []
+        queries = []
+        errors = []
+        lock = threading.Lock()
+        total = options["requests"] if name != "import_excel" else max(1, options["requests"] // 20)
+        workers = max(1, min(options["concurrency"], total))
+
+        def worker(index, count):
+            rng = random.Random(options["seed"] * 1000 + index)
+            client = Client()
+            client.force_login(User.objects.get(username="bench"))
+            scenario(client, rng)  # Aufwärmen (Template-Cache, Session)
+            own_latencies, own_queries = [], []
+            try:
+                for _ in range(count):
+                    with CaptureQueriesContext(connection) as captured:
+                        began = time.perf_counter()
+                        response = scenario(client, rng)
+                        own_latencies.append(time.perf_counter() - began)
+                    own_queries.append(len(captured.captured_queries))
+                    if response.status_code >= 400:
+                        with lock:
+                            errors.append(response.status_code)
+            finally:
+                if workers > 1:
+                    connection.close()
+                with lock:
+                    latencies.extend(own_latencies)
+                    queries.extend(own_queries)
+
+        started = time.perf_counter()
+        if workers == 1:
+            worker(0, total)
+        else:
+            threads = [threading.Thread(target=worker, args=(index, total // workers)) for index in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - started
+        result = {
+            "requests": len(latencies),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "mean_ms": round(statistics.mean(latencies) * 1000, 2) if latencies else 0,
+            "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0,
+            "queries_median": statistics.median(queries) if queries else 0,
+            "queries_max": max(queries, default=0),
+            "errors": len(errors),
+        }
+        self.stdout.write(
+            f"{name:18s} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+            f"{result['throughput_rps']:8.1f} req/s  Queries {result['queries_median']:g} (max {result['queries_max']})"
+            + (f"  Fehler {result['errors']}" if errors else "")
+        )
+        return result
+
+    def check_baseline(self, report, path, tolerance):
+        if not path.exists():
+            raise CommandError(f"Keine Baseline unter {path}; zuerst mit --save-baseline erzeugen")
+        baseline = json.loads(path.read_text())
+        if baseline.get("dataset") != report["dataset"]:
+            self.stderr.write("Warnung: Datensatz-Parameter weichen von der Baseline ab, Vergleich nur eingeschränkt aussagekräftig")
+        regressions = []
+        for name, result in report["scenarios"].items():
+            reference = baseline.get("scenarios", {}).get(name)
+            if not reference:
+                continue
+            if result["p95_ms"] > reference["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{name}: p95 {reference['p95_ms']} -> {result['p95_ms']} ms")
+            # Abfragezahlen sind maschinenunabhängig und werden exakt verglichen
+            if result["queries_median"] > reference["queries_median"]:
+                regressions.append(f"{name}: Queries {reference['queries_median']:g} -> {result['queries_median']:g}")
+            if result["errors"] > reference.get("errors", 0):
+                regressions.append(f"{name}: Fehler {reference.get('errors', 0)} -> {result['errors']}")
+        if regressions:
+            raise CommandError("Regression gegenüber Baseline:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS(f"Keine Regression gegenüber {path} (Toleranz p95 +{tolerance:.0%})"))
@@ -0,0 +1,67 @@
+import json
+import random
+import statistics
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from viastore_app.models import Warehouse, Item
+from ._bench import bench_database
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = "Misst die Zeit vom Scan bis zur Server-Bestätigung für die Offline-Touch-Synchronisation."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scans", type=int, default=2000, help="Anzahl Scans je Batchgröße")
+        parser.add_argument("--items", type=int, default=500)
+        parser.add_argument("--batch-sizes", default="1,10,50,100")
+        parser.add_argument("--duplicates", type=float, default=0.1, help="Anteil erneut gesendeter Scans")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with bench_database():
+            warehouse = Warehouse.objects.create(name="Lager Bench", location="-")
+            Item.objects.bulk_create(Item(name=f"Artikel {i}", sku=f"B{i:06d}", warehouse=warehouse) for i in range(options["items"]))
+            client = Client()
+            client.force_login(User.objects.create_user("bench"))
+            for batch_size in (int(size) for size in options["batch_sizes"].split(",")):
+                ack_latencies = []
+                request_latencies = []
+                sent = []
+                for start in range(0, options["scans"], batch_size):
+                    batch = []
+                    for _ in range(min(batch_size, options["scans"] - start)):
+                        scan = {"id": str(uuid.uuid4()), "sku": f"B{rng.randrange(options['items']):06d}", "quantity": 1}
+                        batch.append((time.perf_counter(), scan))
+                    # Wiederholungen nach verlorener Antwort, in zufälliger Reihenfolge
+                    replay = rng.sample(sent, min(len(sent), int(len(batch) * options["duplicates"])))
+                    payload = [scan for _, scan in batch] + replay
+                    rng.shuffle(payload)
+                    started = time.perf_counter()
+                    response = client.post(
+                        "/api/touch/sync/", json.dumps({"device_id": "bench", "scans": payload}), content_type="application/json"
+                    )
+                    acked_at = time.perf_counter()
+                    assert response.status_code == 200, response.content
+                    request_latencies.append(acked_at - started)
+                    ack_latencies.extend(acked_at - created for created, _ in batch)
+                    sent.extend(scan for _, scan in batch)
+                total = sum(request_latencies)
+                self.stdout.write(
+                    f"Batch {batch_size:4d}: Scan->Ack p50 {percentile(ack_latencies, 50) * 1000:7.1f} ms  "
+                    f"p95 {percentile(ack_latencies, 95) * 1000:7.1f} ms  p99 {percentile(ack_latencies, 99) * 1000:7.1f} ms  "
+                    f"Request Ø {statistics.mean(request_latencies) * 1000:6.1f} ms  {len(ack_latencies) / total:8.0f} Scans/s"
+                )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from viastore_app.stats import recompute
+
+
+class Command(BaseCommand):
+    help = "Berechnet die Dashboard-Kennzahlen vollständig neu (z.B. nächtlich per Cron)."
+
+    def handle(self, *args, **options):
+        count = recompute()
+        self.stdout.write(f"{count} Kennzahlen neu berechnet.")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from viastore_app.stock import reconcile
+
+
+class Command(BaseCommand):
+    help = "Berechnet alle Lagerplatz- und Artikelbestände aus dem Bestandsbuch (StockMovement) neu."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Abweichungen nur zählen, nichts ändern")
+
+    def handle(self, *args, **options):
+        count = reconcile(dry_run=options["dry_run"])
+        if options["dry_run"]:
+            self.stdout.write(f"{count} Artikel weichen vom Bestandsbuch ab.")
+        else:
+            self.stdout.write(f"{count} Artikelbestände aus dem Bestandsbuch korrigiert.")
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from viastore_app import replenishment
+
+
+class Command(BaseCommand):
+    help = (
+        "Berechnet Nachschubvorschläge für alle Meldebestand-Regeln neu (für Cron); "
+        "mit --confirm werden alle offenen Vorschläge als Bestellungen angelegt."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--confirm", action="store_true", help="Offene Vorschläge danach als Bestellungen anlegen")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = replenishment.scan()
+        self.stdout.write(
+            f"{result['created']} neue, {result['updated']} aktualisierte, {result['closed']} geschlossene Vorschläge "
+            f"({time.perf_counter() - started:.1f} s)"
+        )
+        if options["confirm"]:
+            ids = list(replenishment.open_suggestions().values_list("pk", flat=True))
+            self.stdout.write(f"{replenishment.confirm(ids)} Bestellungen angelegt.")
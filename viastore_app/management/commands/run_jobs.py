@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from viastore_app import jobs
+
+
+class Command(BaseCommand):
+    help = "Startet den Hintergrund-Worker für Importe und lange Lageroperationen."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Anzahl paralleler Worker-Threads")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Sekunden zwischen zwei Abfragen der Job-Tabelle")
+        parser.add_argument("--once", action="store_true", help="Nur wartende Jobs abarbeiten und dann beenden")
+        parser.add_argument(
+            "--requeue-after", type=int, default=10 * jobs.HEARTBEAT_INTERVAL,
+            help="Laufende Jobs ohne Lebenszeichen seit so vielen Sekunden neu einreihen",
+        )
+        parser.add_argument("--keep-failed-days", type=int, default=14, help="Uploads fehlgeschlagener Jobs so lange aufbewahren")
+
+    def handle(self, *args, **options):
+        requeued = jobs.requeue_stale(options["requeue_after"])
+        if requeued:
+            self.stdout.write(f"{requeued} hängende Jobs neu eingereiht.")
+        purged = jobs.purge_failed_uploads(options["keep_failed_days"])
+        if purged:
+            self.stdout.write(f"{purged} Uploads fehlgeschlagener Jobs gelöscht.")
+        self.stdout.write(f"Worker gestartet ({options['workers']} Threads).")
+        try:
+            jobs.work(workers=options["workers"], poll_interval=options["poll_interval"], once=options["once"])
+        except KeyboardInterrupt:
+            self.stdout.write("Worker beendet.")
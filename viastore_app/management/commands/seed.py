@@ -0,0 +1,64 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from viastore_app import seeding
+from viastore_app.models import Item
+
+
+class Command(BaseCommand):
+    help = (
+        "Erzeugt realistische Testdaten (Lager, Artikel, Bestellungen, Eröffnungsbestände) per Massen-INSERT. "
+        "Gleicher --seed und gleiches --reference-date ergeben identische Daten."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--warehouses", type=int, default=10)
+        parser.add_argument("--items", type=int, default=10_000)
+        parser.add_argument("--orders", type=int, default=50_000)
+        parser.add_argument("--days", type=int, default=365, help="Zeitraum der Bestelldaten in Tagen vor dem Stichtag")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--batch-size", type=int, default=seeding.DEFAULT_BATCH_SIZE, help="Zeilen je INSERT-Batch")
+        parser.add_argument("--reference-date", type=date.fromisoformat, help="Stichtag JJJJ-MM-TT (Standard: heute)")
+        parser.add_argument("--clear", action="store_true", help="Vorhandene Lager-, Artikel- und Bestelldaten vorher löschen")
+        parser.add_argument("--noinput", "--no-input", action="store_false", dest="interactive")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size muss mindestens 1 sein")
+        if options["clear"]:
+            if options["interactive"] and input("Alle Lager, Artikel und Bestellungen löschen? [j/N] ").strip().lower() != "j":
+                raise CommandError("Abgebrochen.")
+            seeding.clear()
+        elif Item.objects.exists():
+            raise CommandError("Die Datenbank enthält bereits Artikel; mit --clear vorher leeren.")
+
+        reported = {}
+
+        def progress(label, done, total):
+            # Etwa alle 10 % eine Zeile
+            step = max(total // 10, 1)
+            if done // step != reported.get(label) or done == total:
+                reported[label] = done // step
+                self.stdout.write(f"{label}: {done}/{total} ({time.perf_counter() - started:.1f} s)")
+
+        started = time.perf_counter()
+        try:
+            data = seeding.generate(
+                warehouses=options["warehouses"],
+                items=options["items"],
+                orders=options["orders"],
+                seed=options["seed"],
+                days=options["days"],
+                batch_size=options["batch_size"],
+                reference_date=options["reference_date"],
+                progress=progress,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(data['warehouse_ids'])} Lager, {len(data['item_ids'])} Artikel, {options['orders']} Bestellungen "
+            f"in {elapsed:.1f} s angelegt."
+        ))
@@ -0,0 +1,38 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from viastore_app import snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Schreibt den Stichtagsbestand je Lager und Artikel (für Cron, einmal täglich); "
+        "mit --prune werden alte Tagesabzüge auf Monatsstände verdichtet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--day", help="Stichtag JJJJ-MM-TT (Standard: heute)")
+        parser.add_argument("--replace", action="store_true", help="Vorhandenen Abzug des Tages neu schreiben")
+        parser.add_argument("--prune", action="store_true", help="Danach Aufbewahrung und Verdichtung anwenden")
+        parser.add_argument("--daily-days", type=int, default=snapshots.DAILY_DAYS, help="Tagesabzüge so viele Tage behalten")
+        parser.add_argument("--monthly-months", type=int, default=snapshots.MONTHLY_MONTHS, help="Monatsstände so viele Monate behalten (0 = unbegrenzt)")
+
+    def handle(self, *args, **options):
+        try:
+            day = date.fromisoformat(options["day"]) if options["day"] else None
+        except ValueError:
+            raise CommandError(f"Ungültiger Stichtag: {options['day']}")
+        started = time.perf_counter()
+        snapshot, created = snapshots.take(day, replace=options["replace"])
+        if created or options["replace"]:
+            self.stdout.write(f"{snapshot}: {snapshot.row_count} Zeilen geschrieben ({time.perf_counter() - started:.1f} s)")
+        else:
+            self.stdout.write(f"{snapshot} existiert bereits (--replace zum Überschreiben).")
+        if options["prune"]:
+            result = snapshots.prune(daily_days=options["daily_days"], monthly_months=options["monthly_months"])
+            self.stdout.write(
+                f"{result['downsampled']} Tagesabzüge verdichtet, {result['expired']} Monatsstände abgelaufen, "
+                f"{result['lines']} Zeilen gelöscht."
+            )
@@ -0,0 +1,178 @@
+"""
+Prozessinterne Metriken im Prometheus-Textformat (ohne prometheus_client).
+
+Die InstrumentationMiddleware misst je View Latenz, Anzahl und Dauer der
+DB-Abfragen, Template-Renderzeit und Zeit für ausgehende HTTP-Aufrufe. Werte
+werden pro Request in einem ContextVar gesammelt und am Ende in Histogramme
+übernommen. Bei mehreren Worker-Prozessen liefert jeder Prozess seine eigenen
+Werte; Prometheus aggregiert über die Instanzen.
+"""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.template.backends.django import DjangoTemplates, Template
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            values = {labels: ([*counts], total, count) for labels, (counts, total, count) in self._values.items()}
+        for labels, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, [le])} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {total}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {count}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(
+    Histogram("viastore_request_duration_seconds", "Antwortzeit je View", ["view", "method", "status"])
+)
+REQUEST_QUERIES = REGISTRY.register(
+    Histogram("viastore_request_db_queries", "DB-Abfragen je Request", ["view"], buckets=COUNT_BUCKETS)
+)
+REQUEST_DB_SECONDS = REGISTRY.register(Histogram("viastore_request_db_seconds", "DB-Zeit je Request", ["view"]))
+REQUEST_TEMPLATE_SECONDS = REGISTRY.register(
+    Histogram("viastore_request_template_seconds", "Template-Renderzeit je Request", ["view"])
+)
+REQUEST_HTTP_SECONDS = REGISTRY.register(
+    Histogram("viastore_request_outbound_http_seconds", "Wartezeit auf ausgehende HTTP-Aufrufe je Request", ["view"])
+)
+HTTP_CLIENT_SECONDS = REGISTRY.register(
+    Histogram("viastore_http_client_seconds", "Dauer ausgehender HTTP-Aufrufe", ["host", "status"])
+)
+SLOW_QUERIES = REGISTRY.register(Counter("viastore_slow_queries_total", "Abfragen über dem Schwellwert", ["view"]))
+NPLUSONE = REGISTRY.register(Counter("viastore_nplusone_total", "Erkannte N+1-Muster", ["view"]))
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "template_seconds", "http_seconds", "statements")
+
+    def __init__(self, track_statements=False):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.http_seconds = 0.0
+        # SQL-Vorlage (mit Platzhaltern) -> Anzahl; nur bei Stichproben-Requests
+        self.statements = {} if track_statements else None
+
+
+current = contextvars.ContextVar("viastore_request_stats", default=None)
+
+
+@contextmanager
+def outbound_http():
+    """Misst die Wartezeit des Requests auf (ggf. parallele) HTTP-Aufrufe."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = current.get()
+        if stats is not None:
+            stats.http_seconds += time.perf_counter() - started
+
+
+def record_http_response(response, *args, **kwargs):
+    # requests-Hook: Dauer je Zielhost (läuft auch in Executor-Threads)
+    HTTP_CLIENT_SECONDS.observe(response.elapsed.total_seconds(), response.url.split("/")[2], response.status_code)
+    return response
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = current.get()
+        if stats is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_seconds += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Django-Template-Backend, das die Renderzeit dem laufenden Request zuschreibt."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
@@ -0,0 +1,125 @@
+import contextvars
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from . import metrics
+
+logger = logging.getLogger("viastore_app.performance")
+
+# (request, Schwellwert in Sekunden) des gemessenen Requests. Wie metrics.current
+# reist die Variable über sync_to_async mit in den Thread der Datenbankverbindung.
+_current_request = contextvars.ContextVar("viastore_instrumented_request", default=None)
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else "<unresolved>"
+
+
+def _query_wrapper(execute, sql, params, many, context):
+    stats = metrics.current.get()
+    entry = _current_request.get()
+    if stats is None or entry is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        stats.queries += 1
+        stats.db_seconds += duration
+        if stats.statements is not None:
+            # sql enthält noch die Platzhalter: gleiche Vorlage = gleiches Muster
+            stats.statements[sql] = stats.statements.get(sql, 0) + 1
+        request, slow_query_seconds = entry
+        if duration >= slow_query_seconds:
+            view = _view_name(request)
+            metrics.SLOW_QUERIES.inc(view)
+            logger.warning("Langsame Abfrage in %s (%.0f ms): %s", view, duration * 1000, sql)
+
+
+def _instrument(connection, **kwargs):
+    # Einmal je Verbindungsobjekt (und Thread) statt je Request; ohne gemessenen
+    # Request reicht der Wrapper die Abfrage unverändert durch
+    if _query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_query_wrapper)
+
+
+# Neue Verbindungen, auch in den Threads von sync_to_async (Async-Views)
+connection_created.connect(_instrument, dispatch_uid="viastore_query_metrics")
+
+
+class InstrumentationMiddleware:
+    """Misst Latenz, DB-Abfragen, Template- und HTTP-Zeit je View (siehe metrics.py)
+    und protokolliert langsame Abfragen sowie N+1-Muster.
+
+    Einstellungen: VIASTORE_SLOW_QUERY_MS (Schwellwert je Abfrage),
+    VIASTORE_NPLUSONE_THRESHOLD (gleiche Abfrage n-mal pro Request) und
+    VIASTORE_METRICS_SAMPLE_RATE (Anteil Requests mit SQL-Mustererkennung).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_query_seconds = getattr(settings, "VIASTORE_SLOW_QUERY_MS", 200) / 1000
+        self.nplusone_threshold = getattr(settings, "VIASTORE_NPLUSONE_THRESHOLD", 10)
+        self.sample_rate = getattr(settings, "VIASTORE_METRICS_SAMPLE_RATE", 0.1)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Bereits vor dem Laden der Middleware geöffnete Verbindungen dieses Threads
+        for connection in connections.all(initialized_only=False):
+            _instrument(connection)
+        stats, tokens = self._start(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            self._finish(tokens)
+        self._record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        # Async-Views (SSE): DB-Abfragen laufen per sync_to_async in Threads und
+        # werden dort über den Kontext diesem Request zugeordnet
+        stats, tokens = self._start(request)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self._finish(tokens)
+        self._record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def _start(self, request):
+        stats = metrics.RequestStats(track_statements=random.random() < self.sample_rate)
+        tokens = (metrics.current.set(stats), _current_request.set((request, self.slow_query_seconds)))
+        return stats, tokens
+
+    def _finish(self, tokens):
+        stats_token, request_token = tokens
+        _current_request.reset(request_token)
+        metrics.current.reset(stats_token)
+
+    def _record(self, request, response, stats, elapsed):
+        view = _view_name(request)
+        metrics.REQUEST_SECONDS.observe(elapsed, view, request.method, response.status_code)
+        metrics.REQUEST_QUERIES.observe(stats.queries, view)
+        metrics.REQUEST_DB_SECONDS.observe(stats.db_seconds, view)
+        metrics.REQUEST_TEMPLATE_SECONDS.observe(stats.template_seconds, view)
+        metrics.REQUEST_HTTP_SECONDS.observe(stats.http_seconds, view)
+        for sql, count in (stats.statements or {}).items():
+            if count >= self.nplusone_threshold:
+                metrics.NPLUSONE.inc(view)
+                logger.warning("Mögliches N+1 in %s: %d× %s", view, count, sql)
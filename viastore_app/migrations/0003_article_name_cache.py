@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("viastore_app", "0002_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleNameCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sku", models.CharField(max_length=50, unique=True)),
+                ("name", models.CharField(blank=True, max_length=200)),
+                ("provider", models.CharField(blank=True, max_length=50)),
+                ("expires_at", models.DateTimeField(db_index=True)),
+                ("last_used_at", models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
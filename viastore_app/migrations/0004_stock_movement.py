@@ -0,0 +1,105 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def opening_balances(apps, schema_editor):
+    # Vorhandene Bestände als Eröffnungsbuchung übernehmen, damit das
+    # Bestandsbuch von Anfang an mit Item.quantity übereinstimmt
+    Item = apps.get_model("viastore_app", "Item")
+    StockMovement = apps.get_model("viastore_app", "StockMovement")
+    batch = []
+    for pk, quantity in (
+        Item.objects.filter(quantity__gt=0)
+        .values_list("pk", "quantity")
+        .iterator(chunk_size=2000)
+    ):
+        batch.append(
+            StockMovement(
+                item_id=pk,
+                kind="correction",
+                quantity=quantity,
+                note="Eröffnungsbestand",
+            )
+        )
+        if len(batch) >= 2000:
+            StockMovement.objects.bulk_create(batch)
+            batch = []
+    StockMovement.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("viastore_app", "0003_article_name_cache"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockMovement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("receipt", "Wareneingang"),
+                            ("correction", "Bestandskorrektur"),
+                            ("order", "Bestellung"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("quantity", models.IntegerField()),
+                ("note", models.CharField(blank=True, max_length=200)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="movements",
+                        to="viastore_app.item",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="movements",
+                        to="viastore_app.order",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["item", "created_at"],
+                        name="viastore_ap_item_id_cc1a0d_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(opening_balances, migrations.RunPython.noop),
+    ]
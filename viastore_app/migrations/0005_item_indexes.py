@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("viastore_app", "0004_stock_movement"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(fields=["name"], name="viastore_ap_name_ceeb8d_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["warehouse", "name"], name="viastore_ap_warehou_c68f2d_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("viastore_app", "0005_item_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=50, unique=True)),
+                ("value", models.BigIntegerField(default=0)),
+                ("day", models.DateField(blank=True, db_index=True, null=True)),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stats",
+                        to="viastore_app.warehouse",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("viastore_app", "0007_receipt_batch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TouchScan",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("scan_id", models.UUIDField(unique=True)),
+                ("device_id", models.CharField(blank=True, max_length=64)),
+                ("sku", models.CharField(max_length=50)),
+                ("quantity", models.PositiveIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("booked", "Gebucht"), ("rejected", "Abgelehnt")],
+                        max_length=10,
+                    ),
+                ),
+                ("error", models.CharField(blank=True, max_length=200)),
+                ("scanned_at", models.DateTimeField(blank=True, null=True)),
+                ("received_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "item",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="viastore_app.item",
+                    ),
+                ),
+            ],
+        ),
+    ]
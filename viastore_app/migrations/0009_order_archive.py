@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("viastore_app", "0008_touch_scan"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderArchive",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("order_number", models.CharField(max_length=50, unique=True)),
+                ("quantity", models.PositiveIntegerField()),
+                ("order_date", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["order_date", "id"], name="order_date_id_idx"),
+        ),
+        migrations.AddField(
+            model_name="orderarchive",
+            name="item",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_orders",
+                to="viastore_app.item",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="orderarchive",
+            index=models.Index(
+                fields=["order_date", "id"], name="order_archive_date_id_idx"
+            ),
+        ),
+    ]
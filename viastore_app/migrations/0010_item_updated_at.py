@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("viastore_app", "0009_order_archive"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="item",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(fields=["updated_at", "id"], name="item_updated_id_idx"),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("viastore_app", "0010_item_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stockmovement",
+            name="bin",
+            field=models.CharField(blank=True, default="", max_length=30),
+        ),
+        migrations.AddField(
+            model_name="stockmovement",
+            name="warehouse",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="movements",
+                to="viastore_app.warehouse",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="stockmovement",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("receipt", "Wareneingang"),
+                    ("correction", "Bestandskorrektur"),
+                    ("order", "Bestellung"),
+                    ("transfer", "Umlagerung"),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.CreateModel(
+            name="StockLevel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bin", models.CharField(blank=True, default="", max_length=30)),
+                ("quantity", models.PositiveIntegerField(default=0)),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_levels",
+                        to="viastore_app.item",
+                    ),
+                ),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_levels",
+                        to="viastore_app.warehouse",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["warehouse", "item"],
+                        name="stock_level_warehouse_item_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("item", "warehouse", "bin"),
+                        name="stock_level_item_warehouse_bin_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,178 @@
+from django.db import NotSupportedError, migrations, transaction
+from django.db.models import Exists, OuterRef, Subquery
+
+BATCH_SIZE = 5000
+
+# Gleiches Textformat wie Django (sechs Nachkommastellen), damit Vergleiche
+# mit Parametern aus dem ORM (Delta-Feed, Keyset-Cursor) stimmen
+SQLITE_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'"
+
+SQLITE_TRIGGERS = [
+    # Gesamtbestand und Änderungszeitpunkt des Artikels folgen jeder Lagerplatzänderung
+    """
+    CREATE TRIGGER viastore_stocklevel_insert AFTER INSERT ON viastore_app_stocklevel
+    BEGIN
+        UPDATE viastore_app_item SET quantity = quantity + NEW.quantity,
+            updated_at = {now} WHERE id = NEW.item_id;
+    END
+    """,
+    """
+    CREATE TRIGGER viastore_stocklevel_update AFTER UPDATE OF quantity, item_id ON viastore_app_stocklevel
+    BEGIN
+        UPDATE viastore_app_item SET quantity = quantity + NEW.quantity - OLD.quantity,
+            updated_at = {now} WHERE id = NEW.item_id AND NEW.item_id = OLD.item_id;
+        UPDATE viastore_app_item SET quantity = quantity - OLD.quantity,
+            updated_at = {now} WHERE id = OLD.item_id AND NEW.item_id <> OLD.item_id;
+        UPDATE viastore_app_item SET quantity = quantity + NEW.quantity,
+            updated_at = {now} WHERE id = NEW.item_id AND NEW.item_id <> OLD.item_id;
+    END
+    """,
+    """
+    CREATE TRIGGER viastore_stocklevel_delete AFTER DELETE ON viastore_app_stocklevel
+    BEGIN
+        UPDATE viastore_app_item SET quantity = quantity - OLD.quantity,
+            updated_at = {now} WHERE id = OLD.item_id;
+    END
+    """,
+    # Neuer Artikel: angegebene Menge wird zum Bestand des Standardplatzes im Stammlager
+    """
+    CREATE TRIGGER viastore_item_insert AFTER INSERT ON viastore_app_item
+    BEGIN
+        UPDATE viastore_app_item SET quantity = 0 WHERE id = NEW.id;
+        INSERT INTO viastore_app_stocklevel (item_id, warehouse_id, bin, quantity)
+            VALUES (NEW.id, NEW.warehouse_id, '', NEW.quantity);
+    END
+    """,
+]
+SQLITE_TRIGGERS = [sql.replace("{now}", SQLITE_NOW) for sql in SQLITE_TRIGGERS]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS viastore_stocklevel_insert",
+    "DROP TRIGGER IF EXISTS viastore_stocklevel_update",
+    "DROP TRIGGER IF EXISTS viastore_stocklevel_delete",
+    "DROP TRIGGER IF EXISTS viastore_item_insert",
+]
+
+POSTGRES_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION viastore_stocklevel_total() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW.item_id = OLD.item_id THEN
+            UPDATE viastore_app_item SET quantity = quantity + NEW.quantity - OLD.quantity, updated_at = now()
+                WHERE id = NEW.item_id;
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE viastore_app_item SET quantity = quantity - OLD.quantity, updated_at = now() WHERE id = OLD.item_id;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'INSERT') THEN
+            UPDATE viastore_app_item SET quantity = quantity + NEW.quantity, updated_at = now() WHERE id = NEW.item_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER viastore_stocklevel_total
+        AFTER INSERT OR UPDATE OF quantity, item_id OR DELETE ON viastore_app_stocklevel
+        FOR EACH ROW EXECUTE FUNCTION viastore_stocklevel_total()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION viastore_item_opening_level() RETURNS trigger AS $$
+    BEGIN
+        UPDATE viastore_app_item SET quantity = 0 WHERE id = NEW.id;
+        INSERT INTO viastore_app_stocklevel (item_id, warehouse_id, bin, quantity)
+            VALUES (NEW.id, NEW.warehouse_id, '', NEW.quantity);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER viastore_item_insert AFTER INSERT ON viastore_app_item
+        FOR EACH ROW EXECUTE FUNCTION viastore_item_opening_level()
+    """,
+]
+POSTGRES_DROP = [
+    "DROP TRIGGER IF EXISTS viastore_stocklevel_total ON viastore_app_stocklevel",
+    "DROP FUNCTION IF EXISTS viastore_stocklevel_total()",
+    "DROP TRIGGER IF EXISTS viastore_item_insert ON viastore_app_item",
+    "DROP FUNCTION IF EXISTS viastore_item_opening_level()",
+]
+
+
+SUPPORTED_VENDORS = ("sqlite", "postgresql")
+
+
+def check_backend(apps, schema_editor):
+    # Vor jeder Änderung abbrechen, statt halb migriert stehenzubleiben
+    vendor = schema_editor.connection.vendor
+    if vendor not in SUPPORTED_VENDORS:
+        raise NotSupportedError(f"Bestands-Trigger gibt es nur für {', '.join(SUPPORTED_VENDORS)}, nicht für {vendor}")
+
+
+def backfill(apps, schema_editor):
+    # Je Batch eine eigene kurze Transaktion (Migration ist nicht atomar):
+    # fehlenden Standardplatz im Stammlager mit dem bisherigen Bestand anlegen und
+    # die Altbuchungen diesem Platz zuordnen. Wiederholbar nach Abbruch: Trigger
+    # eines früheren Laufs werden zuerst entfernt (sonst zählten die neuen Plätze
+    # doppelt), vorhandene Plätze und zugeordnete Buchungen bleiben unberührt.
+    _run(schema_editor, _drop_statements(schema_editor))
+    Item = apps.get_model("viastore_app", "Item")
+    StockLevel = apps.get_model("viastore_app", "StockLevel")
+    StockMovement = apps.get_model("viastore_app", "StockMovement")
+    db = schema_editor.connection.alias
+    home = Subquery(Item.objects.filter(pk=OuterRef("item_id")).values("warehouse_id")[:1])
+    has_level = StockLevel.objects.using(db).filter(item_id=OuterRef("pk"), warehouse_id=OuterRef("warehouse_id"), bin="")
+    last = 0
+    while True:
+        with transaction.atomic(using=db):
+            ids = list(Item.objects.using(db).filter(pk__gt=last).order_by("pk").values_list("pk", flat=True)[:BATCH_SIZE])
+            if not ids:
+                break
+            batch = Item.objects.using(db).filter(pk__gt=last, pk__lte=ids[-1])
+            StockLevel.objects.using(db).bulk_create(
+                StockLevel(item_id=pk, warehouse_id=warehouse_id, bin="", quantity=quantity)
+                for pk, warehouse_id, quantity in batch.filter(~Exists(has_level)).values_list("pk", "warehouse_id", "quantity")
+            )
+            StockMovement.objects.using(db).filter(
+                item_id__gt=last, item_id__lte=ids[-1], warehouse__isnull=True
+            ).update(warehouse_id=home)
+        last = ids[-1]
+
+
+def _run(schema_editor, statements):
+    with schema_editor.connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def _drop_statements(schema_editor):
+    return SQLITE_DROP if schema_editor.connection.vendor == "sqlite" else POSTGRES_DROP
+
+
+def create_triggers(apps, schema_editor):
+    # Erst nach dem Backfill, sonst würden die Bestände doppelt gezählt.
+    # Buchungen zwischen Backfill und Trigger korrigiert reconcile_stock.
+    # Alle Trigger in einer Transaktion (beide Datenbanken haben transaktionale DDL)
+    vendor = schema_editor.connection.vendor
+    with transaction.atomic(using=schema_editor.connection.alias):
+        _run(schema_editor, _drop_statements(schema_editor))
+        _run(schema_editor, SQLITE_TRIGGERS if vendor == "sqlite" else POSTGRES_TRIGGERS)
+
+
+def drop_triggers(apps, schema_editor):
+    _run(schema_editor, _drop_statements(schema_editor))
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("viastore_app", "0011_stock_level"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_backend, migrations.RunPython.noop),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("viastore_app", "0012_stock_level_backfill"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ItemBarcode",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("code", models.CharField(max_length=50, unique=True)),
+                ("pack_size", models.PositiveIntegerField(default=1)),
+                ("description", models.CharField(blank=True, max_length=100)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="barcodes",
+                        to="viastore_app.item",
+                    ),
+                ),
+            ],
+        ),
+    ]
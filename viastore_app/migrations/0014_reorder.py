@@ -0,0 +1,152 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("viastore_app", "0013_item_barcode"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReorderRule",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("reorder_point", models.PositiveIntegerField()),
+                ("max_quantity", models.PositiveIntegerField()),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reorder_rules",
+                        to="viastore_app.item",
+                    ),
+                ),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reorder_rules",
+                        to="viastore_app.warehouse",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ReorderSuggestion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("on_hand", models.PositiveIntegerField()),
+                ("quantity", models.PositiveIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("open", "Offen"),
+                            ("ordered", "Bestellt"),
+                            ("dismissed", "Verworfen"),
+                        ],
+                        default="open",
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("closed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reorder_suggestions",
+                        to="viastore_app.item",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="reorder_suggestions",
+                        to="viastore_app.order",
+                    ),
+                ),
+                (
+                    "rule",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="suggestions",
+                        to="viastore_app.reorderrule",
+                    ),
+                ),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reorder_suggestions",
+                        to="viastore_app.warehouse",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="reorderrule",
+            constraint=models.UniqueConstraint(
+                fields=("item", "warehouse"), name="reorder_rule_item_warehouse_uniq"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="reorderrule",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("warehouse", None)),
+                fields=("item",),
+                name="reorder_rule_item_total_uniq",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="reorderrule",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("max_quantity__gte", models.F("reorder_point"))),
+                name="reorder_rule_max_gte_point",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reordersuggestion",
+            index=models.Index(
+                condition=models.Q(("closed_at", None)),
+                fields=["status", "on_hand", "id"],
+                name="reorder_suggestion_open_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="reordersuggestion",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("closed_at", None)),
+                fields=("rule",),
+                name="reorder_suggestion_active_uniq",
+            ),
+        ),
+    ]
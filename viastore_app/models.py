@@ -1,4 +1,5 @@
 
+from django.conf import settings
 from django.db import models
 
 class Warehouse(models.Model):
@@ -11,17 +12,267 @@ class Warehouse(models.Model):
 class Item(models.Model):
 	name = models.CharField(max_length=100)
 	sku = models.CharField(max_length=50, unique=True)
+	# Gesamtbestand = Summe der StockLevel-Zeilen, per Datenbank-Trigger gepflegt (Migration 0012)
 	quantity = models.PositiveIntegerField(default=0)
+	# Stammlager: Ziel von Buchungen ohne Lagerangabe
 	warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE, related_name='items')
+	# Basis für ETag/Last-Modified und den Delta-Feed; update()-Pfade setzen es selbst
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["name"]),
+			models.Index(fields=["warehouse", "name"]),
+			models.Index(fields=["updated_at", "id"], name="item_updated_id_idx"),
+		]
 
 	def __str__(self):
 		return f"{self.name} ({self.sku})"
 
+class StockLevel(models.Model):
+	# Bestand je Artikel, Lager und Lagerplatz; bin "" ist der Standardplatz eines Lagers
+	item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="stock_levels")
+	warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE, related_name="stock_levels")
+	bin = models.CharField(max_length=30, blank=True, default="")
+	quantity = models.PositiveIntegerField(default=0)
+
+	class Meta:
+		constraints = [models.UniqueConstraint(fields=["item", "warehouse", "bin"], name="stock_level_item_warehouse_bin_uniq")]
+		# Aggregation je Lager und Filter "Artikel im Lager X"
+		indexes = [models.Index(fields=["warehouse", "item"], name="stock_level_warehouse_item_idx")]
+
+	def __str__(self):
+		location = f"{self.warehouse_id}/{self.bin}" if self.bin else str(self.warehouse_id)
+		return f"{self.item_id} @ {location}: {self.quantity}"
+
+class ItemBarcode(models.Model):
+	# Zusätzlicher Code eines Artikels (Hersteller-EAN, UPC, Gebinde-GTIN);
+	# code ist normalisiert (barcodes.normalize), der Unique-Index dient dem Scan-Lookup
+	code = models.CharField(max_length=50, unique=True)
+	item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="barcodes")
+	# Einzelstücke je Scan, z.B. 12 für den Karton-Code
+	pack_size = models.PositiveIntegerField(default=1)
+	description = models.CharField(max_length=100, blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	def __str__(self):
+		suffix = f" x{self.pack_size}" if self.pack_size != 1 else ""
+		return f"{self.code} -> {self.item_id}{suffix}"
+
 class Order(models.Model):
 	order_number = models.CharField(max_length=50, unique=True)
 	item = models.ForeignKey(Item, on_delete=models.CASCADE)
 	quantity = models.PositiveIntegerField()
 	order_date = models.DateTimeField(auto_now_add=True)
 
+	is_archived = False
+
+	class Meta:
+		indexes = [models.Index(fields=["order_date", "id"], name="order_date_id_idx")]
+
 	def __str__(self):
 		return f"Order {self.order_number}"
+
+class OrderArchive(models.Model):
+	# Archivierte Bestellung; id bleibt die der ursprünglichen Order, damit
+	# (order_date, id) über beide Tabellen eindeutig sortierbar ist
+	id = models.BigIntegerField(primary_key=True)
+	order_number = models.CharField(max_length=50, unique=True)
+	item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="archived_orders")
+	quantity = models.PositiveIntegerField()
+	order_date = models.DateTimeField()
+	archived_at = models.DateTimeField(auto_now_add=True)
+
+	is_archived = True
+
+	class Meta:
+		indexes = [models.Index(fields=["order_date", "id"], name="order_archive_date_id_idx")]
+
+	def __str__(self):
+		return f"Order {self.order_number} (Archiv)"
+
+class Job(models.Model):
+	STATUS_QUEUED = "queued"
+	STATUS_RUNNING = "running"
+	STATUS_DONE = "done"
+	STATUS_FAILED = "failed"
+	STATUS_CHOICES = [
+		(STATUS_QUEUED, "Wartend"),
+		(STATUS_RUNNING, "Läuft"),
+		(STATUS_DONE, "Fertig"),
+		(STATUS_FAILED, "Fehlgeschlagen"),
+	]
+
+	kind = models.CharField(max_length=50)
+	status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+	payload = models.JSONField(default=dict, blank=True)
+	upload = models.FileField(upload_to="jobs/", blank=True)
+	progress_done = models.PositiveIntegerField(default=0)
+	progress_total = models.PositiveIntegerField(null=True, blank=True)
+	result = models.JSONField(null=True, blank=True)
+	error = models.TextField(blank=True)
+	created_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+	created_at = models.DateTimeField(auto_now_add=True)
+	started_at = models.DateTimeField(null=True, blank=True)
+	# Lebenszeichen des Workers (Fortschritt bzw. periodisch); veraltet = Worker abgestürzt
+	heartbeat_at = models.DateTimeField(null=True, blank=True)
+	finished_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		indexes = [models.Index(fields=["status", "id"])]
+
+	def __str__(self):
+		return f"Job {self.pk} ({self.kind}, {self.status})"
+
+class ArticleNameCache(models.Model):
+	# Leerer Name = negativer Eintrag (kein Provider kennt die SKU)
+	sku = models.CharField(max_length=50, unique=True)
+	name = models.CharField(max_length=200, blank=True)
+	provider = models.CharField(max_length=50, blank=True)
+	expires_at = models.DateTimeField(db_index=True)
+	last_used_at = models.DateTimeField(db_index=True)
+
+	def __str__(self):
+		return f"{self.sku}: {self.name or '-'}"
+
+class StockMovement(models.Model):
+	# Append-only Bestandsbuch: jede StockLevel-Zeile ist die Summe ihrer Bewegungen
+	KIND_RECEIPT = "receipt"
+	KIND_CORRECTION = "correction"
+	KIND_ORDER = "order"
+	KIND_TRANSFER = "transfer"
+	KIND_CHOICES = [
+		(KIND_RECEIPT, "Wareneingang"),
+		(KIND_CORRECTION, "Bestandskorrektur"),
+		(KIND_ORDER, "Bestellung"),
+		(KIND_TRANSFER, "Umlagerung"),
+	]
+
+	item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="movements")
+	# Gebuchter Lagerplatz; leer nur bei Altbuchungen vor der Migration 0012
+	warehouse = models.ForeignKey(Warehouse, null=True, blank=True, on_delete=models.CASCADE, related_name="movements")
+	bin = models.CharField(max_length=30, blank=True, default="")
+	kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+	quantity = models.IntegerField()
+	order = models.ForeignKey(Order, null=True, blank=True, on_delete=models.SET_NULL, related_name="movements")
+	user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+	note = models.CharField(max_length=200, blank=True)
+	created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+	class Meta:
+		indexes = [models.Index(fields=["item", "created_at"])]
+
+	def __str__(self):
+		return f"{self.get_kind_display()} {self.quantity:+d} {self.item_id}"
+
+class StatCounter(models.Model):
+	# Vorberechnete Dashboard-Kennzahlen, inkrementell gepflegt (viastore_app.stats)
+	key = models.CharField(max_length=50, unique=True)
+	value = models.BigIntegerField(default=0)
+	warehouse = models.ForeignKey(Warehouse, null=True, blank=True, on_delete=models.CASCADE, related_name="stats")
+	day = models.DateField(null=True, blank=True, db_index=True)
+
+	def __str__(self):
+		return f"{self.key} = {self.value}"
+
+class ReceiptBatch(models.Model):
+	# Idempotenz für Sammelbuchungen: gleiche batch_id liefert das gespeicherte Ergebnis
+	batch_id = models.CharField(max_length=64, unique=True)
+	user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+	line_count = models.PositiveIntegerField(default=0)
+	result = models.JSONField(null=True, blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	def __str__(self):
+		return f"Batch {self.batch_id}"
+
+class TouchScan(models.Model):
+	# Einzelscan der Offline-Touch-App; scan_id wird auf dem Tablet erzeugt und dedupliziert Wiederholungen
+	STATUS_BOOKED = "booked"
+	STATUS_REJECTED = "rejected"
+	STATUS_CHOICES = [(STATUS_BOOKED, "Gebucht"), (STATUS_REJECTED, "Abgelehnt")]
+
+	scan_id = models.UUIDField(unique=True)
+	device_id = models.CharField(max_length=64, blank=True)
+	sku = models.CharField(max_length=50)
+	quantity = models.PositiveIntegerField()
+	item = models.ForeignKey(Item, null=True, blank=True, on_delete=models.SET_NULL)
+	status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+	error = models.CharField(max_length=200, blank=True)
+	scanned_at = models.DateTimeField(null=True, blank=True)
+	received_at = models.DateTimeField(auto_now_add=True)
+
+	def __str__(self):
+		return f"Scan {self.scan_id} ({self.sku} x {self.quantity})"
+
+class ReorderRule(models.Model):
+	# Meldebestand/Höchstbestand je Artikel (warehouse leer = Gesamtbestand) oder je Artikel und Lager
+	item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="reorder_rules")
+	warehouse = models.ForeignKey(Warehouse, null=True, blank=True, on_delete=models.CASCADE, related_name="reorder_rules")
+	reorder_point = models.PositiveIntegerField()
+	# Auffüllen bis zu diesem Bestand
+	max_quantity = models.PositiveIntegerField()
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["item", "warehouse"], name="reorder_rule_item_warehouse_uniq"),
+			models.UniqueConstraint(fields=["item"], condition=models.Q(warehouse=None), name="reorder_rule_item_total_uniq"),
+			models.CheckConstraint(condition=models.Q(max_quantity__gte=models.F("reorder_point")), name="reorder_rule_max_gte_point"),
+		]
+
+	def __str__(self):
+		scope = f" @ {self.warehouse_id}" if self.warehouse_id else ""
+		return f"{self.item_id}{scope}: {self.reorder_point}/{self.max_quantity}"
+
+class ReorderSuggestion(models.Model):
+	# Nachschubvorschlag aus replenishment.scan(); solange closed_at leer ist, entsteht
+	# für die Regel kein weiterer. Geschlossen wird er, sobald der Bestand wieder über
+	# dem Meldebestand liegt.
+	STATUS_OPEN = "open"
+	STATUS_ORDERED = "ordered"
+	STATUS_DISMISSED = "dismissed"
+	STATUS_CHOICES = [(STATUS_OPEN, "Offen"), (STATUS_ORDERED, "Bestellt"), (STATUS_DISMISSED, "Verworfen")]
+
+	rule = models.ForeignKey(ReorderRule, on_delete=models.CASCADE, related_name="suggestions")
+	item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="reorder_suggestions")
+	warehouse = models.ForeignKey(Warehouse, null=True, blank=True, on_delete=models.CASCADE, related_name="reorder_suggestions")
+	on_hand = models.PositiveIntegerField()
+	quantity = models.PositiveIntegerField()
+	status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_OPEN)
+	order = models.ForeignKey(Order, null=True, blank=True, on_delete=models.SET_NULL, related_name="reorder_suggestions")
+	created_at = models.DateTimeField(auto_now_add=True)
+	updated_at = models.DateTimeField(auto_now=True)
+	closed_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		constraints = [models.UniqueConstraint(fields=["rule"], condition=models.Q(closed_at=None), name="reorder_suggestion_active_uniq")]
+		# Liste und Dashboard: offene Vorschläge, niedrigster Bestand zuerst
+		indexes = [models.Index(fields=["status", "on_hand", "id"], condition=models.Q(closed_at=None), name="reorder_suggestion_open_idx")]
+
+	def __str__(self):
+		return f"Nachschub {self.item_id}: {self.quantity} ({self.get_status_display()})"
+
+class StockSnapshot(models.Model):
+	# Stichtag eines Bestandsabzugs (viastore_app.snapshots); je Tag höchstens einer
+	day = models.DateField(unique=True)
+	taken_at = models.DateTimeField()
+	row_count = models.PositiveIntegerField(default=0)
+
+	def __str__(self):
+		return f"Bestand {self.day:%d.%m.%Y} ({self.row_count} Zeilen)"
+
+class StockSnapshotLine(models.Model):
+	# Bestand je Artikel und Lager (Summe der Lagerplätze) am Stichtag; nur Bestände > 0,
+	# fehlende Zeile = 0. Der Unique-Index (snapshot, warehouse, item) bedient Stichtags-
+	# und Differenzabfragen je Lager.
+	# Eigener Index überflüssig: snapshot ist Präfix des Unique-Index
+	snapshot = models.ForeignKey(StockSnapshot, on_delete=models.CASCADE, related_name="lines", db_index=False)
+	warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE, related_name="snapshot_lines")
+	item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="snapshot_lines")
+	quantity = models.PositiveIntegerField()
+
+	class Meta:
+		constraints = [models.UniqueConstraint(fields=["snapshot", "warehouse", "item"], name="stock_snapshot_line_uniq")]
+
+	def __str__(self):
+		return f"{self.snapshot_id}/{self.warehouse_id}/{self.item_id}: {self.quantity}"
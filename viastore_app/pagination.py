@@ -0,0 +1,163 @@
+import base64
+import json
+from dataclasses import dataclass
+
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Bis zu dieser Größe wird exakt gezählt, darüber geschätzt bzw. gedeckelt
+COUNT_LIMIT = 10_000
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: str = None
+    previous_cursor: str = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def encode_cursor(values, direction):
+    raw = json.dumps({"v": values, "d": direction}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None, "next"
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return list(data["v"]), data["d"] if data["d"] in ("next", "prev") else "next"
+    except (ValueError, KeyError, TypeError):
+        # Ungültiger Cursor: wieder bei der ersten Seite beginnen
+        return None, "next"
+
+
+def _after(fields, values, descending):
+    # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y), ohne OFFSET
+    condition = Q()
+    for index, field in enumerate(fields):
+        lookup = "lt" if descending[index] else "gt"
+        term = Q(**{f"{field}__{lookup}": values[index]})
+        for previous, value in zip(fields[:index], values[:index]):
+            term &= Q(**{previous: value})
+        condition |= term
+    return condition
+
+
+def paginate_keyset(queryset, ordering, cursor=None, page_size=DEFAULT_PAGE_SIZE, value_getters=None):
+    """Blättert per Cursor (Keyset) statt OFFSET.
+
+    ``ordering`` ist eine Liste wie ``["name", "pk"]`` bzw. ``["-order_date", "-pk"]``
+    und muss eindeutig sein (letztes Feld z.B. pk). ``queryset`` darf auch eine
+    Liste von Querysets sein (z.B. aktuelle und archivierte Bestellungen); jede
+    wird mit demselben Keyset-Filter gelesen und das Ergebnis zusammengeführt.
+    """
+    fields = [field.lstrip("-") for field in ordering]
+    descending = [field.startswith("-") for field in ordering]
+    getters = value_getters or {}
+    values, direction = decode_cursor(cursor)
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+    if direction == "prev":
+        # Rückwärts blättern: Sortierung umdrehen und Ergebnis wieder umkehren
+        lookup_desc = [not desc for desc in descending]
+        order = [f"-{f}" if d else f for f, d in zip(fields, lookup_desc)]
+    else:
+        lookup_desc = descending
+        order = list(ordering)
+    querysets = queryset if isinstance(queryset, (list, tuple)) else [queryset]
+    if values is None or len(values) != len(fields):
+        values = None
+
+    def key(obj):
+        return [getters[field](obj) if field in getters else getattr(obj, field) for field in fields]
+
+    rows = []
+    for part in querysets:
+        if values is not None:
+            part = part.filter(_after(fields, values, lookup_desc))
+        rows.extend(part.order_by(*order)[: page_size + 1])
+    if len(querysets) > 1:
+        # Stabil von hinten nach vorn sortieren, damit gemischte Richtungen stimmen
+        for index in reversed(range(len(fields))):
+            rows.sort(key=lambda obj: key(obj)[index], reverse=lookup_desc[index])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == "prev":
+        rows.reverse()
+
+    page = KeysetPage(rows)
+    if rows:
+        if direction == "next" and has_more or direction == "prev" and values is not None:
+            page.next_cursor = encode_cursor(key(rows[-1]), "next")
+        if direction == "next" and values is not None or direction == "prev" and has_more:
+            page.previous_cursor = encode_cursor(key(rows[0]), "prev")
+    return page
+
+
+def page_urls(request, page):
+    # Vorwärts-/Rückwärts-Links unter Beibehaltung aller Filter
+    urls = {}
+    for name, cursor in (("next_url", page.next_cursor), ("previous_url", page.previous_cursor)):
+        if cursor:
+            params = request.GET.copy()
+            params["cursor"] = cursor
+            urls[name] = f"?{params.urlencode()}"
+    return urls
+
+
+def estimated_count(model):
+    """Ungefähre Zeilenzahl einer Tabelle ohne Tabellenscan (None, wenn nicht verfügbar).
+
+    PostgreSQL: Statistik aus pg_class (Stand des letzten ANALYZE); SQLite:
+    größte rowid über den Primärschlüssel (zählt gelöschte Zeilen mit).
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        elif connection.vendor == "sqlite":
+            cursor.execute(f"SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}")
+        else:
+            return None
+        row = cursor.fetchone()
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator für Admin-Listen großer Tabellen.
+
+    Ungefilterte Listen nutzen ``estimated_count``; gefilterte zählen höchstens
+    ``count_limit + 1`` Zeilen (COUNT über eine LIMIT-Unterabfrage), damit ein
+    unselektiver Filter nicht die ganze Tabelle zählt.
+    """
+
+    count_limit = COUNT_LIMIT
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset.model)
+            if estimate is not None and estimate > self.count_limit:
+                return estimate
+        return queryset.order_by()[: self.count_limit + 1].count()
@@ -0,0 +1,181 @@
+"""
+Push-Kanal für Bestandsänderungen (Server-Sent Events über ASGI).
+
+Buchungen melden geänderte Artikel bzw. Zähler nach dem Commit an den Broker.
+Jeder Abonnent sammelt Änderungen für ``window`` Sekunden und bekommt dann einen
+einzigen Frame mit dem jeweils letzten Stand je Artikel/Zähler; ein Sammel-
+Wareneingang mit 300 Zeilen erzeugt so einen Frame statt 300.
+
+Der Standard-Broker verteilt nur innerhalb des Prozesses. Für mehrere
+Worker-Prozesse kann über ``VIASTORE_PUSH_BACKEND`` ein anderer Broker mit
+gleicher Schnittstelle (subscribe/unsubscribe/publish) eingetragen werden.
+"""
+
+import asyncio
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Sum
+from django.utils.module_loading import import_string
+
+from .models import Item, StatCounter, StockLevel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 0.25
+
+
+class Subscription:
+    def __init__(self, loop, warehouses=None, window=DEFAULT_WINDOW):
+        self.loop = loop
+        self.warehouses = set(warehouses) if warehouses else None
+        self.window = window
+        self.queue = asyncio.Queue()
+        self._items = {}
+        self._stats = {}
+        self._scheduled = False
+
+    def wants(self, warehouse_id):
+        return self.warehouses is None or warehouse_id in self.warehouses
+
+    def offer(self, items, stats):
+        # Aus beliebigen Threads aufrufbar; gesammelt wird im Event-Loop des Abonnenten
+        self.loop.call_soon_threadsafe(self._merge, items, stats)
+
+    def _merge(self, items, stats):
+        for item in items:
+            self._items[item["id"], item["warehouse_id"]] = item
+        self._stats.update(stats)
+        if not self._scheduled:
+            self._scheduled = True
+            self.loop.call_later(self.window, self._flush)
+
+    def _flush(self):
+        self._scheduled = False
+        frame = {}
+        if self._items:
+            frame["items"] = list(self._items.values())
+        if self._stats:
+            frame["stats"] = self._stats
+        self._items, self._stats = {}, {}
+        if frame:
+            self.queue.put_nowait(frame)
+
+
+class InMemoryBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+
+    def subscribe(self, warehouses=None, window=DEFAULT_WINDOW):
+        subscription = Subscription(asyncio.get_running_loop(), warehouses, window)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def has_subscribers(self):
+        return bool(self._subscriptions)
+
+    def publish(self, items=(), stats=None):
+        """items: [{"id", "sku", "warehouse_id", "quantity", "warehouse_quantity"}] – je betroffenem
+        Lager eine Zeile, ``quantity`` ist der Gesamtbestand; stats: {key: (warehouse_id, value)}."""
+        stats = stats or {}
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        delivered = 0
+        for subscription in subscriptions:
+            own_items = [item for item in items if subscription.wants(item["warehouse_id"])]
+            own_stats = {key: value for key, (warehouse_id, value) in stats.items() if warehouse_id is None or subscription.wants(warehouse_id)}
+            if own_items or own_stats:
+                try:
+                    subscription.offer(own_items, own_stats)
+                except RuntimeError:
+                    # Event-Loop des Abonnenten existiert nicht mehr
+                    self.unsubscribe(subscription)
+                    continue
+                delivered += 1
+        return delivered
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(getattr(settings, "VIASTORE_PUSH_BACKEND", "viastore_app.push.InMemoryBroker"))()
+    return _broker
+
+
+# Je Thread gesammelte Änderungen bis zum nächsten Commit – Artikel als Paare
+# (Artikel, Lager), None steht für das Stammlager; ein Callback
+# veröffentlicht alles Gesammelte, weitere Callbacks derselben Transaktion finden
+# nichts mehr vor. Nach einem Savepoint-Rollback liegengebliebene Schlüssel
+# gehen mit dem nächsten Commit des Threads raus (mit dann aktuellem Wert).
+_pending = threading.local()
+
+
+def _pending_sets():
+    if not hasattr(_pending, "items"):
+        _pending.items, _pending.stats = set(), set()
+    return _pending.items, _pending.stats
+
+
+def _publish_pending():
+    pairs, keys = _pending_sets()
+    if not pairs and not keys:
+        return
+    _pending.items, _pending.stats = set(), set()
+    try:
+        items = _item_rows(pairs) if pairs else []
+        rows = StatCounter.objects.filter(key__in=keys).values_list("key", "warehouse_id", "value") if keys else []
+    except DatabaseError:
+        # Push ist best effort: die Buchung selbst ist bereits committet
+        logger.exception("Push-Benachrichtigung fehlgeschlagen")
+        return
+    stats = {key: (warehouse_id, value) for key, warehouse_id, value in rows}
+    if items or stats:
+        get_broker().publish(items=items, stats=stats)
+
+
+def _item_rows(pairs):
+    # Eine Zeile je (Artikel, Lager) mit dem Bestand in diesem Lager; zwei Abfragen
+    item_ids = {item_id for item_id, _ in pairs}
+    items = {row["id"]: row for row in Item.objects.filter(pk__in=item_ids).values("id", "sku", "warehouse_id", "quantity")}
+    targets = {(item_id, warehouse_id or items[item_id]["warehouse_id"]) for item_id, warehouse_id in pairs if item_id in items}
+    levels = (
+        StockLevel.objects.filter(item_id__in=item_ids, warehouse_id__in={warehouse_id for _, warehouse_id in targets})
+        .values("item_id", "warehouse_id")
+        .annotate(total=Sum("quantity"))
+        .values_list("item_id", "warehouse_id", "total")
+    )
+    quantities = {(item_id, warehouse_id): total for item_id, warehouse_id, total in levels.order_by()}
+    rows = []
+    for item_id, warehouse_id in sorted(targets):
+        item = items[item_id]
+        home = warehouse_id == item["warehouse_id"]
+        if not home and (item_id, warehouse_id) not in quantities:
+            # Kein Lagerplatz in diesem Lager: die Änderung betrifft es nicht
+            continue
+        rows.append({**item, "warehouse_id": warehouse_id, "warehouse_quantity": quantities.get((item_id, warehouse_id), 0)})
+    return rows
+
+
+def notify(item_ids=(), stat_keys=(), warehouses=(None,)):
+    """Geänderte Artikel/Zähler nach dem Commit mit aktuellem Stand verteilen.
+
+    ``warehouses``: Lager, in denen gebucht wurde (None = Stammlager des Artikels);
+    Abonnenten mit Lagerfilter bekommen nur Änderungen in ihren Lagern.
+    """
+    if not get_broker().has_subscribers():
+        return
+    items, stats = _pending_sets()
+    items.update((item_id, warehouse_id) for item_id in item_ids for warehouse_id in warehouses)
+    stats.update(stat_keys)
+    transaction.on_commit(_publish_pending)
@@ -0,0 +1,148 @@
+"""
+Nachschub: Meldebestand/Höchstbestand-Regeln und Bestellvorschläge.
+
+``scan()`` arbeitet mengenbasiert mit drei Anweisungen, unabhängig von der Zahl
+der Artikel:
+
+1. Aktive Vorschläge schließen, deren Bestand wieder über dem Meldebestand liegt.
+2. Offene Vorschläge auf den aktuellen Bestand bringen.
+3. Für Regeln am oder unter dem Meldebestand ohne aktiven Vorschlag neue
+   Vorschläge per INSERT … SELECT anlegen.
+
+Der Bestand einer Regel ist Item.quantity (Regel ohne Lager) bzw. die Summe der
+StockLevel-Zeilen im Lager; vorgeschlagen wird die Menge bis zum Höchstbestand.
+``confirm()`` macht aus offenen Vorschlägen Bestellungen (Order), ebenfalls
+per INSERT … SELECT. Mit ``item_ids`` rechnet ``scan()`` nur diese Artikel neu (z.B. nach
+einem Import).
+"""
+
+from django.db import transaction
+from django.db.models import (
+    Case, CharField, DateTimeField, Exists, ExpressionWrapper, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Cast, Coalesce, Concat, LPad
+from django.utils import timezone
+
+from . import stats
+from .models import StockLevel, Order, OrderArchive, ReorderRule, ReorderSuggestion
+from .stock import insert_select
+
+# Bestellnummer = Präfix + Vorschlags-ID, damit confirm() die Bestellungen per
+# Unique-Index wiederfindet statt sie einzeln zuzuordnen; Batches begrenzen die IN-Listen
+ORDER_NUMBER_PREFIX = "NB"
+ORDER_NUMBER_DIGITS = 10
+ORDER_BATCH_SIZE = 5000
+# Dashboard zählt höchstens so viele offene Vorschläge ("1000+")
+DASHBOARD_COUNT_LIMIT = 1000
+
+
+def order_number(suggestion_id):
+    return f"{ORDER_NUMBER_PREFIX}{suggestion_id:0{ORDER_NUMBER_DIGITS}d}"
+
+
+def rules_with_stock(item_ids=None):
+    """Regeln mit ``stock`` (aktueller Bestand) und ``need`` (Menge bis zum Höchstbestand)."""
+    warehouse_stock = (
+        StockLevel.objects.filter(item_id=OuterRef("item_id"), warehouse_id=OuterRef("warehouse_id"))
+        .order_by()
+        .values("item_id")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+    rules = ReorderRule.objects.annotate(
+        stock=Case(
+            When(warehouse__isnull=True, then=F("item__quantity")),
+            default=Coalesce(Subquery(warehouse_stock), 0),
+            output_field=IntegerField(),
+        ),
+    ).annotate(need=ExpressionWrapper(F("max_quantity") - F("stock"), output_field=IntegerField()))
+    if item_ids is not None:
+        rules = rules.filter(item_id__in=item_ids)
+    return rules
+
+
+def open_suggestions():
+    return ReorderSuggestion.objects.filter(status=ReorderSuggestion.STATUS_OPEN, closed_at=None)
+
+
+def _order_number_expression(pk):
+    return Concat(Value(ORDER_NUMBER_PREFIX), LPad(Cast(pk, CharField()), ORDER_NUMBER_DIGITS, Value("0")), output_field=CharField())
+
+
+def scan(item_ids=None):
+    """Vorschläge neu berechnen; liefert die Zahl angelegter, aktualisierter und geschlossener Vorschläge."""
+    now = timezone.now()
+    rules = rules_with_stock(item_ids)
+    active = ReorderSuggestion.objects.filter(closed_at=None)
+    with transaction.atomic():
+        recovered = rules.filter(Q(stock__gt=F("reorder_point")) | Q(need__lte=0)).values("pk")
+        closed = active.filter(rule__in=recovered).update(closed_at=now, updated_at=now)
+        current = rules.filter(pk=OuterRef("rule_id"))
+        updated = active.filter(status=ReorderSuggestion.STATUS_OPEN, rule__in=rules.values("pk")).update(
+            on_hand=Subquery(current.values("stock")), quantity=Subquery(current.values("need")), updated_at=now,
+        )
+        candidates = rules.filter(stock__lte=F("reorder_point"), need__gt=0).exclude(Exists(active.filter(rule_id=OuterRef("pk"))))
+        created = insert_select(
+            ReorderSuggestion,
+            ["rule", "item", "warehouse", "on_hand", "quantity", "status", "created_at", "updated_at"],
+            candidates.values_list(
+                "pk", "item_id", "warehouse_id", "stock", "need",
+                Value(ReorderSuggestion.STATUS_OPEN, CharField()), Value(now, DateTimeField()), Value(now, DateTimeField()),
+            ),
+        )
+    return {"created": created, "updated": updated, "closed": closed}
+
+
+def confirm(suggestion_ids):
+    """Offene Vorschläge als Bestellungen anlegen; liefert die Zahl der Bestellungen.
+
+    Bestellungen entstehen per INSERT … SELECT; die Bestellnummer aus der
+    Vorschlags-ID verhindert per Unique-Index, dass ein Vorschlag bei
+    gleichzeitigem Bestätigen doppelt bestellt wird (IntegrityError, die
+    Transaktion wird zurückgerollt). Vorschläge, deren Bestellnummer schon als
+    Bestellung oder im Archiv existiert, bleiben offen.
+    """
+    ids = list(suggestion_ids)
+    now = timezone.now()
+    confirmed = 0
+    with transaction.atomic():
+        for start in range(0, len(ids), ORDER_BATCH_SIZE):
+            number = _order_number_expression(OuterRef("pk"))
+            free = list(
+                open_suggestions()
+                .filter(pk__in=ids[start:start + ORDER_BATCH_SIZE])
+                .exclude(Exists(Order.objects.filter(order_number=number)))
+                .exclude(Exists(OrderArchive.objects.filter(order_number=number)))
+                .values_list("pk", flat=True)
+            )
+            if not free:
+                continue
+            batch = ReorderSuggestion.objects.filter(pk__in=free)
+            confirmed += insert_select(
+                Order,
+                ["order_number", "item", "quantity", "order_date"],
+                batch.values_list(_order_number_expression(F("pk")), "item_id", "quantity", Value(now, DateTimeField())),
+            )
+            batch.update(
+                status=ReorderSuggestion.STATUS_ORDERED,
+                order_id=Subquery(Order.objects.filter(order_number=_order_number_expression(OuterRef("pk"))).values("pk")[:1]),
+                updated_at=now,
+            )
+        # Direkte INSERTs lösen keine Signale aus: Bestellzähler selbst nachführen
+        if confirmed:
+            stats.bump_order(now, confirmed)
+    return confirmed
+
+
+def dismiss(suggestion_ids):
+    # Verworfene Vorschläge bleiben aktiv, bis der Bestand wieder über dem Meldebestand liegt
+    return open_suggestions().filter(pk__in=suggestion_ids).update(status=ReorderSuggestion.STATUS_DISMISSED, updated_at=timezone.now())
+
+
+def dashboard_summary(limit=5):
+    """Anzahl offener Vorschläge und die mit dem niedrigsten Bestand (Dashboard-Widget)."""
+    suggestions = open_suggestions().select_related("item", "warehouse", "rule").order_by("on_hand", "id")
+    top = list(suggestions[:limit])
+    # Begrenztes COUNT über den Teilindex statt über alle offenen Vorschläge
+    count = suggestions.order_by()[:DASHBOARD_COUNT_LIMIT].count() if len(top) == limit else len(top)
+    return {"reorder_count": count, "reorder_count_capped": count >= DASHBOARD_COUNT_LIMIT, "reorder_suggestions": top}
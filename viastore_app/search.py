@@ -0,0 +1,41 @@
+from django.db.models import Q
+
+from .models import Item
+
+MAX_RESULTS = 50
+
+
+def prefix_q(field, prefix):
+    # Bereichsabfrage statt LIKE 'x%': nutzt den B-Tree-Index auf allen Datenbanken
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": prefix + "\U0010ffff"})
+
+
+def _case_variants(prefix):
+    return {prefix, prefix.upper(), prefix[:1].upper() + prefix[1:]}
+
+
+def variants_q(field, prefix):
+    """Präfixfilter über die üblichen Schreibweisen (wie eingegeben, GROSS, erster Buchstabe groß)."""
+    condition = Q()
+    for variant in _case_variants(prefix):
+        condition |= prefix_q(field, variant)
+    return condition
+
+
+def search_items(query, limit=20):
+    """Präfixsuche über SKU und Name; jede Variante ist ein Index-Bereichsscan."""
+    query = (query or "").strip()
+    limit = max(1, min(limit, MAX_RESULTS))
+    if not query:
+        return []
+    base = Item.objects.only("pk", "sku", "name", "quantity")
+    results = list(base.filter(variants_q("sku", query)).order_by("sku")[:limit])
+    if len(results) < limit:
+        seen = {item.pk for item in results}
+        for item in base.filter(variants_q("name", query)).order_by("name", "pk")[: limit + len(seen)]:
+            if item.pk not in seen:
+                results.append(item)
+                seen.add(item.pk)
+            if len(results) >= limit:
+                break
+    return results
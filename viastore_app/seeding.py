@@ -0,0 +1,263 @@
+"""
+Erzeugung großer, realistischer Testdatenmengen (``manage.py seed``).
+
+Lager, Artikel und Bestellungen werden mit einem festen Zufallsgenerator
+erzeugt: gleicher Seed und gleiches Stichtagsdatum ergeben identische Daten.
+Die Zeilen gehen als ``executemany`` in Batches direkt in die Tabellen (ohne
+Modellinstanzen und Signale); Dashboard-Zähler werden am Ende einmal neu
+berechnet, die Eröffnungsbestände als Bestandsbuch-Korrekturen per
+INSERT … SELECT angelegt, damit ``reconcile_stock`` nichts zu korrigieren hat
+(die Lagerplätze legt der Datenbank-Trigger beim Einfügen der Artikel an).
+
+Verteilungen: Lagergrößen und Artikelbeliebtheit folgen einer Zipf-Verteilung,
+Bestände einer Log-Normalverteilung je Warengruppe, Bestelldaten haben
+Wochentags- und Tageszeitprofil. Etwa 60 % der Artikel tragen eine EAN-13 mit
+gültiger Prüfziffer (für die Touch-Eingabe), der Rest eine interne
+Artikelnummer mit Warengruppenpräfix. Rund 15 % der EAN-Artikel bekommen
+zusätzlich einen Karton-Code (GTIN-14, ItemBarcode mit Gebindegröße).
+"""
+
+import random
+from datetime import datetime, time, timedelta
+from itertools import accumulate
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import barcodes, stats
+from .barcodes import gtin_check_digit
+from .models import Warehouse, Item, ItemBarcode, StockLevel, Order, OrderArchive, StockMovement, StatCounter, TouchScan, ReorderRule, ReorderSuggestion
+
+DEFAULT_BATCH_SIZE = 20_000
+EAN_SHARE = 0.6
+OPENING_BALANCE_NOTE = "Eröffnungsbestand"
+
+CITIES = [
+    "Hamburg", "München", "Berlin", "Köln", "Frankfurt", "Stuttgart", "Düsseldorf", "Leipzig",
+    "Dortmund", "Bremen", "Dresden", "Hannover", "Nürnberg", "Duisburg", "Bochum", "Wuppertal",
+    "Bielefeld", "Bonn", "Münster", "Mannheim", "Karlsruhe", "Augsburg", "Wiesbaden", "Kassel",
+]
+WAREHOUSE_KINDS = ["Zentrallager", "Regionallager", "Außenlager", "Umschlaglager"]
+
+# Warengruppe: (Präfix, Bezeichnung, Attributlisten, Häufigkeit, mittlerer log-Bestand)
+CATEGORIES = [
+    ("SKS", "Sechskantschraube", [["M4", "M5", "M6", "M8", "M10", "M12"], ["x 16", "x 20", "x 30", "x 40", "x 60", "x 80"],
+                                   ["verzinkt", "Edelstahl A2", "Edelstahl A4", "8.8 schwarz"]], 18, 6.0),
+    ("MUT", "Sechskantmutter", [["M4", "M5", "M6", "M8", "M10", "M12"], ["verzinkt", "Edelstahl A2", "selbstsichernd"]], 10, 6.0),
+    ("KAB", "Kabelbinder", [["2,5x100", "3,6x200", "4,8x300", "7,6x450"], ["natur", "schwarz UV-beständig"], ["VE 100", "VE 500"]], 8, 4.5),
+    ("KLB", "Klebeband", [["PP", "PVC", "Papier"], ["48 mm x 66 m", "50 mm x 66 m", "25 mm x 50 m"], ["braun", "transparent", "bedruckt"]], 9, 4.5),
+    ("ETI", "Etikett", [["100x150", "100x50", "57x32"], ["Thermo direkt", "Thermotransfer"], ["Rolle 1000"]], 6, 4.0),
+    ("KRT", "Faltkarton", [["1-wellig", "2-wellig"], ["300x200x150", "400x300x200", "600x400x400", "800x600x500"]], 8, 5.0),
+    ("FOL", "Stretchfolie", [["17 µm", "20 µm", "23 µm", "30 µm"], ["450 mm", "500 mm"], ["transparent", "schwarz"]], 5, 3.5),
+    ("HDS", "Arbeitshandschuh", [["Nitril", "Leder", "Strick PU"], ["Gr. 7", "Gr. 8", "Gr. 9", "Gr. 10", "Gr. 11"]], 7, 4.0),
+    ("BOX", "Lagersichtbox", [["Gr. 1", "Gr. 2", "Gr. 3", "Gr. 4", "Gr. 5"], ["blau", "rot", "gelb", "grün", "grau"]], 8, 3.5),
+    ("PAL", "Palette", [["Euro 1200x800", "Industrie 1200x1000", "Einweg 800x600", "Kunststoff 1200x800"],
+                        ["neu", "gebraucht Kl. A", "gebraucht Kl. B"]], 5, 4.0),
+    ("REG", "Fachbodenregal", [["2000x1000x400", "2000x1000x600", "2500x1300x500"], ["Grundfeld", "Anbaufeld"],
+                               ["verzinkt", "RAL 7035"]], 2, 1.5),
+    ("HHW", "Handhubwagen", [["2500 kg", "3000 kg"], ["Gabel 1150 mm", "Gabel 1220 mm"], ["Tandemrolle", "Einzelrolle"]], 1, 0.7),
+]
+CATEGORY_WEIGHTS = list(accumulate(category[3] for category in CATEGORIES))
+
+# Bestellungen: Montag … Sonntag und Stunde des Tages
+WEEKDAY_WEIGHTS = [1.0, 1.05, 1.0, 0.95, 0.9, 0.25, 0.05]
+HOUR_WEIGHTS = list(accumulate([0.1] * 6 + [2, 5, 8, 9, 9, 6, 7, 8, 7, 5, 3, 1] + [0.3] * 6))
+ORDER_QUANTITIES = [1, 2, 3, 5, 10, 20, 25, 50, 100, 250]
+ORDER_QUANTITY_WEIGHTS = list(accumulate([30, 15, 8, 12, 14, 7, 5, 5, 3, 1]))
+PACK_SHARE = 0.15
+PACK_SIZES = [6, 10, 12, 24, 50]
+
+
+def zipf_weights(count, exponent=1.0):
+    """Kumulierte Zipf-Gewichte für ``random.choices(cum_weights=...)``."""
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def _insert_sql(model, fields):
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(model._meta.get_field(field).column) for field in fields)
+    return f"INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({', '.join(['%s'] * len(fields))})"
+
+
+def _write_batches(model, fields, rows, batch_size, progress=None, total=None):
+    sql = _insert_sql(model, fields)
+    done = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            done += _flush(sql, batch)
+            batch = []
+            if progress:
+                progress(model._meta.verbose_name_plural, done, total)
+    if batch:
+        done += _flush(sql, batch)
+        if progress:
+            progress(model._meta.verbose_name_plural, done, total)
+    return done
+
+
+def _flush(sql, batch):
+    # Eine Transaktion je Batch: kurze Sperren, kein riesiges Journal
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, batch)
+    return len(batch)
+
+
+class _FastWrites:
+    """Schaltet unter SQLite für die Dauer des Seedens das fsync ab."""
+
+    def __enter__(self):
+        self.previous = None
+        if connection.vendor == "sqlite" and not connection.in_atomic_block:
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA synchronous")
+                self.previous = cursor.fetchone()[0]
+                cursor.execute("PRAGMA synchronous=OFF")
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.previous is not None:
+            with connection.cursor() as cursor:
+                cursor.execute(f"PRAGMA synchronous={int(self.previous)}")
+
+
+def clear():
+    """Löscht Lager-, Artikel-, Bestell- und Bestandsbuchdaten ohne Collector."""
+    using = Item.objects.db
+    with transaction.atomic():
+        StockMovement.objects.all()._raw_delete(using)
+        TouchScan.objects.exclude(item=None).update(item=None)
+        Order.objects.all()._raw_delete(using)
+        OrderArchive.objects.all()._raw_delete(using)
+        StatCounter.objects.all()._raw_delete(using)
+        ItemBarcode.objects.all()._raw_delete(using)
+        ReorderSuggestion.objects.all()._raw_delete(using)
+        ReorderRule.objects.all()._raw_delete(using)
+        # Artikel vor den Lagerplätzen: die Lösch-Trigger finden dann nichts mehr nachzuführen
+        Item.objects.all()._raw_delete(using)
+        StockLevel.objects.all()._raw_delete(using)
+        Warehouse.objects.all()._raw_delete(using)
+
+
+def _warehouse_rows(count, rng):
+    for index in range(count):
+        city = CITIES[index % len(CITIES)]
+        kind = WAREHOUSE_KINDS[0] if index < len(CITIES) else rng.choice(WAREHOUSE_KINDS[1:])
+        suffix = f" {index // len(CITIES) + 1}" if index >= len(CITIES) else ""
+        yield (f"{kind} {city}{suffix}", f"{city}, {rng.choice(['Industriestraße', 'Hafenweg', 'Gewerbepark', 'Logistikallee'])} {rng.randrange(1, 200)}")
+
+
+def _item_rows(count, warehouse_ids, rng, updated_at):
+    warehouse_weights = zipf_weights(len(warehouse_ids), 0.7)
+    # Bijektion index -> 10-stellige Nummer: eindeutige, aber gestreut wirkende EANs
+    ean_offset = rng.randrange(10 ** 10)
+    for index in range(count):
+        code, noun, attributes, _, mu = rng.choices(CATEGORIES, cum_weights=CATEGORY_WEIGHTS)[0]
+        name = " ".join([noun] + [rng.choice(values) for values in attributes])
+        if rng.random() < EAN_SHARE:
+            body = f"40{(index * 7919 + ean_offset) % 10 ** 10:010d}"
+            sku = body + gtin_check_digit(body)
+        else:
+            sku = f"{code}-{index:07d}"
+        quantity = 0 if rng.random() < 0.07 else min(int(rng.lognormvariate(mu, 1.1)), 1_000_000)
+        warehouse_id = rng.choices(warehouse_ids, cum_weights=warehouse_weights)[0]
+        yield (name, sku, quantity, warehouse_id, updated_at)
+
+
+def _order_rows(count, item_ids, days, reference_date, rng):
+    adapt = connection.ops.adapt_datetimefield_value
+    # Beliebtheit unabhängig von der Anlagereihenfolge
+    popular = item_ids[:]
+    rng.shuffle(popular)
+    item_weights = zipf_weights(len(popular))
+    first_day = reference_date - timedelta(days=days)
+    day_starts = [timezone.make_aware(datetime.combine(first_day + timedelta(days=offset), time())) for offset in range(days)]
+    # Leichtes Wachstum über den Zeitraum plus Wochentagsprofil
+    day_weights = list(accumulate(
+        WEEKDAY_WEIGHTS[start.weekday()] * (1 + 0.3 * offset / days) for offset, start in enumerate(day_starts)
+    ))
+    hours = range(24)
+    number = 0
+    previous = 0
+    # Tag für Tag in zeitlicher Reihenfolge: Bestellnummern und IDs steigen mit dem
+    # Datum, und der Index auf order_date wird nur am Ende erweitert
+    for day_start, weight in zip(day_starts, day_weights):
+        boundary = round(count * weight / day_weights[-1])
+        size, previous = boundary - previous, boundary
+        if not size:
+            continue
+        items = rng.choices(popular, cum_weights=item_weights, k=size)
+        quantities = rng.choices(ORDER_QUANTITIES, cum_weights=ORDER_QUANTITY_WEIGHTS, k=size)
+        seconds = sorted(hour * 3600 + int(rng.random() * 3600) for hour in rng.choices(hours, cum_weights=HOUR_WEIGHTS, k=size))
+        for offset in range(size):
+            number += 1
+            yield (f"ORD{number:09d}", items[offset], quantities[offset], adapt(day_start + timedelta(seconds=seconds[offset])))
+
+
+def _barcode_rows(item_rows, rng, created_at):
+    # Karton-Code: Packungsindikator 1 + die ersten zwölf EAN-Stellen + neue Prüfziffer
+    for pk, sku in item_rows:
+        if len(sku) == 13 and sku.isdigit() and rng.random() < PACK_SHARE:
+            pack_size = rng.choice(PACK_SIZES)
+            body = "1" + sku[:12]
+            yield (barcodes.normalize(body + gtin_check_digit(body)), pk, pack_size, f"Karton à {pack_size}", created_at)
+
+
+def _opening_balances(now):
+    # Mengenbasiert in der Datenbank statt Zeile für Zeile aus Python; die
+    # Lagerplätze hat der Trigger beim Anlegen der Artikel schon gefüllt
+    quote = connection.ops.quote_name
+    movements = StockMovement._meta
+    items = Item._meta
+    columns = ", ".join(
+        quote(movements.get_field(field).column) for field in ("item", "warehouse", "bin", "kind", "quantity", "note", "created_at")
+    )
+    quantity = quote(items.get_field("quantity").column)
+    sql = (
+        f"INSERT INTO {quote(movements.db_table)} ({columns}) "
+        f"SELECT {quote(items.pk.column)}, {quote(items.get_field('warehouse').column)}, %s, %s, {quantity}, %s, %s "
+        f"FROM {quote(items.db_table)} WHERE {quantity} > 0"
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, ["", StockMovement.KIND_CORRECTION, OPENING_BALANCE_NOTE, now])
+        return cursor.rowcount
+
+
+def generate(warehouses=10, items=10_000, orders=50_000, seed=1, days=365, batch_size=DEFAULT_BATCH_SIZE,
+         reference_date=None, progress=None):
+    """Erzeugt Lager, Artikel, Bestellungen, Karton-Codes und Eröffnungsbestände.
+
+    ``progress(bezeichnung, erledigt, gesamt)`` wird nach jedem Batch aufgerufen.
+    Liefert die Primärschlüssel und SKUs für Benchmarks.
+    """
+    if items and not warehouses:
+        raise ValueError("Artikel brauchen mindestens ein Lager")
+    if orders and not (items and days > 0):
+        raise ValueError("Bestellungen brauchen mindestens einen Artikel und einen Tag Zeitraum")
+    rng = random.Random(seed)
+    reference_date = reference_date or timezone.localdate()
+    now = connection.ops.adapt_datetimefield_value(timezone.make_aware(datetime.combine(reference_date, time())))
+    with _FastWrites():
+        known = set(Warehouse.objects.values_list("pk", flat=True))
+        _write_batches(Warehouse, ["name", "location"], _warehouse_rows(warehouses, rng), batch_size)
+        warehouse_ids = list(Warehouse.objects.exclude(pk__in=known).order_by("pk").values_list("pk", flat=True))
+        _write_batches(
+            Item, ["name", "sku", "quantity", "warehouse", "updated_at"],
+            _item_rows(items, warehouse_ids, rng, now), batch_size, progress, items,
+        )
+        item_rows = list(Item.objects.order_by("pk").values_list("pk", "sku"))
+        item_ids = [pk for pk, _ in item_rows]
+        _write_batches(
+            Order, ["order_number", "item", "quantity", "order_date"],
+            _order_rows(orders, item_ids, days, reference_date, rng), batch_size, progress, orders,
+        )
+        # Nach den Bestellungen: zusätzliche Zufallszahlen ändern die übrigen Daten nicht
+        _write_batches(
+            ItemBarcode, ["code", "item", "pack_size", "description", "created_at"],
+            _barcode_rows(item_rows, rng, now), batch_size,
+        )
+        _opening_balances(now)
+    # Direkte INSERTs lösen keine Signale aus
+    stats.recompute()
+    return {"warehouse_ids": warehouse_ids, "item_ids": item_ids, "skus": [sku for _, sku in item_rows]}
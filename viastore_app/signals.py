@@ -0,0 +1,80 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import barcodes, push, stats
+from .models import Warehouse, Item, ItemBarcode, StockLevel, Order, OrderArchive, StockMovement
+
+# Dashboard-Zähler inkrementell nachführen. bulk_create/update() lösen keine
+# Signale aus; diese Pfade rufen stats selbst auf, den Rest korrigiert recompute_stats.
+
+
+@receiver(post_save, sender=Warehouse)
+def warehouse_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.bump(stats.WAREHOUSES, 1)
+
+
+@receiver(post_delete, sender=Warehouse)
+def warehouse_deleted(sender, instance, **kwargs):
+    stats.bump(stats.WAREHOUSES, -1)
+
+
+@receiver(post_save, sender=Item)
+def item_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        stats.bump_item(instance.warehouse_id, items=1, stock=instance.quantity)
+    push.notify(item_ids=[instance.pk])
+
+
+@receiver(post_delete, sender=Item)
+def item_deleted(sender, instance, origin=None, **kwargs):
+    if _warehouse_deleted(origin):
+        # Lager wird samt Artikeln gelöscht; die Lagerzähler verschwinden per CASCADE
+        stats.bump(stats.ITEMS, -1)
+    else:
+        # Bestand zieht stock_level_deleted je Lagerplatz ab
+        stats.bump_item(instance.warehouse_id, items=-1)
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+@receiver(post_save, sender=ItemBarcode)
+@receiver(post_delete, sender=ItemBarcode)
+def barcode_target_changed(sender, instance, **kwargs):
+    # Scan-Cache dieses Prozesses; andere Worker verwerfen ihre Einträge per TTL.
+    # Auch den Code selbst verwerfen: er kann vorher auf einen anderen Artikel gezeigt haben.
+    item_id = instance.pk if sender is Item else instance.item_id
+    barcodes.invalidate_items([item_id])
+    barcodes.cache.invalidate_codes([instance.sku if sender is Item else instance.code])
+
+
+@receiver(post_delete, sender=StockLevel)
+def stock_level_deleted(sender, instance, origin=None, **kwargs):
+    if not _warehouse_deleted(origin):
+        stats.bump(stats.warehouse_stock_key(instance.warehouse_id), -instance.quantity, warehouse_id=instance.warehouse_id)
+
+
+def _warehouse_deleted(origin):
+    return isinstance(origin, Warehouse) or getattr(origin, "model", None) is Warehouse
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.bump_order(instance.order_date, 1)
+
+
+@receiver(post_delete, sender=Order)
+@receiver(post_delete, sender=OrderArchive)
+def order_deleted(sender, instance, **kwargs):
+    stats.bump_order(instance.order_date, -1)
+
+
+@receiver(post_save, sender=StockMovement)
+def movement_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        warehouse_id = instance.warehouse_id or Item.objects.filter(pk=instance.item_id).values_list("warehouse_id", flat=True).first()
+        if warehouse_id:
+            stats.bump(stats.warehouse_stock_key(warehouse_id), instance.quantity, warehouse_id=warehouse_id)
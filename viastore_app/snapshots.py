@@ -0,0 +1,143 @@
+"""
+Stichtagsbestände: tägliche Bestandsabzüge je Lager und Artikel.
+
+``take()`` schreibt den aktuellen Bestand (Summe aller Lagerplätze eines Lagers,
+nur Mengen > 0) mit einer einzigen INSERT … SELECT-Anweisung aus StockLevel in
+StockSnapshotLine – ein in sich konsistenter Stand, ohne dass die Zeilen die
+Datenbank verlassen. Fehlt eine Zeile, war der Bestand 0.
+
+Abfragen laufen über den Unique-Index (snapshot, warehouse, item):
+``snapshot_on()`` findet den Abzug zu einem Datum, ``warehouse_totals()`` und
+``lines()`` liefern den Bestand an diesem Tag, ``changes()`` und
+``warehouse_changes()`` die Differenz zweier Abzüge mit einer gruppierten Abfrage.
+
+``prune()`` begrenzt die Tabelle: tägliche Abzüge bleiben ``daily_days`` Tage,
+ältere werden auf den letzten Abzug je Monat verdichtet, Monatsstände bleiben
+``monthly_months`` Monate (0 = unbegrenzt).
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Max, Sum, Value, When
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import StockLevel, StockSnapshot, StockSnapshotLine
+from .stock import insert_select
+
+DAILY_DAYS = 62
+MONTHLY_MONTHS = 36
+
+LINE_FIELDS = ["snapshot", "warehouse", "item", "quantity"]
+
+
+def take(day=None, replace=False):
+    """Bestandsabzug für ``day`` (Standard: heute); liefert ``(snapshot, created)``.
+
+    Ein vorhandener Abzug des Tages bleibt unverändert, außer mit ``replace``.
+    """
+    day = day or timezone.localdate()
+    with transaction.atomic():
+        snapshot = StockSnapshot.objects.select_for_update().filter(day=day).first()
+        if snapshot is not None and not replace:
+            return snapshot, False
+        created = snapshot is None
+        if created:
+            snapshot = StockSnapshot.objects.create(day=day, taken_at=timezone.now())
+        else:
+            snapshot.lines.all().delete()
+        levels = (
+            StockLevel.objects.filter(quantity__gt=0)
+            .values("warehouse_id", "item_id")
+            .annotate(total=Sum("quantity"))
+        )
+        snapshot.row_count = insert_select(
+            StockSnapshotLine, LINE_FIELDS,
+            levels.values_list(Value(snapshot.pk, IntegerField()), "warehouse_id", "item_id", "total"),
+        )
+        snapshot.taken_at = timezone.now()
+        snapshot.save(update_fields=["row_count", "taken_at"])
+    return snapshot, created
+
+
+def snapshot_on(day):
+    """Jüngster Abzug am oder vor ``day`` (Bestand zum Tagesende), sonst None."""
+    return StockSnapshot.objects.filter(day__lte=day).order_by("-day").first()
+
+
+def warehouse_totals(snapshot):
+    """Artikelanzahl und Gesamtmenge je Lager: ``{warehouse_id: {"items": …, "quantity": …}}``."""
+    rows = (
+        StockSnapshotLine.objects.filter(snapshot=snapshot)
+        .values("warehouse_id")
+        .annotate(items=Count("item_id"), quantity=Sum("quantity"))
+        .order_by()
+    )
+    return {row["warehouse_id"]: {"items": row["items"], "quantity": row["quantity"]} for row in rows}
+
+
+def lines(snapshot, warehouse=None):
+    """Zeilen eines Abzugs, je Lager nach Artikel sortierbar über den Unique-Index."""
+    queryset = StockSnapshotLine.objects.filter(snapshot=snapshot)
+    if warehouse is not None:
+        queryset = queryset.filter(warehouse=warehouse)
+    return queryset
+
+
+def changes(before, after, warehouse=None):
+    """Bestandsänderungen je (Lager, Artikel) zwischen zwei Abzügen.
+
+    Liefert ein values()-Queryset mit ``warehouse_id``, ``item_id``, ``before``,
+    ``after`` und ``delta``; unveränderte Bestände sind nicht enthalten.
+    """
+    queryset = StockSnapshotLine.objects.filter(snapshot__in=[before, after])
+    if warehouse is not None:
+        queryset = queryset.filter(warehouse=warehouse)
+    return (
+        queryset.values("warehouse_id", "item_id")
+        .annotate(
+            before=_quantity_in(before),
+            after=_quantity_in(after),
+        )
+        .annotate(delta=F("after") - F("before"))
+        .exclude(delta=0)
+    )
+
+
+def warehouse_changes(before, after):
+    """Mengendifferenz je Lager zwischen zwei Abzügen: ``{warehouse_id: delta}``."""
+    rows = (
+        StockSnapshotLine.objects.filter(snapshot__in=[before, after])
+        .values("warehouse_id")
+        .annotate(delta=_quantity_in(after) - _quantity_in(before))
+        .order_by()
+    )
+    return {row["warehouse_id"]: row["delta"] for row in rows}
+
+
+def _quantity_in(snapshot):
+    return Sum(Case(When(snapshot=snapshot, then="quantity"), default=0, output_field=IntegerField()))
+
+
+def prune(today=None, daily_days=DAILY_DAYS, monthly_months=MONTHLY_MONTHS):
+    """Verdichtet alte Tagesabzüge auf Monatsstände und löscht abgelaufene Monatsstände.
+
+    Liefert ``{"downsampled": …, "expired": …, "lines": …}`` (gelöschte Abzüge bzw. Zeilen).
+    """
+    today = today or timezone.localdate()
+    older = StockSnapshot.objects.filter(day__lt=today - timedelta(days=daily_days))
+    # Der letzte Abzug eines Monats bleibt als Monatsstand stehen
+    month_ends = older.annotate(month=TruncMonth("day")).values("month").annotate(last=Max("day")).values("last")
+    downsampled = list(older.exclude(day__in=month_ends).values_list("pk", flat=True))
+    expired = []
+    if monthly_months:
+        months = today.year * 12 + today.month - 1 - monthly_months
+        cutoff = today.replace(year=months // 12, month=months % 12 + 1, day=1)
+        expired = list(StockSnapshot.objects.filter(day__lt=cutoff).exclude(pk__in=downsampled).values_list("pk", flat=True))
+    ids = downsampled + expired
+    with transaction.atomic():
+        # Zeilen direkt löschen (ein DELETE über den Indexpräfix snapshot), dann die Köpfe
+        deleted_lines, _ = StockSnapshotLine.objects.filter(snapshot_id__in=ids).delete()
+        StockSnapshot.objects.filter(pk__in=ids).delete()
+    return {"downsampled": len(downsampled), "expired": len(expired), "lines": deleted_lines}
@@ -0,0 +1,24 @@
+"""
+Excel-Dateien für Import und Export.
+
+openpyxl (samt et_xmlfile und der XML-Schicht) wird nur für Excel-Import und
+-Export gebraucht; es wird erst beim ersten Aufruf geladen, damit Worker-Start
+und ``manage.py`` es nicht bezahlen. Andere Module importieren openpyxl nicht
+direkt, ``bench_startup`` prüft das.
+"""
+
+
+def _openpyxl():
+    import openpyxl
+
+    return openpyxl
+
+
+def open_workbook(file):
+    """Nur-Lese-Workbook mit Werten statt Formeln; Zeilen werden gestreamt."""
+    return _openpyxl().load_workbook(file, read_only=True, data_only=True)
+
+
+def write_only_workbook():
+    """Workbook, das Zeilen beim Anhängen direkt serialisiert (konstanter Speicher)."""
+    return _openpyxl().Workbook(write_only=True)
@@ -0,0 +1,78 @@
+"""
+Startzeit eines Worker-Prozesses bis zur ersten Antwort.
+
+``probe()`` startet einen frischen Interpreter mit ``python -X importtime``,
+lädt die WSGI-Anwendung wie gunicorn (``viastore_project.wsgi``) und schickt
+einen ersten Request durch den kompletten Middleware-Stack. Gemessen werden
+die Zeit ab Prozessstart bis zur ersten Antwort, die Importzeit je Paket und
+welche schweren optionalen Abhängigkeiten dabei schon geladen wurden – die
+gehören hinter ihre Service-Module (``spreadsheets``, ``article_lookup``).
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+# Dürfen beim Start und beim ersten Request nicht geladen sein
+HEAVY_MODULES = ("openpyxl", "bs4", "requests", "urllib3", "selenium", "webdriver_manager")
+
+PROBE_SCRIPT = """
+import io, json, os, sys, time
+from wsgiref.util import setup_testing_defaults
+from viastore_project.wsgi import application
+loaded = time.time()
+environ = {"PATH_INFO": os.environ["VIASTORE_PROBE_PATH"], "wsgi.input": io.BytesIO()}
+setup_testing_defaults(environ)
+status = []
+response = application(environ, lambda code, headers, exc_info=None: status.append(code))
+b"".join(response)
+response.close()
+done = time.time()
+started = float(os.environ["VIASTORE_PROBE_STARTED"])
+print(json.dumps({
+    "status": int(status[0].split()[0]),
+    "app_loaded_ms": (loaded - started) * 1000,
+    "first_request_ms": (done - started) * 1000,
+    "modules": len(sys.modules),
+    "heavy": sorted(name for name in json.loads(os.environ["VIASTORE_PROBE_HEAVY"]) if name in sys.modules),
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """``-X importtime``-Ausgabe -> (Gesamt-Importzeit in ms, ms je Top-Level-Paket)."""
+    packages = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Kopfzeile
+        packages[fields[2].strip().split(".")[0]] += int(fields[0]) / 1000
+    return sum(packages.values()), dict(packages)
+
+
+def probe(path="/health/db/"):
+    """Ein frischer Worker-Prozess, ein Request; liefert die Messwerte als dict."""
+    env = dict(os.environ, VIASTORE_PROBE_PATH=path, VIASTORE_PROBE_HEAVY=json.dumps(HEAVY_MODULES))
+    env.setdefault("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE)
+    with tempfile.TemporaryDirectory(prefix="viastore-startup-") as directory:
+        if env.get("VIASTORE_DB_PROFILE", "sqlite").startswith("sqlite"):
+            # Eigene Wegwerf-Datenbank: der Health-Check soll db.sqlite3 nicht anfassen
+            env["VIASTORE_DB_NAME"] = os.path.join(directory, "probe.sqlite3")
+        env["VIASTORE_PROBE_STARTED"] = repr(time.time())
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE_SCRIPT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=120,
+        )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startmessung fehlgeschlagen:\n{completed.stderr[-2000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["import_ms"], result["packages"] = parse_importtime(completed.stderr)
+    return result
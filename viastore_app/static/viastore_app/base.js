@@ -0,0 +1,72 @@
+// Seitengerüst: Formulare aus der Sidebar im Modal (AJAX) und Artikel-Autocomplete
+(function() {
+    var MODAL_FORMS = {
+        sidebarCorrectionBtn: '/bestandskorrektur/?ajax=1',
+        sidebarOrderBtn: '/bestellung-anlegen/?ajax=1',
+        sidebarItemBtn: '/artikel-anlegen/?ajax=1',
+        sidebarWarehouseBtn: '/lager-anlegen/?ajax=1'
+    };
+
+    function bindForm(url) {
+        var form = document.getElementById('ajaxForm');
+        if (!form) return;
+        form.onsubmit = function(ev) {
+            ev.preventDefault();
+            fetch(url, { method: 'POST', body: new FormData(form) })
+                .then(response => response.text())
+                .then(html => {
+                    document.getElementById('formModalBody').innerHTML = html;
+                });
+        };
+    }
+
+    Object.keys(MODAL_FORMS).forEach(function(id) {
+        var button = document.getElementById(id);
+        if (!button) return;
+        button.addEventListener('click', function(e) {
+            e.preventDefault();
+            new bootstrap.Modal(document.getElementById('formModal')).show();
+            fetch(MODAL_FORMS[id])
+                .then(response => response.text())
+                .then(html => {
+                    document.getElementById('formModalBody').innerHTML = html;
+                    bindForm(MODAL_FORMS[id]);
+                });
+        });
+    });
+
+    var touchButton = document.getElementById('sidebarTouchBtn');
+    if (touchButton) {
+        touchButton.addEventListener('click', function(e) {
+            e.preventDefault();
+            new bootstrap.Modal(document.getElementById('touchModal')).show();
+        });
+    }
+
+    // Artikel-Autocomplete (ItemAutocompleteWidget), auch für per AJAX geladene Formulare
+    var timers = {};
+    function label(item) { return item.sku + ' – ' + item.name; }
+    document.addEventListener('input', function(e) {
+        var input = e.target;
+        if (!input.dataset || !input.dataset.itemAutocomplete) return;
+        var hidden = document.getElementById(input.dataset.target);
+        var options = document.getElementById(input.getAttribute('list'));
+        var match = Array.prototype.find.call(options.options, function(o) { return o.value === input.value; });
+        hidden.value = match ? match.dataset.id : '';
+        if (match || input.value.trim().length < 2) return;
+        clearTimeout(timers[input.id]);
+        timers[input.id] = setTimeout(function() {
+            fetch(input.dataset.itemAutocomplete + '?limit=20&q=' + encodeURIComponent(input.value.trim()))
+                .then(r => r.json())
+                .then(function(data) {
+                    options.innerHTML = '';
+                    data.results.forEach(function(item) {
+                        var option = document.createElement('option');
+                        option.value = label(item);
+                        option.dataset.id = item.id;
+                        options.appendChild(option);
+                    });
+                });
+        }, 200);
+    });
+})();
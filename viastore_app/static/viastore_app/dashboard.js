@@ -0,0 +1,90 @@
+// Dashboard: Touch-Wareneingang im Modal und Diagramme (Zähler aus den data-stat-Feldern, Reihen per json_script)
+(function() {
+    var touchModal = document.getElementById('touchModal');
+    if (touchModal) {
+        touchModal.addEventListener('show.bs.modal', function() {
+            fetch('/wareneingang-touch/?ajax=1')
+                .then(response => response.text())
+                .then(html => {
+                    document.getElementById('touchModalBody').innerHTML = html;
+                    // Formular-Submit abfangen
+                    var form = document.getElementById('touchForm');
+                    if (form) {
+                        form.onsubmit = function(e) {
+                            e.preventDefault();
+                            fetch('/wareneingang-touch/?ajax=1', { method: 'POST', body: new FormData(form) })
+                                .then(response => response.text())
+                                .then(html => {
+                                    document.getElementById('touchModalBody').innerHTML = html;
+                                });
+                        };
+                    }
+                });
+        });
+    }
+
+    function data(id) {
+        return JSON.parse(document.getElementById(id).textContent);
+    }
+
+    function stat(key) {
+        return parseInt(document.querySelector('[data-stat="' + key + '"]').textContent, 10);
+    }
+
+    new Chart(document.getElementById('dashboardChart').getContext('2d'), {
+        type: 'bar',
+        data: {
+            labels: ['Lager', 'Artikel', 'Bestellungen'],
+            datasets: [{
+                label: 'Anzahl',
+                data: [stat('warehouses'), stat('items'), stat('orders')],
+                backgroundColor: [
+                    'rgba(52, 152, 219, 0.7)',
+                    'rgba(46, 204, 113, 0.7)',
+                    'rgba(231, 76, 60, 0.7)'
+                ],
+                borderColor: [
+                    'rgba(52, 152, 219, 1)',
+                    'rgba(46, 204, 113, 1)',
+                    'rgba(231, 76, 60, 1)'
+                ],
+                borderWidth: 1
+            }]
+        },
+        options: { scales: { y: { beginAtZero: true, precision: 0 } } }
+    });
+    // Bestand je Lager
+    var warehouseStats = data('warehouseStats');
+    new Chart(document.getElementById('stockChart').getContext('2d'), {
+        type: 'bar',
+        data: {
+            labels: warehouseStats.map(w => w.name),
+            datasets: [{
+                label: 'Bestand (Stück)',
+                data: warehouseStats.map(w => w.stock),
+                backgroundColor: 'rgba(46, 204, 113, 0.7)'
+            }, {
+                label: 'Artikel',
+                data: warehouseStats.map(w => w.items),
+                backgroundColor: 'rgba(52, 152, 219, 0.7)'
+            }]
+        },
+        options: { scales: { y: { beginAtZero: true, precision: 0 } } }
+    });
+    // Bestellungen pro Tag
+    var orderStats = data('orderStats');
+    new Chart(document.getElementById('ordersChart').getContext('2d'), {
+        type: 'line',
+        data: {
+            labels: orderStats.map(d => d.day),
+            datasets: [{
+                label: 'Bestellungen pro Tag',
+                data: orderStats.map(d => d.orders),
+                borderColor: 'rgba(231, 76, 60, 1)',
+                backgroundColor: 'rgba(231, 76, 60, 0.2)',
+                fill: true
+            }]
+        },
+        options: { scales: { y: { beginAtZero: true, precision: 0 } } }
+    });
+})();
@@ -0,0 +1,32 @@
+// Excel-Import: Job-Status abfragen, bis der Hintergrund-Worker fertig ist
+(function() {
+    var box = document.getElementById('jobBox');
+    if (!box) return;
+    function poll() {
+        fetch(box.dataset.statusUrl)
+            .then(r => r.json())
+            .then(function(job) {
+                if (job.status === 'done') {
+                    box.textContent = job.result.message;
+                    var list = document.getElementById('jobErrorList');
+                    job.result.errors.forEach(function(error) {
+                        var li = document.createElement('li');
+                        li.textContent = 'Zeile ' + error[0] + ': ' + error[1];
+                        list.appendChild(li);
+                    });
+                    if (job.result.errors.length) document.getElementById('jobErrors').style.display = 'block';
+                } else if (job.status === 'failed') {
+                    box.style.background = '#f8d7da';
+                    box.style.color = '#721c24';
+                    box.textContent = 'Import fehlgeschlagen: ' + job.error;
+                } else {
+                    var text = job.status === 'queued' ? 'Import wartet auf den Worker ...' : 'Import läuft: ' + job.progress_done;
+                    if (job.status === 'running' && job.progress_total) text += ' / ' + job.progress_total;
+                    box.textContent = text;
+                    setTimeout(poll, 1000);
+                }
+            })
+            .catch(function() { setTimeout(poll, 3000); });
+    }
+    poll();
+})();
@@ -0,0 +1,8 @@
+// Nachschubliste: alle Vorschläge der Seite an-/abwählen
+(function() {
+    var selectAll = document.getElementById('selectAll');
+    if (!selectAll) return;
+    selectAll.addEventListener('change', function() {
+        document.querySelectorAll('input[name=suggestion]').forEach(box => { box.checked = this.checked; });
+    });
+})();
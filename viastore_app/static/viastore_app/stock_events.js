@@ -0,0 +1,27 @@
+// Live-Aktualisierung per Server-Sent Events: Elemente mit data-item-quantity="<id>"
+// bzw. data-stat="<zählerschlüssel>" bekommen den neuen Wert.
+(function() {
+    var script = document.currentScript;
+    if (!window.EventSource || !script) return;
+    var source = new EventSource(script.dataset.eventsUrl);
+
+    function update(selector, value) {
+        document.querySelectorAll(selector).forEach(function(el) {
+            if (el.textContent !== String(value)) {
+                el.textContent = value;
+                el.classList.add('live-updated');
+                setTimeout(function() { el.classList.remove('live-updated'); }, 1500);
+            }
+        });
+    }
+
+    source.addEventListener('stock', function(event) {
+        var frame = JSON.parse(event.data);
+        (frame.items || []).forEach(function(item) {
+            update('[data-item-quantity="' + item.id + '"]', item.quantity);
+        });
+        Object.keys(frame.stats || {}).forEach(function(key) {
+            update('[data-stat="' + key + '"]', frame.stats[key]);
+        });
+    });
+})();
@@ -0,0 +1,127 @@
+// Offline-Warteschlange der Touch-App (IndexedDB).
+// Wird von der Seite und vom Service Worker (importScripts) genutzt, daher ohne DOM-Zugriffe.
+var TouchQueue = (function() {
+    var DB_NAME = 'viastore-touch';
+    var SCANS = 'scans';
+    var META = 'meta';
+    var BATCH_SIZE = 100;
+    var dbPromise = null;
+    var flushing = null;
+
+    function request(req) {
+        return new Promise(function(resolve, reject) {
+            req.onsuccess = function() { resolve(req.result); };
+            req.onerror = function() { reject(req.error); };
+        });
+    }
+
+    function db() {
+        if (!dbPromise) {
+            var req = indexedDB.open(DB_NAME, 1);
+            req.onupgradeneeded = function() {
+                var store = req.result.createObjectStore(SCANS, { keyPath: 'id' });
+                store.createIndex('scanned_at', 'scanned_at');
+                req.result.createObjectStore(META, { keyPath: 'key' });
+            };
+            dbPromise = request(req);
+        }
+        return dbPromise;
+    }
+
+    function store(name, mode) {
+        return db().then(function(conn) { return conn.transaction(name, mode).objectStore(name); });
+    }
+
+    function uuid() {
+        if (self.crypto && self.crypto.randomUUID) return self.crypto.randomUUID();
+        return 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(/[xy]/g, function(c) {
+            var r = Math.random() * 16 | 0;
+            return (c === 'x' ? r : (r & 0x3 | 0x8)).toString(16);
+        });
+    }
+
+    function setMeta(key, value) {
+        return store(META, 'readwrite').then(function(s) { return request(s.put({ key: key, value: value })); });
+    }
+
+    function getMeta(key) {
+        return store(META, 'readonly')
+            .then(function(s) { return request(s.get(key)); })
+            .then(function(entry) { return entry ? entry.value : null; });
+    }
+
+    function deviceId() {
+        return getMeta('device_id').then(function(id) {
+            if (id) return id;
+            id = uuid();
+            return setMeta('device_id', id).then(function() { return id; });
+        });
+    }
+
+    function add(sku, quantity) {
+        var scan = { id: uuid(), sku: String(sku).trim(), quantity: quantity, scanned_at: new Date().toISOString() };
+        return store(SCANS, 'readwrite')
+            .then(function(s) { return request(s.add(scan)); })
+            .then(function() { return scan; });
+    }
+
+    function pending(limit) {
+        return store(SCANS, 'readonly').then(function(s) {
+            return new Promise(function(resolve, reject) {
+                var scans = [];
+                var req = s.index('scanned_at').openCursor();
+                req.onsuccess = function() {
+                    var cursor = req.result;
+                    if (!cursor || (limit && scans.length >= limit)) return resolve(scans);
+                    scans.push(cursor.value);
+                    cursor.continue();
+                };
+                req.onerror = function() { reject(req.error); };
+            });
+        });
+    }
+
+    function remove(ids) {
+        return store(SCANS, 'readwrite').then(function(s) {
+            return Promise.all(ids.map(function(id) { return request(s.delete(id)); }));
+        });
+    }
+
+    function sendBatch(syncUrl, onResult) {
+        return Promise.all([pending(BATCH_SIZE), getMeta('csrf_token'), deviceId()]).then(function(values) {
+            var scans = values[0];
+            if (!scans.length) return 0;
+            return fetch(syncUrl, {
+                method: 'POST',
+                credentials: 'same-origin',
+                headers: { 'Content-Type': 'application/json', 'X-CSRFToken': values[1] || '' },
+                body: JSON.stringify({ device_id: values[2], scans: scans })
+            })
+                .then(function(response) {
+                    if (!response.ok) throw new Error('Sync fehlgeschlagen: ' + response.status);
+                    return response.json();
+                })
+                .then(function(data) {
+                    if (onResult) data.results.forEach(onResult);
+                    // Nur bestätigte Scans aus der Warteschlange entfernen
+                    return remove(data.acked).then(function() { return data.acked.length; });
+                });
+        });
+    }
+
+    // Warteschlange in Batches leeren, bis nichts mehr offen ist
+    function flush(syncUrl, onResult) {
+        if (flushing) return flushing;
+        var total = 0;
+        function next() {
+            return sendBatch(syncUrl, onResult).then(function(count) {
+                total += count;
+                return count ? next() : total;
+            });
+        }
+        flushing = next().finally(function() { flushing = null; });
+        return flushing;
+    }
+
+    return { add: add, pending: pending, flush: flush, setMeta: setMeta, deviceId: deviceId };
+})();
@@ -0,0 +1,79 @@
+// Touch-Wareneingang: Vollbild, Artikelinfo zum Code und Kamera-Scanner (html5-qrcode)
+(function() {
+    function requestFullscreen() {
+        var el = document.documentElement;
+        if (el.requestFullscreen) el.requestFullscreen();
+        else if (el.webkitRequestFullscreen) el.webkitRequestFullscreen();
+        else if (el.msRequestFullscreen) el.msRequestFullscreen();
+    }
+    requestFullscreen();
+    // Zoom blockieren
+    ['gesturestart', 'gesturechange', 'gestureend'].forEach(function(type) {
+        document.addEventListener(type, function(e) { e.preventDefault(); });
+    });
+    document.addEventListener('wheel', function(e) {
+        if (e.ctrlKey) e.preventDefault();
+    }, { passive: false });
+
+    var input = document.getElementById('id_item_name');
+    if (!input) return;
+    var modal = document.getElementById('scannerModal');
+    var infoBox = document.getElementById('itemInfoBox');
+
+    function showItemInfo(data) {
+        if (data.error) {
+            infoBox.innerHTML = '<span style="color:red;">' + data.error + '</span>';
+        } else {
+            infoBox.innerHTML = '<b>Bezeichnung:</b> ' + data.name;
+        }
+    }
+    // Erst nach einer Tipp-/Scanpause abfragen, gleiche SKU nicht erneut,
+    // eine überholte Anfrage abbrechen statt ihre Antwort anzuzeigen
+    var INFO_DELAY_MS = 300;
+    var infoTimer = null;
+    var infoSku = null;
+    var infoRequest = null;
+    function fetchItemInfo(sku) {
+        clearTimeout(infoTimer);
+        sku = (sku || '').trim();
+        if (!sku || sku === infoSku) return;
+        infoSku = sku;
+        if (infoRequest) infoRequest.abort();
+        var request = infoRequest = new AbortController();
+        fetch('/api/google-item-info/' + encodeURIComponent(sku) + '/', { signal: request.signal })
+            .then(r => r.json())
+            .then(showItemInfo)
+            .catch(function(error) {
+                // Netzfehler: beim nächsten Ändern erneut versuchen
+                if (error.name !== 'AbortError') infoSku = null;
+            })
+            .finally(function() { if (infoRequest === request) infoRequest = null; });
+    }
+    input.addEventListener('input', function() {
+        var value = this.value;
+        clearTimeout(infoTimer);
+        infoTimer = setTimeout(function() { fetchItemInfo(value); }, INFO_DELAY_MS);
+    });
+    input.addEventListener('change', function() {
+        fetchItemInfo(this.value);
+    });
+
+    function stopScanner() {
+        modal.style.display = 'none';
+        if (window.qrScanner) window.qrScanner.clear();
+    }
+    function onScanSuccess(decodedText) {
+        input.value = decodedText;
+        stopScanner();
+    }
+    function startScanner() {
+        if (window.qrScanner) window.qrScanner.clear();
+        window.qrScanner = new Html5Qrcode('qr-reader');
+        window.qrScanner.start({ facingMode: 'environment' }, { fps: 10, qrbox: 250 }, onScanSuccess);
+    }
+    document.getElementById('scanButton').addEventListener('click', function() {
+        modal.style.display = 'block';
+        startScanner();
+    });
+    document.getElementById('scanCloseButton').addEventListener('click', stopScanner);
+})();
@@ -0,0 +1,62 @@
+// Offline-Betrieb der Touch-App: Scans lokal puffern (TouchQueue) und gesammelt synchronisieren
+(function() {
+    var script = document.currentScript;
+    if (!window.indexedDB || !window.fetch || !script) return;
+    var SYNC_URL = script.dataset.syncUrl;
+    var form = document.getElementById('touchForm');
+    var list = document.getElementById('scanList');
+    var state = document.getElementById('syncState');
+    var rows = {};
+    TouchQueue.setMeta('csrf_token', form.querySelector('[name=csrfmiddlewaretoken]').value);
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register(script.dataset.serviceWorkerUrl, { scope: script.dataset.scope });
+    }
+    function showScan(scan, text, color) {
+        var li = rows[scan.id];
+        if (!li) {
+            li = document.createElement('li');
+            li.className = 'list-group-item';
+            rows[scan.id] = li;
+            list.insertBefore(li, list.firstChild);
+            while (list.children.length > 20) list.removeChild(list.lastChild);
+        }
+        li.textContent = (scan.sku || li.dataset.sku) + ' × ' + (scan.quantity || li.dataset.quantity) + ' – ' + text;
+        li.dataset.sku = scan.sku || li.dataset.sku;
+        li.dataset.quantity = scan.quantity || li.dataset.quantity;
+        li.style.color = color;
+    }
+    function onResult(result) {
+        if (result.status === 'booked') showScan(result, 'gebucht', '#155724');
+        else showScan(result, 'abgelehnt: ' + result.error, '#721c24');
+    }
+    function updateState() {
+        return TouchQueue.pending().then(function(scans) {
+            state.textContent = scans.length ? scans.length + ' Scan(s) warten auf Übertragung' + (navigator.onLine ? '' : ' (offline)') : 'Alle Scans übertragen';
+        });
+    }
+    function sync() {
+        return TouchQueue.flush(SYNC_URL, onResult).catch(function() {
+            // Funkloch: später erneut versuchen (Intervall, online-Event, Background Sync)
+        }).then(updateState);
+    }
+    form.addEventListener('submit', function(e) {
+        e.preventDefault();
+        var sku = form.querySelector('[name=item_name]').value;
+        var quantity = parseInt(form.querySelector('[name=quantity]').value, 10);
+        if (!sku || !(quantity > 0)) return;
+        TouchQueue.add(sku, quantity).then(function(scan) {
+            showScan(scan, 'ausstehend', '#856404');
+            form.reset();
+            if (navigator.serviceWorker && navigator.serviceWorker.ready && 'SyncManager' in window) {
+                navigator.serviceWorker.ready.then(function(reg) { return reg.sync.register('touch-sync'); }).catch(function() {});
+            }
+            return sync();
+        });
+    });
+    TouchQueue.pending().then(function(scans) {
+        scans.forEach(function(scan) { showScan(scan, 'ausstehend', '#856404'); });
+    });
+    window.addEventListener('online', sync);
+    setInterval(sync, 15000);
+    sync();
+})();
@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import push
+from .models import Warehouse, Item, StockLevel, Order, OrderArchive, StatCounter
+
+WAREHOUSES = "warehouses"
+ITEMS = "items"
+ORDERS = "orders"
+# Zeitpunkt der letzten Vollberechnung (Unix-Zeit)
+RECOMPUTED = "recomputed"
+
+
+def warehouse_stock_key(warehouse_id):
+    return f"stock:{warehouse_id}"
+
+
+def warehouse_items_key(warehouse_id):
+    return f"items:{warehouse_id}"
+
+
+def orders_day_key(day):
+    return f"orders:{day.isoformat()}"
+
+
+def bump(key, delta, warehouse_id=None, day=None):
+    """Zähler atomar per F() erhöhen; fehlende Zeile wird angelegt."""
+    if not delta:
+        return
+    push.notify(stat_keys=[key])
+    if StatCounter.objects.filter(key=key).update(value=F("value") + delta):
+        return
+    try:
+        with transaction.atomic():
+            StatCounter.objects.create(key=key, value=delta, warehouse_id=warehouse_id, day=day)
+    except IntegrityError:
+        # Parallel angelegt: jetzt existiert die Zeile
+        StatCounter.objects.filter(key=key).update(value=F("value") + delta)
+
+
+def bump_item(warehouse_id, items=0, stock=0):
+    if items:
+        bump(ITEMS, items)
+        bump(warehouse_items_key(warehouse_id), items, warehouse_id=warehouse_id)
+    bump(warehouse_stock_key(warehouse_id), stock, warehouse_id=warehouse_id)
+
+
+def bump_order(order_date, delta):
+    bump(ORDERS, delta)
+    day = timezone.localdate(order_date) if timezone.is_aware(order_date) else order_date.date()
+    bump(orders_day_key(day), delta, day=day)
+
+
+def move_item(old_warehouse_id, new_warehouse_id, quantity):
+    # Artikel wechselt das Lager: Anzahl und Bestand umbuchen
+    if old_warehouse_id == new_warehouse_id:
+        return
+    bump_item(old_warehouse_id, items=-1, stock=-quantity)
+    bump_item(new_warehouse_id, items=1, stock=quantity)
+
+
+def bump_warehouses(changes):
+    # changes: {warehouse_id: (artikel_delta, bestand_delta)} aus Massenoperationen
+    for warehouse_id, (items, stock) in changes.items():
+        bump_item(warehouse_id, items=items, stock=stock)
+
+
+def recompute():
+    """Alle Kennzahlen vollständig neu berechnen (korrigiert Drift, z.B. per Cron)."""
+    counters = [
+        StatCounter(key=WAREHOUSES, value=Warehouse.objects.count()),
+        StatCounter(key=ITEMS, value=Item.objects.count()),
+        # Archivierte Bestellungen zählen weiter mit
+        StatCounter(key=ORDERS, value=Order.objects.count() + OrderArchive.objects.count()),
+        StatCounter(key=RECOMPUTED, value=int(timezone.now().timestamp())),
+    ]
+    # Artikel zählen beim Stammlager, Bestand bei dem Lager, in dem er liegt
+    stock_totals = dict(StockLevel.objects.order_by().values("warehouse_id").annotate(total=Sum("quantity")).values_list("warehouse_id", "total"))
+    for row in Warehouse.objects.order_by().values("pk").annotate(item_count=Count("items")):
+        counters.append(StatCounter(key=warehouse_items_key(row["pk"]), value=row["item_count"], warehouse_id=row["pk"]))
+        counters.append(StatCounter(key=warehouse_stock_key(row["pk"]), value=stock_totals.get(row["pk"]) or 0, warehouse_id=row["pk"]))
+    per_day = {}
+    for model in (Order, OrderArchive):
+        for row in model.objects.annotate(day=TruncDate("order_date")).order_by().values("day").annotate(orders=Count("pk")):
+            per_day[row["day"]] = per_day.get(row["day"], 0) + row["orders"]
+    for day, orders in per_day.items():
+        counters.append(StatCounter(key=orders_day_key(day), value=orders, day=day))
+    with transaction.atomic():
+        StatCounter.objects.all().delete()
+        StatCounter.objects.bulk_create(counters, batch_size=500)
+    return len(counters)
+
+
+def dashboard_stats(days=14):
+    """Liest alle Dashboard-Kennzahlen mit einer Abfrage aus der Zählertabelle."""
+    today = timezone.localdate()
+    first_day = today - timedelta(days=days - 1)
+    rows = list(StatCounter.objects.select_related("warehouse").filter(Q(day__isnull=True) | Q(day__gte=first_day)))
+    if not any(row.key == RECOMPUTED for row in rows):
+        # Erster Aufruf nach der Installation: Zähler einmalig aufbauen
+        recompute()
+        return dashboard_stats(days)
+    totals = {WAREHOUSES: 0, ITEMS: 0, ORDERS: 0}
+    warehouses = {}
+    orders_per_day = {first_day + timedelta(days=offset): 0 for offset in range(days)}
+    for row in rows:
+        if row.key in totals:
+            totals[row.key] = row.value
+        elif row.warehouse_id:
+            entry = warehouses.setdefault(row.warehouse_id, {"name": row.warehouse.name, "items": 0, "stock": 0})
+            entry["stock" if row.key.startswith("stock:") else "items"] = row.value
+        elif row.day in orders_per_day:
+            orders_per_day[row.day] = row.value
+    return {
+        "warehouse_count": totals[WAREHOUSES],
+        "item_count": totals[ITEMS],
+        "order_count": totals[ORDERS],
+        "warehouses": sorted(warehouses.values(), key=lambda entry: entry["name"]),
+        "orders_per_day": [{"day": day.strftime("%d.%m."), "orders": count} for day, count in orders_per_day.items()],
+    }
@@ -0,0 +1,461 @@
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import (
+    Case, CharField, Count, DateTimeField, Exists, ExpressionWrapper, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from . import barcodes, push, stats
+from .models import Warehouse, Item, StockLevel, StockMovement, ReceiptBatch
+
+MAX_BATCH_LINES = 1000
+# Artikel je Anweisung bei Massenänderungen (Grenze für IN-Listen)
+BULK_BATCH_SIZE = 5000
+
+
+def _user(user):
+    return user if user is not None and user.is_authenticated else None
+
+
+def _item_id(item):
+    return item.pk if isinstance(item, Item) else item
+
+
+def _lock_item(item_id):
+    # Leeres UPDATE holt die Schreibsperre (Zeilensperre in PostgreSQL,
+    # RESERVED-Lock in SQLite), bevor der aktuelle Bestand gelesen wird
+    Item.objects.filter(pk=item_id).update(quantity=F("quantity"))
+    return Item.objects.filter(pk=item_id).values_list("quantity", flat=True).get()
+
+
+def _refresh(item, quantity):
+    if isinstance(item, Item):
+        item.quantity = quantity
+    return quantity
+
+
+def _home_warehouse():
+    return Subquery(Item.objects.filter(pk=OuterRef("item_id")).values("warehouse_id")[:1])
+
+
+def _levels(item_ids, warehouse_id=None, bin=""):
+    # Ohne Lagerangabe: Lagerplatz im Stammlager des jeweiligen Artikels
+    levels = StockLevel.objects.filter(item_id__in=item_ids, bin=bin)
+    return levels.filter(warehouse_id=warehouse_id) if warehouse_id else levels.filter(warehouse_id=_home_warehouse())
+
+
+def _add_to_level(item_id, quantity, warehouse_id=None, bin=""):
+    """Erhöht den Lagerplatzbestand atomar; der Trigger führt Item.quantity nach."""
+    if _levels([item_id], warehouse_id, bin).update(quantity=F("quantity") + quantity):
+        return
+    warehouse_id = warehouse_id or Item.objects.filter(pk=item_id).values_list("warehouse_id", flat=True).get()
+    try:
+        with transaction.atomic():
+            StockLevel.objects.create(item_id=item_id, warehouse_id=warehouse_id, bin=bin, quantity=quantity)
+    except IntegrityError:
+        # Parallel angelegt (oder negativer Bestand): erneut als Update versuchen
+        if not _levels([item_id], warehouse_id, bin).update(quantity=F("quantity") + quantity):
+            raise
+
+
+def book_movement(item, quantity, kind, user=None, order=None, note="", warehouse=None, bin=""):
+    """Bucht eine Bewegung auf einen Lagerplatz (Standard: Standardplatz im
+    Stammlager); Item.quantity passt die Datenbank per Trigger an."""
+    item_id = _item_id(item)
+    warehouse_id = warehouse.pk if isinstance(warehouse, Warehouse) else warehouse
+    with transaction.atomic():
+        _add_to_level(item_id, quantity, warehouse_id, bin)
+        push.notify(item_ids=[item_id], warehouses=[warehouse_id])
+        new_quantity, home_id = Item.objects.filter(pk=item_id).values_list("quantity", "warehouse_id").get()
+        StockMovement.objects.create(
+            item_id=item_id, warehouse_id=warehouse_id or home_id, bin=bin, kind=kind, quantity=quantity,
+            user=_user(user), order=order, note=note,
+        )
+    return _refresh(item, new_quantity)
+
+
+def book_receipt(item, quantity, user=None, note="", warehouse=None, bin=""):
+    return book_movement(item, quantity, StockMovement.KIND_RECEIPT, user=user, note=note, warehouse=warehouse, bin=bin)
+
+
+def book_correction(item, new_quantity, user=None, note="", warehouse=None, bin=""):
+    """Setzt den Bestand absolut und bucht die Differenz als Korrektur.
+
+    Ohne ``warehouse`` ist ``new_quantity`` der Gesamtbestand und die Differenz
+    geht auf den Standardplatz im Stammlager, sonst gilt sie für den Lagerplatz.
+    """
+    item_id = _item_id(item)
+    warehouse_id = warehouse.pk if isinstance(warehouse, Warehouse) else warehouse
+    with transaction.atomic():
+        current = _lock_item(item_id)
+        if warehouse_id:
+            level = StockLevel.objects.filter(item_id=item_id, warehouse_id=warehouse_id, bin=bin).values_list("quantity", flat=True).first()
+            delta = new_quantity - (level or 0)
+        else:
+            delta = new_quantity - current
+        if delta:
+            book_movement(item_id, delta, StockMovement.KIND_CORRECTION, user=user, note=note, warehouse=warehouse_id, bin=bin)
+        new_total = current + delta
+    return _refresh(item, new_total)
+
+
+def transfer(item, quantity, from_warehouse, to_warehouse, from_bin="", to_bin="", user=None, note=""):
+    """Lagert Bestand zwischen zwei Lagerplätzen um (zwei Buchungen, Gesamtbestand bleibt)."""
+    item_id = _item_id(item)
+    with transaction.atomic():
+        book_movement(item_id, -quantity, StockMovement.KIND_TRANSFER, user=user, note=note, warehouse=from_warehouse, bin=from_bin)
+        book_movement(item_id, quantity, StockMovement.KIND_TRANSFER, user=user, note=note, warehouse=to_warehouse, bin=to_bin)
+
+
+def levels_by_item(item_ids, warehouse_id=None):
+    """Lagerplätze je Artikel für eine Seite Artikel: eine Abfrage über den
+    Unique-Index (item, warehouse, bin) statt einer je Artikel."""
+    levels = StockLevel.objects.filter(item_id__in=list(item_ids))
+    if warehouse_id:
+        levels = levels.filter(warehouse_id=warehouse_id)
+    result = defaultdict(list)
+    for row in levels.order_by("warehouse__name", "bin").values("item_id", "warehouse_id", "warehouse__name", "bin", "quantity"):
+        result[row["item_id"]].append(row)
+    return result
+
+
+def warehouse_totals(warehouse_ids=None):
+    """Bestand je Lager, aggregiert über den Index (warehouse, item)."""
+    levels = StockLevel.objects.order_by()
+    if warehouse_ids is not None:
+        levels = levels.filter(warehouse_id__in=list(warehouse_ids))
+    return dict(levels.values("warehouse_id").annotate(total=Sum("quantity")).values_list("warehouse_id", "total"))
+
+
+def in_warehouse(warehouse):
+    """Filterausdruck: Artikel mit einem Lagerplatz im Lager (EXISTS über den Index)."""
+    return Exists(StockLevel.objects.filter(item_id=OuterRef("pk"), warehouse=warehouse))
+
+
+def apply_increments(increments, kind, user=None, note=""):
+    """Mehrere Bestandsänderungen {item_id: delta} auf den Standardplätzen der
+    Stammlager mit einem UPDATE und einem INSERT buchen."""
+    increments = {item_id: delta for item_id, delta in increments.items() if delta}
+    if not increments:
+        return {}
+    with transaction.atomic():
+        delta = Case(*(When(item_id=item_id, then=Value(value)) for item_id, value in increments.items()), default=Value(0))
+        updated = _levels(list(increments)).update(quantity=F("quantity") + delta)
+        if updated < len(increments):
+            # Artikel ohne Standardplatz im Stammlager (z.B. nach Wechsel des Stammlagers)
+            present = set(_levels(list(increments)).values_list("item_id", flat=True))
+            homes = dict(Item.objects.filter(pk__in=[pk for pk in increments if pk not in present]).values_list("pk", "warehouse_id"))
+            StockLevel.objects.bulk_create(
+                StockLevel(item_id=pk, warehouse_id=warehouse_id, bin="", quantity=increments[pk]) for pk, warehouse_id in homes.items()
+            )
+        push.notify(item_ids=increments)
+        rows = Item.objects.filter(pk__in=list(increments)).values_list("pk", "quantity", "warehouse_id")
+        quantities = {}
+        per_warehouse = defaultdict(lambda: [0, 0])
+        movements = []
+        for pk, quantity, warehouse_id in rows:
+            quantities[pk] = quantity
+            per_warehouse[warehouse_id][1] += increments[pk]
+            movements.append(StockMovement(item_id=pk, warehouse_id=warehouse_id, kind=kind, quantity=increments[pk], user=_user(user), note=note))
+        StockMovement.objects.bulk_create(movements)
+        # bulk_create löst keine Signale aus
+        stats.bump_warehouses(per_warehouse)
+    return quantities
+
+
+def insert_select(model, fields, queryset):
+    """INSERT … SELECT: legt die Zeilen von ``queryset.values_list(...)`` in
+    ``model`` an, ohne dass sie die Datenbank verlassen; liefert die Zeilenzahl."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    meta = model._meta
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(meta.get_field(field).column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {quote(meta.db_table)} ({columns}) {sql}", params)
+        return cursor.rowcount
+
+
+MOVEMENT_FIELDS = ["item", "warehouse", "bin", "kind", "quantity", "user", "note", "created_at"]
+
+
+def _movement_values(kind, user, note, now):
+    # Konstante Spalten für INSERT … SELECT ins Bestandsbuch (Reihenfolge wie MOVEMENT_FIELDS ab "kind")
+    user = _user(user)
+    return (
+        Value(kind, CharField()), Value(user.pk if user else None, IntegerField()),
+        Value(note, CharField()), Value(now, DateTimeField()),
+    )
+
+
+def _create_missing_levels(items, warehouse_id=None):
+    # Fehlende Standardplätze (im Stammlager bzw. im angegebenen Lager) mit Bestand 0 anlegen
+    warehouse = Value(warehouse_id, IntegerField()) if warehouse_id else F("warehouse_id")
+    levels = StockLevel.objects.filter(item_id=OuterRef("pk"), warehouse_id=warehouse_id or OuterRef("warehouse_id"), bin="")
+    return insert_select(
+        StockLevel,
+        ["item", "warehouse", "bin", "quantity"],
+        items.filter(~Exists(levels)).values_list("pk", warehouse, Value("", CharField()), Value(0, IntegerField())),
+    )
+
+
+def move_items(item_ids, warehouse, user=None, note=""):
+    """Artikel samt Bestand in ein Lager umziehen (Admin-Massenaktion).
+
+    Das Stammlager wird ``warehouse`` und alle Lagerplätze werden auf dessen
+    Standardplatz umgelagert. Je Batch laufen nur mengenbasierte Anweisungen:
+    Umlagerungsbuchungen per INSERT … SELECT, je ein UPDATE für Ziel- und
+    Quellplätze und eines für die Artikel. Liefert die Zahl der Artikel.
+    """
+    warehouse_id = warehouse.pk if isinstance(warehouse, Warehouse) else warehouse
+    ids = list(item_ids)
+    now = timezone.now()
+    constants = _movement_values(StockMovement.KIND_TRANSFER, user, note, now)
+    target = (Value(warehouse_id, IntegerField()), Value("", CharField()))
+    moved = 0
+    with transaction.atomic():
+        for start in range(0, len(ids), BULK_BATCH_SIZE):
+            batch = ids[start:start + BULK_BATCH_SIZE]
+            items = Item.objects.filter(pk__in=batch)
+            sources = StockLevel.objects.filter(item_id__in=batch, quantity__gt=0).exclude(warehouse_id=warehouse_id, bin="")
+            # Zähler: Artikel beim Stammlager, Bestand bei dem Lager, in dem er liegt
+            changes = defaultdict(lambda: [0, 0])
+            for home_id, count in items.exclude(warehouse_id=warehouse_id).order_by().values("warehouse_id").annotate(n=Count("pk")).values_list("warehouse_id", "n"):
+                changes[home_id][0] -= count
+                changes[warehouse_id][0] += count
+            for source_id, total in sources.order_by().values("warehouse_id").annotate(total=Sum("quantity")).values_list("warehouse_id", "total"):
+                changes[source_id][1] -= total
+                changes[warehouse_id][1] += total
+            negated = ExpressionWrapper(Value(0) - F("quantity"), output_field=IntegerField())
+            insert_select(StockMovement, MOVEMENT_FIELDS, sources.values_list("item_id", "warehouse_id", "bin", *constants[:1], negated, *constants[1:]))
+            insert_select(
+                StockMovement,
+                MOVEMENT_FIELDS,
+                sources.order_by().values("item_id").annotate(total=Sum("quantity")).values_list("item_id", *target, *constants[:1], "total", *constants[1:]),
+            )
+            _create_missing_levels(items, warehouse_id)
+            incoming = sources.filter(item_id=OuterRef("item_id")).order_by().values("item_id").annotate(total=Sum("quantity")).values("total")
+            StockLevel.objects.filter(item_id__in=batch, warehouse_id=warehouse_id, bin="").update(
+                quantity=F("quantity") + Coalesce(Subquery(incoming), 0),
+            )
+            sources.update(quantity=0)
+            moved += items.update(warehouse_id=warehouse_id, updated_at=now)
+            # Quelllager (jetzt 0) und Ziellager melden
+            push.notify(item_ids=batch, warehouses=[None, *changes])
+            # Mengenbasierte UPDATEs lösen keine Signale aus
+            stats.bump_warehouses(changes)
+    return moved
+
+
+def adjust_items(item_ids, delta, user=None, note=""):
+    """Bestand mehrerer Artikel um ``delta`` ändern (Admin-Massenaktion).
+
+    Gebucht wird auf den Standardplatz im Stammlager, nie unter 0. Die
+    Korrekturbuchungen entstehen per INSERT … SELECT vor dem UPDATE aus
+    derselben Bedingung; liefert die Zahl geänderter Lagerplätze.
+    """
+    ids = list(item_ids)
+    if not delta:
+        return 0
+    now = timezone.now()
+    constants = _movement_values(StockMovement.KIND_CORRECTION, user, note, now)
+    new_quantity = Greatest(F("quantity") + delta, 0)
+    adjusted = 0
+    with transaction.atomic():
+        for start in range(0, len(ids), BULK_BATCH_SIZE):
+            batch = ids[start:start + BULK_BATCH_SIZE]
+            if delta > 0:
+                _create_missing_levels(Item.objects.filter(pk__in=batch))
+            levels = _levels(batch).annotate(change=ExpressionWrapper(new_quantity - F("quantity"), output_field=IntegerField())).exclude(change=0)
+            changes = {
+                warehouse_id: [0, total]
+                for warehouse_id, total in levels.order_by().values("warehouse_id").annotate(total=Sum("change")).values_list("warehouse_id", "total")
+            }
+            insert_select(StockMovement, MOVEMENT_FIELDS, levels.values_list("item_id", "warehouse_id", "bin", *constants[:1], "change", *constants[1:]))
+            adjusted += StockLevel.objects.filter(pk__in=levels.values("pk")).update(quantity=new_quantity)
+            push.notify(item_ids=batch)
+            stats.bump_warehouses(changes)
+    return adjusted
+
+
+def _clean_lines(lines):
+    cleaned = []
+    for index, line in enumerate(lines):
+        sku = str(line.get("sku", "")).strip() if isinstance(line, dict) else ""
+        quantity = line.get("quantity") if isinstance(line, dict) else None
+        if not sku or len(sku) > 50:
+            cleaned.append((index, sku, quantity, "Ungültige SKU"))
+        elif not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+            cleaned.append((index, sku, quantity, "Menge muss eine positive ganze Zahl sein"))
+        else:
+            cleaned.append((index, sku, quantity, None))
+    return cleaned
+
+
+def receive_lines(lines, user=None, warehouse=None, note=""):
+    """Bucht geprüfte Zugänge [(code, menge), ...] gesammelt (muss in einer Transaktion laufen).
+
+    Codes werden über barcodes.resolve_many aufgelöst (SKU oder Alias); Gebindecodes
+    buchen menge x pack_size. Liefert ``(items, created, quantities, unbookable)``:
+    Code -> Artikel-ID, neu angelegte Codes, neuer Bestand je Artikel-ID und Codes,
+    die nicht gebucht werden konnten.
+    """
+    totals = Counter()
+    for sku, quantity in lines:
+        totals[sku] += quantity
+    matches = barcodes.resolve_many(list(totals))
+    items = {sku: match.item_id for sku, match in matches.items()}
+    missing = [sku for sku in totals if sku not in items]
+    unbookable = set()
+    warehouse = warehouse or (Warehouse.objects.order_by("pk").first() if missing else None)
+    if missing and warehouse is None:
+        # Ohne Lager können keine neuen Artikel angelegt werden
+        unbookable.update(missing)
+        for sku in missing:
+            del totals[sku]
+        missing = []
+    if missing:
+        # Ein Artikel je normalisiertem Code ("0123" und "123" sind derselbe);
+        # Name zunächst = SKU, die Bezeichnung wird im Hintergrund nachgeschlagen
+        new = {}
+        for sku in missing:
+            new.setdefault(barcodes.normalize(sku), sku)
+        created = Item.objects.bulk_create(Item(name=sku, sku=sku, quantity=0, warehouse=warehouse) for sku in new.values())
+        created_ids = {barcodes.normalize(item.sku): item.pk for item in created}
+        items.update((sku, created_ids[barcodes.normalize(sku)]) for sku in missing)
+        stats.bump_item(warehouse.pk, items=len(created))
+        from . import jobs
+
+        transaction.on_commit(lambda: jobs.enqueue("resolve_article_names", {"item_ids": list(created_ids.values())}))
+    increments = Counter()
+    for sku, total in totals.items():
+        # Mehrere Codes desselben Artikels summieren statt sich zu überschreiben
+        increments[items[sku]] += matches[sku].quantity(total) if sku in matches else total
+    quantities = apply_increments(dict(increments), StockMovement.KIND_RECEIPT, user=user, note=note)
+    return items, set(missing), quantities, unbookable
+
+
+def book_receipt_batch(batch_id, lines, user=None, warehouse=None):
+    """Sammel-Wareneingang: alle SKUs in einer Abfrage auflösen, fehlende Artikel
+    gesammelt anlegen und alle Zugänge in einer Transaktion buchen.
+
+    Gleiche ``batch_id`` (Wiederholung nach Verbindungsabbruch) liefert das
+    gespeicherte Ergebnis, ohne erneut zu buchen.
+    """
+    existing = ReceiptBatch.objects.filter(batch_id=batch_id).first()
+    if existing is not None:
+        return {**existing.result, "duplicate": True}
+    cleaned = _clean_lines(lines)
+    try:
+        with transaction.atomic():
+            batch = ReceiptBatch.objects.create(batch_id=batch_id, user=_user(user), line_count=len(cleaned))
+            valid = [(sku, quantity) for _, sku, quantity, error in cleaned if error is None]
+            items, created, quantities, unbookable = receive_lines(valid, user=user, warehouse=warehouse, note=f"Batch {batch_id}")
+            results = []
+            for index, sku, quantity, error in cleaned:
+                if error is None and sku in unbookable:
+                    error = "Artikel unbekannt und kein Lager vorhanden"
+                if error:
+                    results.append({"line": index, "sku": sku, "status": "error", "error": error})
+                else:
+                    results.append({
+                        "line": index,
+                        "sku": sku,
+                        "quantity": quantity,
+                        "status": "ok",
+                        "item_id": items[sku],
+                        "created": sku in created,
+                        "new_quantity": quantities[items[sku]],
+                    })
+            booked = sum(1 for result in results if result["status"] == "ok")
+            batch.result = {"batch_id": batch_id, "booked": booked, "rejected": len(results) - booked, "lines": results}
+            batch.save(update_fields=["result"])
+    except IntegrityError:
+        # Gleichzeitige Wiederholung derselben batch_id hat zuerst gebucht
+        existing = ReceiptBatch.objects.filter(batch_id=batch_id).first()
+        if existing is None or existing.result is None:
+            raise
+        return {**existing.result, "duplicate": True}
+    return {**batch.result, "duplicate": False}
+
+
+ITEM_MASTER_FIELDS = ["name", "sku", "warehouse", "updated_at"]
+
+
+def save_item_master(item):
+    """Speichert die Stammdaten eines bestehenden Artikels, nie ``quantity``.
+
+    ``quantity`` pflegt der Trigger; ein volles UPDATE würde einen veralteten
+    Wert zurückschreiben, wenn dazwischen gebucht wurde. Bei neuem Stammlager
+    werden Zähler und Standardplatz nachgeführt.
+    """
+    with transaction.atomic():
+        old_warehouse_id = Item.objects.filter(pk=item.pk).values_list("warehouse_id", flat=True).get()
+        item.save(update_fields=ITEM_MASTER_FIELDS)
+        if old_warehouse_id != item.warehouse_id:
+            # Neues Stammlager: der Bestand bleibt auf seinen Lagerplätzen (Umlagern per transfer)
+            stats.move_item(old_warehouse_id, item.warehouse_id, 0)
+            StockLevel.objects.get_or_create(item=item, warehouse_id=item.warehouse_id, bin="")
+    return item
+
+
+def save_item(form, user=None):
+    """Speichert ein ItemForm; Bestandsänderungen laufen über das Bestandsbuch."""
+    with transaction.atomic():
+        item = form.save(commit=False)
+        quantity = item.quantity
+        if item.pk:
+            save_item_master(item)
+        else:
+            item.quantity = 0
+            item.save()
+        book_correction(item, quantity, user=user, note="Artikelstamm")
+    return item
+
+
+def level_ledger():
+    return (
+        StockMovement.objects.filter(item=OuterRef("item_id"), warehouse=OuterRef("warehouse_id"), bin=OuterRef("bin"))
+        .order_by()
+        .values("item")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+
+
+def level_totals():
+    return StockLevel.objects.filter(item=OuterRef("pk")).order_by().values("item").annotate(total=Sum("quantity")).values("total")
+
+
+def reconcile(dry_run=False):
+    """Baut die Lagerplätze aus dem Bestandsbuch und Item.quantity aus den
+    Lagerplätzen neu auf; liefert die Zahl abweichender Artikel."""
+    ledger = Coalesce(Subquery(level_ledger()), Value(0))
+    total = Coalesce(Subquery(level_totals()), Value(0))
+    with transaction.atomic():
+        drifted_levels = StockLevel.objects.annotate(ledger_quantity=ledger).filter(~Q(quantity=F("ledger_quantity")))
+        # Buchungen auf Lagerplätze, für die es keine StockLevel-Zeile gibt
+        unplaced = list(
+            StockMovement.objects.exclude(warehouse=None)
+            .filter(~Exists(StockLevel.objects.filter(item=OuterRef("item"), warehouse=OuterRef("warehouse"), bin=OuterRef("bin"))))
+            .order_by()
+            .values("item_id", "warehouse_id", "bin")
+            .annotate(total=Sum("quantity"))
+        )
+        drifted_items = Item.objects.annotate(level_quantity=total).filter(~Q(quantity=F("level_quantity")))
+        affected = (
+            set(drifted_levels.values_list("item_id", flat=True))
+            | {row["item_id"] for row in unplaced}
+            | set(drifted_items.values_list("pk", flat=True))
+        )
+        if affected and not dry_run:
+            # Set-basierte UPDATEs statt einer Schleife; die Trigger führen die Summen nach
+            StockLevel.objects.filter(pk__in=drifted_levels.values("pk")).update(quantity=ledger)
+            StockLevel.objects.bulk_create(
+                StockLevel(item_id=row["item_id"], warehouse_id=row["warehouse_id"], bin=row["bin"], quantity=row["total"]) for row in unplaced
+            )
+            Item.objects.filter(pk__in=drifted_items.values("pk")).update(quantity=total, updated_at=timezone.now())
+    if affected and not dry_run:
+        stats.recompute()
+    return len(affected)
@@ -0,0 +1,63 @@
+{% load static %}// Service Worker der Touch-App: App-Shell offline verfügbar, Warteschlange per Background Sync leeren
+importScripts('{% static "viastore_app/touch_offline.js" %}');
+
+var CACHE = 'viastore-touch-v2';
+var STATIC_URL = '{% get_static_prefix %}';
+// Hash-Namen (ManifestStaticFilesStorage): neue Versionen bekommen neue URLs und damit einen neuen Service Worker
+var SHELL = [
+    '{% url "touch_main" %}',
+    '{% static "viastore_app/touch_offline.js" %}',
+    '{% static "viastore_app/touch_sync.js" %}',
+    '{% static "viastore_app/touch_receipt.js" %}',
+    '{% static "viastore_app/base.js" %}',
+    '{% static "viastore_app/vendor/bootstrap/css/bootstrap.min.css" %}',
+    '{% static "viastore_app/vendor/bootstrap/js/bootstrap.min.js" %}',
+    '{% static "viastore_app/vendor/fontawesome/css/all.min.css" %}',
+    '{% static "viastore_app/vendor/fontawesome/webfonts/fa-solid-900.woff2" %}',
+    '{% static "viastore_app/vendor/html5-qrcode/html5-qrcode.min.js" %}'
+];
+var SYNC_URL = '{% url "touch_sync_api" %}';
+
+self.addEventListener('install', function(event) {
+    event.waitUntil(caches.open(CACHE).then(function(cache) { return cache.addAll(SHELL); }).then(function() { return self.skipWaiting(); }));
+});
+
+self.addEventListener('activate', function(event) {
+    event.waitUntil(
+        caches.keys()
+            .then(function(keys) {
+                return Promise.all(keys.filter(function(key) { return key !== CACHE; }).map(function(key) { return caches.delete(key); }));
+            })
+            .then(function() { return self.clients.claim(); })
+    );
+});
+
+self.addEventListener('fetch', function(event) {
+    var request = event.request;
+    if (request.method !== 'GET' || request.url.indexOf('/api/') !== -1) return;
+    if (new URL(request.url).pathname.indexOf(STATIC_URL) === 0) {
+        // Statische Dateien ändern sich nie unter derselben URL: Cache zuerst
+        event.respondWith(caches.match(request).then(function(cached) { return cached || fetch(request); }));
+        return;
+    }
+    // Netzwerk zuerst, bei Funkloch aus dem Cache
+    event.respondWith(
+        fetch(request)
+            .then(function(response) {
+                if (response.ok || response.type === 'opaque') {
+                    var copy = response.clone();
+                    caches.open(CACHE).then(function(cache) { cache.put(request, copy); });
+                }
+                return response;
+            })
+            .catch(function() {
+                return caches.match(request, { ignoreSearch: request.mode === 'navigate' });
+            })
+    );
+});
+
+self.addEventListener('sync', function(event) {
+    if (event.tag === 'touch-sync') {
+        event.waitUntil(TouchQueue.flush(SYNC_URL));
+    }
+});
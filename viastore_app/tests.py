@@ -1,3 +1,1298 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from urllib.parse import urlencode
+
+import openpyxl
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from viastore_project.db_config import database_config
+
+from . import article_lookup, assets, barcodes, jobs, push, replenishment, seeding, snapshots, startup, stats, stock, views_touch
+from .archive import archive_orders
+from .article_lookup import ArticleNameResolver, LookupCache, Provider
+from .importer import ItemImporter
+from .middleware import InstrumentationMiddleware
+from .pagination import EstimatedCountPaginator
+from .models import Warehouse, Item, ItemBarcode, StockLevel, Order, OrderArchive, Job, ArticleNameCache, StockMovement, ReorderRule, ReorderSuggestion, StatCounter, StockSnapshot, StockSnapshotLine, TouchScan
+
+
+class ItemImporterTests(TestCase):
+    def test_inserts_updates_and_rejects(self):
+        warehouse = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        Item.objects.create(name="Alt", sku="A1", quantity=1, warehouse=warehouse)
+        rows = [
+            ("Regal", "A1", 7, "Lager Nord"),
+            ("Palette", 4006381333931.0, 3, "Lager Süd"),
+            ("Ohne Menge", "B2", "x", "Lager Nord"),
+            (None, None, None, None),
+            ("Ohne SKU", None, 1, "Lager Nord"),
+        ]
+        report = ItemImporter(chunk_size=2).run(rows)
+        self.assertEqual((report.inserted, report.updated, report.rejected), (1, 1, 2))
+        self.assertEqual([row for row, _ in report.errors], [4, 6])
+        self.assertEqual(Item.objects.get(sku="A1").quantity, 7)
+        palette = Item.objects.get(sku="4006381333931")
+        self.assertEqual(palette.warehouse.name, "Lager Süd")
+        self.assertEqual(Warehouse.objects.count(), 2)
+
+    def test_duplicate_sku_in_chunk_last_row_wins(self):
+        report = ItemImporter().run([("A", "X1", 1, "L"), ("B", "X1", 5, "L")])
+        self.assertEqual(report.inserted, 1)
+        self.assertEqual(Item.objects.get(sku="X1").quantity, 5)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.user = User.objects.create_user("lager", password="pw")
+        self.client.force_login(self.user)
+
+    def _workbook(self):
+        wb = openpyxl.Workbook()
+        wb.active.append(["Name", "SKU", "Menge", "Lagername"])
+        wb.active.append(["Regal", "R1", 4, "Lager Nord"])
+        buffer = BytesIO()
+        wb.save(buffer)
+        return SimpleUploadedFile("import.xlsx", buffer.getvalue())
+
+    def test_import_is_queued_and_processed_by_worker(self):
+        with override_settings(MEDIA_ROOT=self.media_root):
+            response = self.client.post("/import-excel/", {"file": self._workbook()})
+            job = response.context["job"]
+            self.assertEqual(Job.objects.get(pk=job.pk).status, Job.STATUS_QUEUED)
+            self.assertFalse(Item.objects.exists())
+            jobs.run_pending()
+        status = self.client.get(f"/api/jobs/{job.pk}/").json()
+        self.assertEqual(status["status"], Job.STATUS_DONE)
+        self.assertEqual(status["result"]["inserted"], 1)
+        self.assertEqual(status["progress_done"], 1)
+        self.assertEqual(Item.objects.get(sku="R1").quantity, 4)
+
+    def test_failed_job_records_error(self):
+        job = Job.objects.create(kind="import_excel")
+        with self.assertLogs("viastore_app.jobs", "ERROR"):
+            jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertTrue(job.error)
+
+    def test_claim_is_exclusive(self):
+        job = Job.objects.create(kind="import_excel")
+        self.assertEqual(jobs.claim_next(), job.pk)
+        self.assertIsNone(jobs.claim_next())
+
+    def test_failed_job_keeps_upload_for_retry(self):
+        with override_settings(MEDIA_ROOT=self.media_root):
+            job = Job.objects.create(kind="import_excel", upload=SimpleUploadedFile("kaputt.xlsx", b"kein Excel"))
+            path = job.upload.path
+            with self.assertLogs("viastore_app.jobs", "ERROR"):
+                jobs.run_pending()
+            self.assertTrue(Path(path).exists())
+            self.assertEqual(jobs.retry([job.pk]), 1)
+            self.assertEqual(Job.objects.get(pk=job.pk).status, Job.STATUS_QUEUED)
+            Job.objects.filter(pk=job.pk).update(status=Job.STATUS_FAILED, finished_at=timezone.now() - timedelta(days=20))
+            self.assertEqual(jobs.purge_failed_uploads(14), 1)
+            self.assertFalse(Path(path).exists())
+            self.assertFalse(Job.objects.get(pk=job.pk).upload)
+
+    def test_requeue_only_jobs_with_stale_heartbeat(self):
+        long_ago = timezone.now() - timedelta(hours=2)
+        healthy = Job.objects.create(kind="import_excel", status=Job.STATUS_RUNNING, started_at=long_ago, heartbeat_at=timezone.now())
+        crashed = Job.objects.create(kind="import_excel", status=Job.STATUS_RUNNING, started_at=long_ago, heartbeat_at=long_ago)
+        self.assertEqual(jobs.requeue_stale(300), 1)
+        self.assertEqual(Job.objects.get(pk=healthy.pk).status, Job.STATUS_RUNNING)
+        self.assertEqual(Job.objects.get(pk=crashed.pk).status, Job.STATUS_QUEUED)
+        jobs.heartbeat([healthy.pk])
+        self.assertEqual(jobs.requeue_stale(0.5 * jobs.HEARTBEAT_INTERVAL), 0)
+
+
+class StubProvider(Provider):
+    def __init__(self, name, result=None, delay=0.0):
+        self.name = name
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+
+    def lookup(self, sku, session, timeout):
+        self.calls += 1
+        time.sleep(self.delay)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class ArticleLookupTests(TestCase):
+    def resolver(self, *providers, deadline=1.0, cache=None):
+        return ArticleNameResolver(providers, cache=cache, deadline=deadline, session=object())
+
+    def test_chain_order_wins_over_speed(self):
+        slow = StubProvider("slow", "Bevorzugt", delay=0.1)
+        fast = StubProvider("fast", "Schnell")
+        result = self.resolver(slow, fast).resolve("123")
+        self.assertEqual((result.name, result.provider), ("Bevorzugt", "slow"))
+
+    def test_providers_run_concurrently_within_deadline(self):
+        providers = [StubProvider(f"p{i}", None, delay=0.2) for i in range(4)] + [StubProvider("hit", "Regal", delay=0.2)]
+        started = time.monotonic()
+        result = self.resolver(*providers).resolve("123")
+        self.assertEqual(result.name, "Regal")
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_deadline_returns_best_available(self):
+        hanging = StubProvider("hanging", "Zu spät", delay=1.0)
+        fallback = StubProvider("fallback", "Palette")
+        failing = StubProvider("failing", RuntimeError("offline"))
+        started = time.monotonic()
+        result = self.resolver(hanging, failing, fallback, deadline=0.2).resolve("123")
+        self.assertLess(time.monotonic() - started, 0.6)
+        self.assertEqual(result.name, "Palette")
+
+    def test_cache_stores_positive_and_negative_entries(self):
+        cache = LookupCache()
+        hit = StubProvider("hit", "Regal")
+        self.resolver(hit, cache=cache).resolve("1")
+        result = self.resolver(hit, cache=cache).resolve("1")
+        self.assertTrue(result.cached)
+        self.assertEqual(hit.calls, 1)
+        miss = StubProvider("miss", None)
+        self.resolver(miss, cache=cache).resolve("2")
+        result = self.resolver(miss, cache=cache).resolve("2")
+        self.assertTrue(result.cached)
+        self.assertFalse(result.found)
+        self.assertEqual(miss.calls, 1)
+
+    def test_timeouts_are_not_cached_negative(self):
+        cache = LookupCache()
+        self.resolver(StubProvider("hanging", None, delay=0.5), deadline=0.05, cache=cache).resolve("1")
+        self.assertFalse(ArticleNameCache.objects.filter(sku="1").exists())
+
+    def test_cache_evicts_least_recently_used_every_n_writes(self):
+        cache = LookupCache(max_entries=2, evict_every=4)
+        for sku in ("1", "2", "3"):
+            cache.set(sku, f"Artikel {sku}")
+        # Noch kein Aufräumen fällig: kein DELETE/COUNT auf dem Lookup-Pfad
+        self.assertEqual(ArticleNameCache.objects.count(), 3)
+        with CaptureQueriesContext(connection) as queries:
+            cache.set("4", "Artikel 4")
+        self.assertFalse(any("COUNT(" in query["sql"] for query in queries.captured_queries))
+        self.assertEqual(sorted(ArticleNameCache.objects.values_list("sku", flat=True)), ["3", "4"])
+
+
+class AsyncStubProvider(StubProvider):
+    async def alookup(self, sku, session, timeout):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.result
+
+
+class StubResponse:
+    ok = True
+
+    def __init__(self, url):
+        self.url = url
+
+    def json(self):
+        return {"product": {"product_name": f"Artikel aus {self.url}"}}
+
+
+class StubSession:
+    def __init__(self):
+        self.threads = []
+
+    def get(self, url, timeout):
+        self.threads.append(threading.current_thread().name)
+        return StubResponse(url)
+
+
+class AsyncArticleLookupTests(TestCase):
+    def resolver(self, *providers, deadline=1.0):
+        return ArticleNameResolver(providers, deadline=deadline, session=object())
+
+    async def test_concurrent_lookups_of_one_sku_are_coalesced(self):
+        provider = AsyncStubProvider("hit", "Regal", delay=0.1)
+        resolver = self.resolver(provider)
+        results = await asyncio.gather(*(resolver.aresolve("123") for _ in range(20)), resolver.aresolve("456"))
+        self.assertEqual({result.name for result in results}, {"Regal"})
+        self.assertEqual(provider.calls, 2)
+        await resolver.aresolve("123")
+        self.assertEqual(provider.calls, 3)
+
+    def test_lookups_from_separate_request_loops_share_one_flight(self):
+        # Unter WSGI läuft jede async View in einer eigenen Loop (async_to_sync je Request)
+        provider = AsyncStubProvider("hit", "Regal", delay=0.2)
+        resolver = self.resolver(provider)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(async_to_sync(resolver.aresolve)("123"))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(([result.name for result in results], provider.calls), (["Regal"] * 5, 1))
+
+    async def test_provider_without_async_path_falls_back_to_lookup(self):
+        with self.assertRaises(TypeError):
+            Provider()
+        self.assertEqual(await StubProvider("sync", "Palette").alookup("123", session=None, timeout=1), "Palette")
+
+    async def test_deadline_cancels_slow_providers_and_runs_sync_ones_in_threads(self):
+        hanging = AsyncStubProvider("hanging", "Zu spät", delay=5)
+        fallback = StubProvider("fallback", "Palette", delay=0.05)
+        started = time.monotonic()
+        result = await self.resolver(hanging, fallback, deadline=0.2).aresolve("123")
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual((result.name, result.provider), ("Palette", "fallback"))
+
+    async def test_http_providers_use_the_shared_session_in_the_lookup_pool(self):
+        session = StubSession()
+        provider = article_lookup.OpenFoodFactsJsonProvider()
+        resolver = ArticleNameResolver([provider], deadline=1.0, session=session)
+        result = await resolver.aresolve("400")
+        self.assertEqual(result.name, "Artikel aus https://world.openfoodfacts.org/api/v0/product/400.json")
+        # Blockierendes requests-GET im Thread-Pool der Lookup-Loop, nicht im Request
+        self.assertEqual(len(session.threads), 1)
+        self.assertTrue(session.threads[0].startswith("article-lookup-io"))
+
+    async def test_item_info_endpoint_is_async(self):
+        self.assertTrue(asyncio.iscoroutinefunction(views_touch.google_item_info_api))
+        self.addCleanup(setattr, article_lookup, "_resolver", article_lookup._resolver)
+        article_lookup._resolver = self.resolver(AsyncStubProvider("hit", "Regal"))
+        response = await self.async_client.get("/api/google-item-info/4006381333931/")
+        self.assertEqual(response.json(), {"name": "Regal"})
+
+    def test_local_item_info_resolves_barcodes(self):
+        item = Item.objects.create(name="Regal", sku="4006381333931", warehouse=Warehouse.objects.create(name="Lager"))
+        self.assertEqual(self.client.get("/api/item-info/4006381333931/").status_code, 302)
+        self.client.force_login(User.objects.create_user("lager"))
+        self.assertEqual(self.client.get("/api/item-info/04006381333931/").json(), {"name": item.name})
+        response = self.client.get("/api/item-info/999/")
+        self.assertEqual((response.status_code, response.json()), (404, {"error": "Artikel nicht gefunden"}))
+
+
+class StockLedgerTests(TestCase):
+    def setUp(self):
+        self.warehouse = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        self.item = Item.objects.create(name="Regal", sku="R1", warehouse=self.warehouse)
+
+    def test_bookings_write_movements(self):
+        stock.book_receipt(self.item, 10)
+        stock.book_correction(self.item, 7)
+        stock.book_correction(self.item, 7)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 7)
+        self.assertEqual(
+            list(self.item.movements.order_by("pk").values_list("kind", "quantity")),
+            [(StockMovement.KIND_RECEIPT, 10), (StockMovement.KIND_CORRECTION, -3)],
+        )
+
+    def test_reconcile_rebuilds_quantities_from_ledger(self):
+        stock.book_receipt(self.item, 5)
+        other = Item.objects.create(name="Palette", sku="P1", quantity=9, warehouse=self.warehouse)
+        Item.objects.filter(pk=self.item.pk).update(quantity=99)
+        self.assertEqual(stock.reconcile(dry_run=True), 2)
+        self.assertEqual(stock.reconcile(), 2)
+        self.assertEqual(Item.objects.get(pk=self.item.pk).quantity, 5)
+        self.assertEqual(Item.objects.get(pk=other.pk).quantity, 0)
+        self.assertEqual(stock.reconcile(), 0)
+
+
+class StockConcurrencyTests(TransactionTestCase):
+    def test_parallel_bookings_lose_no_update(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Parallele Schreiber brauchen eine Datei-Datenbank")
+        warehouse = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        item = Item.objects.create(name="Regal", sku="R1", warehouse=warehouse)
+        threads_count, bookings = 8, 25
+        errors = []
+        start = threading.Barrier(threads_count)
+
+        def worker():
+            try:
+                start.wait()
+                for _ in range(bookings):
+                    stock.book_receipt(item.pk, 1)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        item.refresh_from_db()
+        self.assertEqual(item.quantity, threads_count * bookings)
+        self.assertEqual(item.movements.count(), threads_count * bookings)
+
+
+class ItemListPaginationTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("lager", password="pw"))
+        self.nord = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        self.sued = Warehouse.objects.create(name="Lager Süd", location="München")
+
+    def _create(self, count, warehouse, prefix="ART"):
+        Item.objects.bulk_create(
+            Item(name=f"Artikel {i:03d}", sku=f"{prefix}{i:04d}", quantity=i, warehouse=warehouse) for i in range(count)
+        )
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self._create(3, self.nord, "A")
+        # Bestandsauskunft lädt zusätzlich die Lagerplätze der Seite (eine Abfrage)
+        expected = {"/artikel/": 4, "/bestandsauskunft/": 5}
+        for url, count in expected.items():
+            with self.assertNumQueries(count):
+                self.client.get(url)
+        self._create(40, self.sued, "B")
+        for url, count in expected.items():
+            with self.assertNumQueries(count):
+                response = self.client.get(url)
+            self.assertContains(response, "Lager Süd")
+
+    def test_cursor_walks_all_rows_forward_and_back(self):
+        self._create(25, self.nord)
+        seen = []
+        url = "/artikel/?size=10&sort=-quantity"
+        while url:
+            response = self.client.get(url if url.startswith("/") else "/artikel/" + url)
+            seen.extend(item.quantity for item in response.context["items"])
+            url = response.context.get("next_url")
+        self.assertEqual(seen, list(range(24, -1, -1)))
+        previous = self.client.get("/artikel/" + response.context["previous_url"])
+        self.assertEqual([item.quantity for item in previous.context["items"]], list(range(14, 4, -1)))
+
+    def test_filters(self):
+        self._create(5, self.nord, "NORD")
+        self._create(5, self.sued, "SUED")
+        response = self.client.get("/bestandsauskunft/", {"warehouse": self.sued.pk, "sku": "SUED000", "name": "004"})
+        self.assertEqual([item.sku for item in response.context["items"]], ["SUED0004"])
+
+
+class ItemAutocompleteTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("lager", password="pw"))
+        self.warehouse = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        self.regal = Item.objects.create(name="Regal", sku="REGAL002", warehouse=self.warehouse)
+        Item.objects.create(name="Palette", sku="PAL003", warehouse=self.warehouse)
+        Item.objects.create(name="Rolltor", sku="X1", warehouse=self.warehouse)
+
+    def test_search_matches_sku_and_name_prefix(self):
+        results = self.client.get("/api/item-search/", {"q": "r"}).json()["results"]
+        self.assertEqual([row["sku"] for row in results], ["REGAL002", "X1"])
+        results = self.client.get("/api/item-search/", {"q": "pal", "limit": 1}).json()["results"]
+        self.assertEqual([row["sku"] for row in results], ["PAL003"])
+
+    def test_forms_do_not_render_all_items(self):
+        for url in ("/wareneingang/", "/bestandskorrektur/", "/bestellung-anlegen/"):
+            response = self.client.get(url)
+            self.assertNotContains(response, "<option")
+            self.assertNotContains(response, "Palette")
+
+    def test_receipt_validates_submitted_pk(self):
+        self.client.post("/wareneingang/", {"item": self.regal.pk, "quantity": 3})
+        self.regal.refresh_from_db()
+        self.assertEqual(self.regal.quantity, 3)
+        response = self.client.post("/wareneingang/", {"item": 999999, "quantity": 3})
+        self.assertTrue(response.context["form"].errors["item"])
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("lager", password="pw"))
+
+    def test_counters_follow_bookings_and_match_recompute(self):
+        self.client.get("/")
+        nord = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        sued = Warehouse.objects.create(name="Lager Süd", location="München")
+        regal = Item.objects.create(name="Regal", sku="R1", quantity=4, warehouse=nord)
+        stock.book_receipt(regal, 6)
+        Order.objects.create(order_number="ORD1", item=regal, quantity=1)
+        ItemImporter().run([("Palette", "P1", 5, "Lager Süd"), ("Regal", "R1", 3, "Lager Süd")])
+        Item.objects.filter(sku="P1").delete()
+        incremental = stats.dashboard_stats()
+        stats.recompute()
+        self.assertEqual(incremental, stats.dashboard_stats())
+        self.assertEqual((incremental["warehouse_count"], incremental["item_count"], incremental["order_count"]), (2, 1, 1))
+        by_name = {entry["name"]: entry for entry in incremental["warehouses"]}
+        self.assertEqual(by_name["Lager Süd"], {"name": "Lager Süd", "items": 1, "stock": 3})
+        self.assertEqual(incremental["orders_per_day"][-1]["orders"], 1)
+        sued.delete()
+        self.assertEqual(stats.dashboard_stats()["item_count"], 0)
+
+    def test_dashboard_does_not_count_big_tables(self):
+        self.client.get("/")
+        # Session, Benutzer, Zähler, Nachschub-Widget
+        with self.assertNumQueries(4) as queries:
+            self.client.get("/")
+        self.assertFalse(any("COUNT" in query["sql"] for query in queries.captured_queries))
+
+
+class ReceiptBatchApiTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("lager", password="pw"))
+        self.warehouse = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        self.regal = Item.objects.create(name="Regal", sku="R1", quantity=2, warehouse=self.warehouse)
+
+    def post(self, payload):
+        return self.client.post("/api/wareneingang/batch/", payload, content_type="application/json")
+
+    def test_books_lines_and_creates_missing_items(self):
+        lines = [{"sku": "R1", "quantity": 3}, {"sku": "NEU1", "quantity": 5}, {"sku": "R1", "quantity": 1}, {"sku": "", "quantity": 1}]
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(18):
+            data = self.post({"batch_id": "b-1", "lines": lines}).json()
+        self.assertEqual((data["booked"], data["rejected"], data["duplicate"]), (3, 1, False))
+        self.assertEqual([line["status"] for line in data["lines"]], ["ok", "ok", "ok", "error"])
+        self.assertTrue(data["lines"][1]["created"])
+        self.assertEqual(Item.objects.get(sku="R1").quantity, 6)
+        self.assertEqual(Item.objects.get(sku="NEU1").quantity, 5)
+        self.assertEqual(StockMovement.objects.filter(kind=StockMovement.KIND_RECEIPT).count(), 2)
+        self.assertTrue(Job.objects.filter(kind="resolve_article_names").exists())
+
+    def test_retry_with_same_batch_id_is_idempotent(self):
+        payload = {"batch_id": "b-2", "lines": [{"sku": "R1", "quantity": 4}]}
+        first = self.post(payload).json()
+        second = self.post(payload).json()
+        self.assertTrue(second["duplicate"])
+        self.assertEqual(first["lines"], second["lines"])
+        self.assertEqual(Item.objects.get(sku="R1").quantity, 6)
+
+    def test_rejects_malformed_payload(self):
+        self.assertEqual(self.post({"lines": []}).status_code, 400)
+        self.assertEqual(self.client.post("/api/wareneingang/batch/", "kaputt", content_type="application/json").status_code, 400)
+
+
+class TouchSyncTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("tablet", password="pw"))
+        self.warehouse = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        self.regal = Item.objects.create(name="Regal", sku="R1", warehouse=self.warehouse)
+
+    def sync(self, scans, device="tablet-1"):
+        response = self.client.post("/api/touch/sync/", {"device_id": device, "scans": scans}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def scan(self, sku, quantity, minute):
+        return {"id": str(uuid.uuid4()), "sku": sku, "quantity": quantity, "scanned_at": f"2026-01-01T10:{minute:02d}:00Z"}
+
+    def test_duplicate_and_out_of_order_batches_book_each_scan_once(self):
+        scans = [self.scan("R1", 1, minute) for minute in range(6)] + [self.scan("NEU", 2, 7)]
+        first = self.sync(scans[3:5])
+        # Tablet hat die Antwort verloren und sendet neu gemischte, teils doppelte Batches
+        second = self.sync(list(reversed(scans)) + scans[:2])
+        third = self.sync(scans[1:4])
+        self.assertEqual(first["booked"], 2)
+        self.assertEqual((second["booked"], second["duplicates"]), (5, 2))
+        self.assertEqual((third["booked"], third["duplicates"]), (0, 3))
+        self.assertEqual(set(second["acked"]), {scan["id"] for scan in scans})
+        self.assertEqual(Item.objects.get(sku="R1").quantity, 6)
+        self.assertEqual(Item.objects.get(sku="NEU").quantity, 2)
+        self.assertEqual(StockMovement.objects.filter(item__sku="R1").count(), 2)
+
+    def test_invalid_scans_are_rejected_but_acked(self):
+        bad = self.scan("R1", 0, 1)
+        data = self.sync([bad, {"id": "kaputt", "sku": "R1", "quantity": 1}])
+        self.assertEqual((data["booked"], data["invalid"]), (0, 1))
+        self.assertEqual(data["acked"], [bad["id"]])
+        self.assertEqual(data["results"][0]["status"], "rejected")
+        self.assertEqual(self.sync([bad])["duplicates"], 1)
+        # Ein kaputter Scan darf den Rest des Batches nicht mitreißen
+        no_sku = {**self.scan("", 0, 2), "quantity": None}
+        text_quantity = {**self.scan("", 0, 3), "quantity": "abc"}
+        bad_date = {**self.scan("R1", 2, 4), "scanned_at": "2024-13-45T00:00:00"}
+        data = self.sync([no_sku, text_quantity, bad_date])
+        self.assertEqual(data["booked"], 1)
+        self.assertEqual([result["status"] for result in data["results"]], ["rejected", "rejected", "booked"])
+        self.assertIsNone(TouchScan.objects.get(scan_id=bad_date["id"]).scanned_at)
+
+    def test_service_worker_is_served_under_touch_scope(self):
+        response = self.client.get("/touch/sw.js")
+        self.assertEqual(response["Content-Type"], "application/javascript")
+        self.assertContains(response, "/api/touch/sync/")
+
+
+class DatabaseConfigTests(SimpleTestCase):
+    def test_profiles(self):
+        base_dir = Path("/srv/viastore")
+        profile, databases = database_config(base_dir, {})
+        self.assertEqual(profile, "sqlite")
+        options = databases["default"]["OPTIONS"]
+        self.assertEqual(options["transaction_mode"], "IMMEDIATE")
+        self.assertIn("journal_mode=WAL", options["init_command"])
+        self.assertNotIn("OPTIONS", database_config(base_dir, {"VIASTORE_DB_PROFILE": "sqlite-basic"})[1]["default"])
+        postgres = database_config(base_dir, {"VIASTORE_DB_PROFILE": "postgres", "VIASTORE_DB_POOL": "1"})[1]["default"]
+        self.assertEqual(postgres["CONN_MAX_AGE"], 0)
+        self.assertEqual(postgres["OPTIONS"]["pool"]["max_size"], 20)
+        with self.assertRaises(ValueError):
+            database_config(base_dir, {"VIASTORE_DB_PROFILE": "mysql"})
+
+
+class HealthCheckTests(TestCase):
+    def test_health_db_without_login(self):
+        data = self.client.get("/health/db/").json()
+        self.assertEqual(data["status"], "ok")
+        self.assertEqual(data["vendor"], connection.vendor)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("export"))
+        nord = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        sued = Warehouse.objects.create(name="Lager Süd", location="München")
+        Item.objects.create(name="Regal", sku="R1", quantity=4, warehouse=nord)
+        schraube = Item.objects.create(name="Schraube", sku="S1", quantity=9, warehouse=sued)
+        Order.objects.create(order_number="B-1", item=schraube, quantity=3)
+        self.sued = sued
+
+    def content(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_csv_export_uses_stock_filters(self):
+        response = self.client.get("/export/bestand.csv", {"warehouse": self.sued.pk})
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        lines = self.content(response).decode("utf-8-sig").splitlines()
+        self.assertEqual(lines, ["SKU;Artikel;Lager;Standort;Bestand", "S1;Schraube;Lager Süd;München;9"])
+
+    def test_xlsx_order_export(self):
+        response = self.client.get("/export/bestellungen.xlsx", {"sku": "S"})
+        sheet = openpyxl.load_workbook(BytesIO(self.content(response))).active
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(rows[0][0], "Bestellnummer")
+        self.assertEqual(rows[1][0], "B-1")
+        self.assertEqual(rows[1][2:], ("S1", "Schraube", "Lager Süd", 3))
+        self.assertEqual(self.client.get("/export/bestand.pdf").status_code, 404)
+
+
+class OrderListArchiveTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("einkauf"))
+        warehouse = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        self.regal = Item.objects.create(name="Regal", sku="R1", quantity=10, warehouse=warehouse)
+        self.schraube = Item.objects.create(name="Schraube", sku="S1", quantity=10, warehouse=warehouse)
+        now = timezone.now()
+        for i in range(30):
+            order = Order.objects.create(order_number=f"B-{i:03d}", item=self.regal if i % 2 else self.schraube, quantity=1)
+            Order.objects.filter(pk=order.pk).update(order_date=now - timedelta(days=30 * i))
+        # Wareneingang zu einer Bestellung (Order = Einkaufsbestellung, Zugang)
+        order = Order.objects.get(order_number="B-020")
+        stock.book_movement(order.item_id, order.quantity, StockMovement.KIND_ORDER, order=order)
+        stats.recompute()
+
+    def walk(self, params):
+        numbers, url = [], "/bestellungen/?" + urlencode({**params, "size": 7})
+        while url:
+            response = self.client.get(url if url.startswith("/") else "/bestellungen/" + url)
+            numbers.extend(order.order_number for order in response.context["orders"])
+            url = response.context.get("next_url")
+        return numbers
+
+    def test_archive_moves_old_orders_in_batches(self):
+        self.assertEqual(archive_orders(365, dry_run=True), 17)
+        self.assertEqual(archive_orders(365, batch_size=5), 17)
+        self.assertEqual((Order.objects.count(), OrderArchive.objects.count()), (13, 17))
+        movement = StockMovement.objects.get(kind=StockMovement.KIND_ORDER)
+        self.assertEqual((movement.order_id, movement.note), (None, "B-020"))
+        self.assertEqual(stats.dashboard_stats()["order_count"], 30)
+        stats.recompute()
+        self.assertEqual(stats.dashboard_stats()["order_count"], 30)
+
+    def test_archive_orders_of_confirmed_suggestions(self):
+        ReorderRule.objects.create(item=self.regal, reorder_point=20, max_quantity=30)
+        replenishment.scan()
+        suggestion = ReorderSuggestion.objects.get(item=self.regal)
+        self.assertEqual(replenishment.confirm([suggestion.pk]), 1)
+        Order.objects.filter(order_number=replenishment.order_number(suggestion.pk)).update(order_date=timezone.now() - timedelta(days=400))
+        self.assertEqual(archive_orders(365), 18)
+        suggestion.refresh_from_db()
+        self.assertEqual((suggestion.order_id, suggestion.status), (None, ReorderSuggestion.STATUS_ORDERED))
+        self.assertTrue(OrderArchive.objects.filter(order_number=replenishment.order_number(suggestion.pk)).exists())
+
+    def test_list_pages_across_hot_table_and_archive(self):
+        archive_orders(365, batch_size=4)
+        self.assertEqual(self.walk({}), [f"B-{i:03d}" for i in range(13)])
+        self.assertEqual(self.walk({"include_archive": "on"}), [f"B-{i:03d}" for i in range(30)])
+        today = timezone.localdate()
+        filtered = self.walk({"include_archive": "on", "item": self.regal.pk, "date_from": today - timedelta(days=400), "date_to": today - timedelta(days=100)})
+        self.assertEqual(filtered, ["B-005", "B-007", "B-009", "B-011", "B-013"])
+
+
+class StockReadApiTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("erp"))
+        warehouse = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        self.items = Item.objects.bulk_create(
+            Item(name=f"Artikel {i}", sku=f"E{i:03d}", quantity=i, warehouse=warehouse) for i in range(5)
+        )
+
+    def test_bulk_lookup_in_one_query_with_etag(self):
+        ids = f"{self.items[0].pk},{self.items[1].pk},999999"
+        with self.assertNumQueries(3):  # Session, Benutzer, Artikel
+            response = self.client.get("/api/bestand/", {"ids": ids, "skus": "E004,FEHLT"})
+        data = response.json()
+        self.assertEqual([row["sku"] for row in data["items"]], ["E000", "E001", "E004"])
+        self.assertEqual(data["missing"], {"ids": [999999], "skus": ["FEHLT"]})
+        etag = response["ETag"]
+        again = self.client.get("/api/bestand/", {"ids": ids, "skus": "E004,FEHLT"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        stock.book_receipt(self.items[1], 3)
+        changed = self.client.get("/api/bestand/", {"ids": ids, "skus": "E004,FEHLT"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()["items"][1]["quantity"], 4)
+        posted = self.client.post("/api/bestand/", json.dumps({"skus": ["E002"]}), content_type="application/json")
+        self.assertEqual(posted.json()["items"][0]["quantity"], 2)
+
+    def test_item_endpoint_answers_304_until_booking(self):
+        url = f"/api/item-bestand/{self.items[2].pk}/"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        stock.book_correction(self.items[2], 10)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_delta_feed_returns_changed_items(self):
+        first = self.client.get("/api/bestand/aenderungen/", {"limit": 3}).json()
+        self.assertEqual(len(first["items"]), 3)
+        rest = self.client.get("/api/bestand/aenderungen/", {"limit": 3, "cursor": first["next_cursor"]}).json()
+        self.assertEqual(len(rest["items"]), 2)
+        self.assertIsNone(rest["next_cursor"])
+        Item.objects.filter(pk=self.items[3].pk).update(updated_at=timezone.now() - timedelta(days=1))
+        stock.book_receipt(self.items[3], 1)
+        since = self.client.get("/api/bestand/aenderungen/", {"since": rest["until"]}).json()
+        self.assertIn("E003", [row["sku"] for row in since["items"]])
+        self.assertEqual(self.client.get("/api/bestand/aenderungen/", {"since": "gestern"}).status_code, 400)
+
+    def test_delta_feed_overlaps_for_late_commits(self):
+        until = self.client.get("/api/bestand/aenderungen/").json()["until"]
+        # Buchung, deren Transaktion vor dem letzten Abruf begann, aber erst danach committete
+        late = timezone.now() - timedelta(seconds=10)
+        Item.objects.filter(pk=self.items[0].pk).update(updated_at=late)
+        rows = self.client.get("/api/bestand/aenderungen/", {"since": until}).json()["items"]
+        self.assertIn("E000", [row["sku"] for row in rows])
+        with self.settings(VIASTORE_FEED_OVERLAP_SECONDS=0):
+            rows = self.client.get("/api/bestand/aenderungen/", {"since": until}).json()["items"]
+        self.assertNotIn("E000", [row["sku"] for row in rows])
+
+
+class RecordingBroker(push.InMemoryBroker):
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def has_subscribers(self):
+        return True
+
+    def publish(self, items=(), stats=None):
+        self.published.append((list(items), stats or {}))
+        return super().publish(items, stats)
+
+
+class PushBrokerTests(SimpleTestCase):
+    async def test_burst_is_coalesced_per_subscriber_and_filtered_by_warehouse(self):
+        broker = push.InMemoryBroker()
+        nord = broker.subscribe([1], window=0.05)
+        alle = broker.subscribe(window=0.05)
+        for quantity in range(300):
+            broker.publish(items=[{"id": quantity % 100, "sku": "X", "warehouse_id": 1 + quantity % 2, "quantity": quantity}])
+        broker.publish(stats={"items": (None, 7), "stock:2": (2, 50)})
+        frame = await asyncio.wait_for(alle.queue.get(), 1)
+        self.assertEqual(len(frame["items"]), 100)
+        self.assertEqual(frame["stats"], {"items": 7, "stock:2": 50})
+        self.assertEqual(max(item["quantity"] for item in frame["items"]), 299)
+        frame = await asyncio.wait_for(nord.queue.get(), 1)
+        self.assertEqual({item["warehouse_id"] for item in frame["items"]}, {1})
+        self.assertEqual(frame["stats"], {"items": 7})
+        self.assertTrue(alle.queue.empty())
+        broker.unsubscribe(nord)
+        broker.unsubscribe(alle)
+        self.assertFalse(broker.has_subscribers())
+
+
+class PushNotifyTests(TestCase):
+    def setUp(self):
+        self.warehouse = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        Item.objects.bulk_create(Item(name=f"Artikel {i}", sku=f"P{i:03d}", warehouse=self.warehouse) for i in range(300))
+        self.broker = RecordingBroker()
+        self.previous, push._broker = push._broker, self.broker
+        # Ohne Commit (TestCase) liegengebliebene Änderungen früherer Tests verwerfen
+        push._pending.items, push._pending.stats = set(), set()
+
+    def tearDown(self):
+        push._broker = self.previous
+
+    def test_batch_receipt_publishes_once_after_commit(self):
+        lines = [{"sku": f"P{i:03d}", "quantity": 2} for i in range(300)]
+        with self.captureOnCommitCallbacks(execute=True):
+            stock.book_receipt_batch("push-1", lines)
+            self.assertEqual(self.broker.published, [])
+        self.assertEqual(len(self.broker.published), 1)
+        items, stats_frame = self.broker.published[0]
+        self.assertEqual(len(items), 300)
+        self.assertEqual({item["quantity"] for item in items}, {2})
+        self.assertEqual(stats_frame[stats.warehouse_stock_key(self.warehouse.pk)], (self.warehouse.pk, 600))
+
+    def test_booking_in_other_warehouse_reaches_that_warehouses_subscribers(self):
+        sued = Warehouse.objects.create(name="Lager Süd", location="München")
+        item = Item.objects.get(sku="P000")
+        with self.captureOnCommitCallbacks(execute=True):
+            stock.book_receipt(item, 5)
+        with self.captureOnCommitCallbacks(execute=True):
+            stock.book_receipt(item, 3, warehouse=sued, bin="A-01")
+        items, _ = self.broker.published[-1]
+        self.assertEqual(
+            [(row["warehouse_id"], row["quantity"], row["warehouse_quantity"]) for row in items],
+            [(sued.pk, 8, 3)],
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            stock.transfer(item, 2, self.warehouse, sued)
+        items, _ = self.broker.published[-1]
+        self.assertEqual(
+            sorted((row["warehouse_id"], row["warehouse_quantity"]) for row in items),
+            sorted([(self.warehouse.pk, 3), (sued.pk, 5)]),
+        )
+
+    async def test_subscription_filters_on_booked_warehouse(self):
+        sued = await Warehouse.objects.acreate(name="Lager Süd", location="München")
+        item = await Item.objects.aget(sku="P000")
+        nord_feed = self.broker.subscribe([self.warehouse.pk], window=0.01)
+        sued_feed = self.broker.subscribe([sued.pk], window=0.01)
+        await sync_to_async(stock.book_receipt)(item, 3, warehouse=sued)
+        await sync_to_async(push._publish_pending)()
+        frame = await asyncio.wait_for(sued_feed.queue.get(), 1)
+        self.assertEqual([(row["id"], row["warehouse_quantity"]) for row in frame["items"]], [(item.pk, 3)])
+        await asyncio.sleep(0.05)
+        # Globale Zähler (z.B. Lageranzahl) gehen an alle, Artikel nur an Süd
+        while not nord_feed.queue.empty():
+            self.assertNotIn("items", nord_feed.queue.get_nowait())
+        self.broker.unsubscribe(nord_feed)
+        self.broker.unsubscribe(sued_feed)
+
+
+class StockEventsViewTests(TestCase):
+    def setUp(self):
+        self.previous, push._broker = push._broker, push.InMemoryBroker()
+
+    def tearDown(self):
+        push._broker = self.previous
+
+    async def test_stream_delivers_frames(self):
+        user = await User.objects.acreate(username="live")
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get("/api/bestand/events/", {"warehouse": "3"})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+        waiting = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        push.get_broker().publish(items=[{"id": 1, "sku": "X", "warehouse_id": 3, "quantity": 5}])
+        chunk = await asyncio.wait_for(waiting, 2)
+        self.assertTrue(chunk.startswith(b"event: stock\ndata: "))
+        self.assertEqual(json.loads(chunk.split(b"data: ")[1])["items"][0]["quantity"], 5)
+        await stream.aclose()
+
+    def test_wsgi_request_gets_no_content(self):
+        self.client.force_login(User.objects.create_user("wsgi"))
+        self.assertEqual(self.client.get("/api/bestand/events/").status_code, 204)
+
+
+class InstrumentationTests(TestCase):
+    def test_metrics_endpoint_reports_view_latency_and_templates(self):
+        self.client.force_login(User.objects.create_user("metrik", is_staff=True))
+        self.client.get("/artikel/")
+        body = self.client.get("/metrics").content.decode()
+        self.assertIn('viastore_request_duration_seconds_count{view="item_list",method="GET",status="200"}', body)
+        self.assertIn('viastore_request_db_queries_bucket{view="item_list",le="5"}', body)
+        template_sum = next(line for line in body.splitlines() if line.startswith('viastore_request_template_seconds_sum{view="item_list"}'))
+        self.assertGreater(float(template_sum.split()[-1]), 0)
+
+    @override_settings(VIASTORE_METRICS_TOKEN="geheim")
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer geheim").status_code, 200)
+
+    @override_settings(VIASTORE_METRICS_TOKEN="")
+    def test_metrics_without_token_only_for_staff(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer ").status_code, 401)
+        self.client.force_login(User.objects.create_user("lager"))
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        self.client.force_login(User.objects.create_user("admin", is_staff=True))
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    async def test_async_requests_count_queries_from_sync_to_async(self):
+        async def view(request):
+            await sync_to_async(lambda: list(Item.objects.filter(sku="X")))()
+            await Item.objects.filter(sku="Y").aexists()
+            return HttpResponse("ok")
+
+        middleware = InstrumentationMiddleware(view)
+        stats = []
+        middleware._record = lambda request, response, request_stats, elapsed: stats.append(request_stats)
+        await middleware(RequestFactory().get("/"))
+        self.assertEqual(stats[0].queries, 2)
+        self.assertGreater(stats[0].db_seconds, 0)
+
+    @override_settings(VIASTORE_METRICS_SAMPLE_RATE=1.0, VIASTORE_NPLUSONE_THRESHOLD=3, VIASTORE_SLOW_QUERY_MS=0)
+    def test_nplusone_and_slow_queries_are_logged(self):
+        def view(request):
+            for _ in range(4):
+                list(Item.objects.filter(sku="X"))
+            return HttpResponse("ok")
+
+        middleware = InstrumentationMiddleware(view)
+        with self.assertLogs("viastore_app.performance", "WARNING") as logs:
+            middleware(RequestFactory().get("/"))
+        self.assertEqual(sum("Langsame Abfrage" in line for line in logs.output), 4)
+        self.assertEqual(sum("Mögliches N+1" in line for line in logs.output), 1)
+
+
+class SeedTests(TestCase):
+    def generate(self, seed=1):
+        return seeding.generate(warehouses=3, items=200, orders=500, seed=seed, days=30, batch_size=64, reference_date=date(2024, 3, 1))
+
+    def test_generates_consistent_data(self):
+        data = self.generate()
+        self.assertEqual((Warehouse.objects.count(), Item.objects.count(), Order.objects.count()), (3, 200, 500))
+        eans = [sku for sku in data["skus"] if sku.isdigit()]
+        self.assertTrue(eans)
+        for sku in eans:
+            self.assertTrue(barcodes.is_valid_gtin(sku))
+        # Karton-Codes: gültige GTIN-14, Auflösung auf den Artikel mit Gebindegröße
+        pack = ItemBarcode.objects.select_related("item").first()
+        self.assertTrue(barcodes.is_valid_gtin(pack.code) and len(pack.code) == 14)
+        self.assertEqual(barcodes.resolve(pack.code), barcodes.Match(pack.item_id, pack.item.sku, pack.item.name, pack.pack_size))
+        first, last = Order.objects.order_by("order_date").values_list("order_date", flat=True)[::499]
+        self.assertGreaterEqual(timezone.localdate(first), date(2024, 1, 31))
+        self.assertLess(timezone.localdate(last), date(2024, 3, 1))
+        # Eröffnungsbestände im Bestandsbuch: nichts abzugleichen, Zähler aktuell
+        self.assertEqual(stock.reconcile(dry_run=True), 0)
+        self.assertEqual(stats.dashboard_stats()["order_count"], 500)
+
+    def test_same_seed_same_data(self):
+        self.generate()
+        snapshot = list(Order.objects.order_by("pk").values_list("order_number", "item__sku", "quantity", "order_date"))
+        seeding.clear()
+        self.assertFalse(Item.objects.exists())
+        self.generate()
+        self.assertEqual(list(Order.objects.order_by("pk").values_list("order_number", "item__sku", "quantity", "order_date")), snapshot)
+
+    def test_command_refuses_existing_items(self):
+        self.generate()
+        with self.assertRaises(CommandError):
+            call_command("seed", items=10, orders=10, stdout=StringIO())
+        call_command("seed", warehouses=2, items=10, orders=10, clear=True, interactive=False, stdout=StringIO())
+        self.assertEqual(Item.objects.count(), 10)
+
+
+class BarcodeTests(TestCase):
+    def setUp(self):
+        barcodes.cache.clear()
+        self.client.force_login(User.objects.create_user("scanner"))
+        self.warehouse = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        self.item = Item.objects.create(name="Dübel", sku="4006381333931", warehouse=self.warehouse)
+        body = "1" + self.item.sku[:12]
+        self.carton = ItemBarcode.objects.create(code=body + barcodes.gtin_check_digit(body), item=self.item, pack_size=12)
+
+    def test_normalize_leading_zeros_and_symbology(self):
+        key = barcodes.normalize("4006381333931")
+        self.assertEqual(key, "04006381333931")
+        for variant in ["04006381333931", " 0004006381333931", "]E04006381333931", "(01)04006381333931"]:
+            self.assertEqual(barcodes.normalize(variant), key)
+        # UPC-A und die gleiche Nummer als EAN-13
+        self.assertEqual(barcodes.normalize("036000291452"), barcodes.normalize("0036000291452"))
+        # Ohne gültige Prüfziffer nur führende Nullen entfernen
+        self.assertEqual(barcodes.normalize("000124"), "124")
+        self.assertEqual(barcodes.normalize("ab-1 "), "AB-1")
+
+    def test_touch_books_pack_size_and_zero_padded_codes(self):
+        response = self.client.post("/touch/", {"item_name": self.carton.code, "quantity": 2})
+        self.assertContains(response, "2 × 12 Stück")
+        self.client.post("/touch/", {"item_name": "04006381333931", "quantity": 1})
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 25)
+
+    def test_receipt_batch_sums_codes_of_same_item(self):
+        lines = [{"sku": self.item.sku, "quantity": 1}, {"sku": self.carton.code, "quantity": 1}, {"sku": "0" + self.item.sku, "quantity": 2}]
+        response = self.client.post("/api/wareneingang/batch/", {"batch_id": "k-1", "lines": lines}, content_type="application/json")
+        self.assertEqual(response.json()["booked"], 3)
+        self.assertEqual(Item.objects.get(pk=self.item.pk).quantity, 15)
+        self.assertEqual(Item.objects.count(), 1)
+
+    def test_cache_is_invalidated_on_changes(self):
+        self.assertEqual(barcodes.resolve(self.carton.code).pack_size, 12)
+        with self.assertNumQueries(0):
+            self.assertEqual(barcodes.resolve(self.carton.code).name, "Dübel")
+        self.item.name = "Spreizdübel"
+        self.item.save()
+        self.assertEqual(barcodes.resolve(self.carton.code).name, "Spreizdübel")
+        self.carton.delete()
+        self.assertIsNone(barcodes.resolve(self.carton.code))
+
+
+class StockLevelTests(TestCase):
+    def setUp(self):
+        self.nord = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        self.sued = Warehouse.objects.create(name="Lager Süd", location="München")
+        self.item = Item.objects.create(name="Regal", sku="R1", quantity=4, warehouse=self.nord)
+
+    def levels(self):
+        return sorted(StockLevel.objects.filter(item=self.item).values_list("warehouse__name", "bin", "quantity"))
+
+    def test_database_keeps_item_total(self):
+        # Anlage legt den Standardplatz im Stammlager an
+        self.assertEqual(self.levels(), [("Lager Nord", "", 4)])
+        stock.book_receipt(self.item, 6, warehouse=self.sued, bin="A-01")
+        stock.transfer(self.item, 2, self.nord, self.sued, to_bin="A-01")
+        self.assertEqual(self.levels(), [("Lager Nord", "", 2), ("Lager Süd", "A-01", 8)])
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 10)
+        StockLevel.objects.filter(item=self.item, warehouse=self.sued).delete()
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 2)
+        self.assertEqual(stock.warehouse_totals(), {self.nord.pk: 2})
+
+    def test_correction_of_total_and_of_single_bin(self):
+        stock.book_receipt(self.item, 5, warehouse=self.sued, bin="B-02")
+        stock.book_correction(self.item, 7)
+        stock.book_correction(self.item, 1, warehouse=self.sued, bin="B-02")
+        self.assertEqual(self.levels(), [("Lager Nord", "", 2), ("Lager Süd", "B-02", 1)])
+        self.assertEqual(
+            list(StockMovement.objects.filter(item=self.item, kind=StockMovement.KIND_CORRECTION).values_list("warehouse__name", "bin", "quantity")),
+            [("Lager Nord", "", -2), ("Lager Süd", "B-02", -4)],
+        )
+
+    def test_reconcile_rebuilds_bins_from_ledger(self):
+        stock.book_receipt(self.item, 3, warehouse=self.sued, bin="C-03")
+        StockLevel.objects.filter(item=self.item, warehouse=self.sued).update(quantity=50)
+        # Eröffnungsbestand ohne Buchung: Standardplatz fällt auf 0
+        self.assertEqual(stock.reconcile(), 1)
+        self.assertEqual(self.levels(), [("Lager Nord", "", 0), ("Lager Süd", "C-03", 3)])
+        self.assertEqual(Item.objects.get(pk=self.item.pk).quantity, 3)
+        self.assertEqual(stock.reconcile(dry_run=True), 0)
+
+    def test_stock_info_filters_and_lists_bins_per_warehouse(self):
+        stock.book_receipt(self.item, 2, warehouse=self.sued, bin="A-01")
+        Item.objects.create(name="Palette", sku="P1", quantity=1, warehouse=self.nord)
+        self.client.force_login(User.objects.create_user("lager"))
+        response = self.client.get("/bestandsauskunft/", {"warehouse": self.sued.pk})
+        self.assertEqual([item.sku for item in response.context["items"]], ["R1"])
+        self.assertContains(response, "Lager Süd / A-01: 2")
+        self.assertNotContains(response, "Lager Nord: 4")
+        stats.recompute()
+        self.assertEqual(
+            {row["name"]: row["stock"] for row in stats.dashboard_stats()["warehouses"]},
+            {"Lager Nord": 5, "Lager Süd": 2},
+        )
+
+    def test_import_sets_default_bin_of_named_warehouse(self):
+        stock.book_receipt(self.item, 1, warehouse=self.sued, bin="A-01")
+        ItemImporter(chunk_size=10).run([("Regal", "R1", 9, "Lager Süd")])
+        self.assertEqual(self.levels(), [("Lager Nord", "", 4), ("Lager Süd", "", 9), ("Lager Süd", "A-01", 1)])
+        self.item.refresh_from_db()
+        self.assertEqual((self.item.quantity, self.item.warehouse_id), (14, self.sued.pk))
+        self.assertEqual(stock.reconcile(dry_run=True), 1)  # nur der Eröffnungsbestand aus setUp
+
+
+class ReplenishmentTests(TestCase):
+    def setUp(self):
+        self.nord = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        self.sued = Warehouse.objects.create(name="Lager Süd", location="München")
+        self.regal = Item.objects.create(name="Regal", sku="R1", quantity=3, warehouse=self.nord)
+        self.palette = Item.objects.create(name="Palette", sku="P1", quantity=50, warehouse=self.nord)
+        self.total_rule = ReorderRule.objects.create(item=self.regal, reorder_point=5, max_quantity=20)
+        self.sued_rule = ReorderRule.objects.create(item=self.palette, warehouse=self.sued, reorder_point=10, max_quantity=40)
+
+    def active(self):
+        return sorted(ReorderSuggestion.objects.filter(closed_at=None).values_list("item__sku", "on_hand", "quantity", "status"))
+
+    def test_scan_creates_updates_and_closes_suggestions(self):
+        self.assertEqual(replenishment.scan(), {"created": 2, "updated": 0, "closed": 0})
+        # Palette: 50 Stück im Nordlager zählen nicht für die Regel im Südlager
+        self.assertEqual(self.active(), [("P1", 0, 40, "open"), ("R1", 3, 17, "open")])
+        stock.book_receipt(self.palette, 4, warehouse=self.sued)
+        self.assertEqual(replenishment.scan(), {"created": 0, "updated": 2, "closed": 0})
+        self.assertEqual(self.active(), [("P1", 4, 36, "open"), ("R1", 3, 17, "open")])
+        stock.book_receipt(self.regal, 10)
+        self.assertEqual(replenishment.scan(), {"created": 0, "updated": 1, "closed": 1})
+        stock.book_correction(self.regal, 2)
+        replenishment.scan()
+        self.assertEqual(self.active(), [("P1", 4, 36, "open"), ("R1", 2, 18, "open")])
+        self.assertEqual(ReorderSuggestion.objects.filter(item=self.regal).count(), 2)
+
+    def test_scan_query_count_does_not_grow_with_rules(self):
+        items = Item.objects.bulk_create(Item(name=f"Artikel {i}", sku=f"A{i}", warehouse=self.nord) for i in range(30))
+        ReorderRule.objects.bulk_create(ReorderRule(item=item, reorder_point=1, max_quantity=10) for item in items)
+        with self.assertNumQueries(5):  # Savepoint, schließen, nachführen, anlegen, Release
+            self.assertEqual(replenishment.scan()["created"], 32)
+
+    def test_confirm_creates_orders_and_blocks_new_suggestions(self):
+        replenishment.scan()
+        ids = list(ReorderSuggestion.objects.values_list("pk", flat=True))
+        self.assertEqual(replenishment.confirm(ids), 2)
+        self.assertEqual(replenishment.confirm(ids), 0)
+        suggestion = ReorderSuggestion.objects.select_related("order").get(item=self.regal)
+        self.assertEqual((suggestion.status, suggestion.order.quantity, suggestion.order.item_id), ("ordered", 17, self.regal.pk))
+        self.assertEqual(stats.dashboard_stats()["order_count"], 2)
+        # Bestellt, aber noch nicht geliefert: kein zweiter Vorschlag
+        self.assertEqual(replenishment.scan()["created"], 0)
+
+    def test_view_confirms_selection_and_dashboard_widget(self):
+        self.client.force_login(User.objects.create_user("disponent"))
+        replenishment.scan()
+        self.assertContains(self.client.get("/"), "Unter Meldebestand: 2")
+        response = self.client.get("/nachschub/", {"warehouse": self.sued.pk})
+        self.assertEqual([suggestion.item.sku for suggestion in response.context["suggestions"]], ["P1"])
+        suggestion = ReorderSuggestion.objects.get(item=self.palette)
+        response = self.client.post(f"/nachschub/?warehouse={self.sued.pk}", {"action": "confirm", "suggestion": [suggestion.pk]})
+        self.assertRedirects(response, f"/nachschub/?warehouse={self.sued.pk}", fetch_redirect_response=False)
+        self.assertContains(self.client.get(response.url), "1 Bestellungen angelegt.")
+        self.assertTrue(Order.objects.filter(order_number=replenishment.order_number(suggestion.pk), quantity=40).exists())
+        self.assertEqual([s.item.sku for s in self.client.get("/nachschub/").context["suggestions"]], ["R1"])
+
+    def test_confirm_skips_taken_order_numbers_and_reports_conflicts(self):
+        self.client.force_login(User.objects.create_user("disponent"))
+        replenishment.scan()
+        regal = ReorderSuggestion.objects.get(item=self.regal)
+        palette = ReorderSuggestion.objects.get(item=self.palette)
+        OrderArchive.objects.create(id=999, order_number=replenishment.order_number(regal.pk), item=self.regal, quantity=1, order_date=timezone.now())
+        self.assertEqual(replenishment.confirm([regal.pk, palette.pk]), 1)
+        self.assertEqual(ReorderSuggestion.objects.get(pk=regal.pk).status, ReorderSuggestion.STATUS_OPEN)
+        self.assertEqual(ReorderSuggestion.objects.get(pk=palette.pk).order.order_number, replenishment.order_number(palette.pk))
+        # Gleichzeitiges Bestätigen: die Nummer wird zwischen Prüfung und INSERT belegt
+        OrderArchive.objects.all().delete()
+        original = replenishment.insert_select
+        def racing_insert_select(model, fields, rows):
+            Order.objects.create(order_number=replenishment.order_number(regal.pk), item=self.regal, quantity=1, order_date=timezone.now())
+            return original(model, fields, rows)
+        self.addCleanup(setattr, replenishment, "insert_select", original)
+        replenishment.insert_select = racing_insert_select
+        response = self.client.post("/nachschub/", {"action": "confirm", "suggestion": [regal.pk]}, follow=True)
+        self.assertContains(response, "bereits bestellt")
+        self.assertEqual(ReorderSuggestion.objects.get(pk=regal.pk).status, ReorderSuggestion.STATUS_OPEN)
+
+
+
+class AdminScaleTests(TestCase):
+    def setUp(self):
+        self.nord = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        self.sued = Warehouse.objects.create(name="Lager Süd", location="München")
+        self.regal = Item.objects.create(name="Regal", sku="R1", quantity=4, warehouse=self.nord)
+        self.palette = Item.objects.create(name="palette", sku="P1", quantity=0, warehouse=self.nord)
+        stock.book_receipt(self.regal, 3, warehouse=self.sued, bin="A-01")
+        self.client.force_login(User.objects.create_superuser("admin"))
+
+    def levels(self, item):
+        return sorted(StockLevel.objects.filter(item=item).values_list("warehouse__name", "bin", "quantity"))
+
+    def test_change_form_keeps_trigger_quantity_and_moves_home_warehouse(self):
+        stale = Item.objects.get(pk=self.palette.pk)
+        stock.book_receipt(self.palette, 5)
+        stale.name, stale.warehouse = "Palette", self.sued
+        # Buchung zwischen Laden und Speichern des Formulars
+        admin.site._registry[Item].save_model(RequestFactory().post("/"), stale, None, True)
+        self.palette.refresh_from_db()
+        self.assertEqual((self.palette.name, self.palette.quantity, self.palette.warehouse_id), ("Palette", 5, self.sued.pk))
+        self.assertIn(("Lager Süd", "", 0), self.levels(self.palette))
+        counters = dict(StatCounter.objects.filter(key__startswith="items:").values_list("key", "value"))
+        self.assertEqual((counters[stats.warehouse_items_key(self.nord.pk)], counters[stats.warehouse_items_key(self.sued.pk)]), (1, 1))
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        def changelist_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get("/admin/viastore_app/item/").status_code, 200)
+            return [query["sql"] for query in queries]
+
+        before = changelist_queries()
+        Item.objects.bulk_create(Item(name=f"Artikel {i}", sku=f"A{i}", warehouse=self.sued) for i in range(20))
+        after = changelist_queries()
+        self.assertEqual(len(after), len(before))
+        response = self.client.get("/admin/viastore_app/item/", {"q": "pal"})
+        self.assertEqual([item.sku for item in response.context["cl"].result_list], ["P1"])
+        response = self.client.get("/admin/viastore_app/item/", {"warehouse__id__exact": self.sued.pk})
+        self.assertEqual(response.context["cl"].result_count, 20)
+
+    def test_paginator_estimates_unfiltered_and_caps_filtered_counts(self):
+        Item.objects.bulk_create(Item(name=f"Artikel {i}", sku=f"A{i}", warehouse=self.sued) for i in range(20))
+        paginator = EstimatedCountPaginator(Item.objects.order_by("pk"), 10)
+        paginator.count_limit = 5
+        with CaptureQueriesContext(connection) as queries:
+            self.assertGreaterEqual(paginator.count, 22)
+        self.assertNotIn("COUNT(", queries[0]["sql"])
+        filtered = EstimatedCountPaginator(Item.objects.filter(warehouse=self.sued).order_by("pk"), 10)
+        filtered.count_limit = 5
+        self.assertEqual(filtered.count, 6)
+
+    def test_bulk_actions_keep_ledger_consistent(self):
+        url = "/admin/viastore_app/item/"
+        selected = [self.regal.pk, self.palette.pk]
+        self.client.post(url, {"action": "move_to_warehouse", "_selected_action": selected, "warehouse": self.sued.pk})
+        self.assertEqual(self.levels(self.regal), [("Lager Nord", "", 0), ("Lager Süd", "", 7), ("Lager Süd", "A-01", 0)])
+        self.assertEqual(set(Item.objects.values_list("warehouse_id", flat=True)), {self.sued.pk})
+        with self.assertNumQueries(6):  # Savepoint, Summe je Lager, Buchungen, Lagerplätze, Kennzahl, Release
+            self.assertEqual(stock.adjust_items(selected, -5, note="Inventur"), 1)
+        self.client.post(url, {"action": "adjust_stock", "_selected_action": selected, "delta": 2})
+        self.assertEqual(sorted(Item.objects.values_list("sku", "quantity")), [("P1", 2), ("R1", 4)])
+        self.assertEqual(self.levels(self.palette), [("Lager Nord", "", 0), ("Lager Süd", "", 2)])
+        self.assertEqual(
+            list(StockMovement.objects.filter(item=self.regal, kind=StockMovement.KIND_CORRECTION).values_list("quantity", flat=True)),
+            [-5, 2],
+        )
+        self.assertEqual(stock.reconcile(dry_run=True), 1)  # nur der Eröffnungsbestand aus setUp
+        stats_before = stats.dashboard_stats()
+        stats.recompute()
+        self.assertEqual(stats.dashboard_stats()["warehouses"], stats_before["warehouses"])
+
+
+class StaticAssetTests(TestCase):
+    def setUp(self):
+        Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        self.client.force_login(User.objects.create_user("lager"))
+
+    def test_pages_load_only_local_assets_without_inline_scripts(self):
+        for url in ("/", "/touch/", "/artikel/", "/nachschub/", "/import-excel/"):
+            resources, inline_bytes = assets.page_resources(self.client.get(url).content.decode())
+            self.assertTrue(resources, url)
+            self.assertEqual([src for _, src in resources if assets.is_external(src)], [], url)
+            self.assertEqual(inline_bytes, 0, url)
+            for _, src in resources:
+                self.assertIsNotNone(finders.find(src.removeprefix("/static/")), src)
+        self.client.logout()
+        resources, _ = assets.page_resources(self.client.get("/login/").content.decode())
+        self.assertFalse(any(assets.is_external(src) for _, src in resources))
+
+    def test_middleware_serves_precompressed_file_with_cache_headers(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root)
+        (root / "app.0123456789ab.js").write_text("console.log('viastore');\n" * 100)
+        self.assertEqual(assets.compress_file(str(root / "app.0123456789ab.js")), [".gz"] if assets.brotli is None else [".gz", ".br"])
+        (root / "app.0123456789ab.js.br").unlink(missing_ok=True)
+        with override_settings(STATIC_ROOT=root):
+            middleware = assets.StaticFilesMiddleware(lambda request: HttpResponse(status=404))
+        middleware.immutable = {"app.0123456789ab.js"}
+        factory = RequestFactory()
+        response = middleware(factory.get("/static/app.0123456789ab.js", HTTP_ACCEPT_ENCODING="gzip, deflate"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(gzip.decompress(response.content).decode().count("viastore"), 100)
+        plain = middleware(factory.get("/static/app.0123456789ab.js"))
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertEqual(len(plain.content), 2500)
+        self.assertEqual(middleware(factory.get("/static/../secret.txt")).status_code, 404)
+        self.assertEqual(middleware(factory.get("/static/fehlt.js")).status_code, 404)
+
+
+class StartupTests(SimpleTestCase):
+    def test_worker_start_does_not_load_heavy_dependencies(self):
+        result = startup.probe("/health/db/")
+        self.assertEqual(result["status"], 200)
+        self.assertEqual(result["heavy"], [])
+        self.assertGreater(result["packages"]["django"], 0)
+        self.assertGreaterEqual(result["first_request_ms"], result["app_loaded_ms"])
+
+    def test_routes_keep_their_names_after_split(self):
+        for name, args, url in [
+            ("dashboard", [], "/"),
+            ("stock_info", [], "/bestandsauskunft/"),
+            ("item_edit", [5], "/artikel/5/bearbeiten/"),
+            ("export_orders", ["csv"], "/export/bestellungen.csv"),
+            ("touch_service_worker", [], "/touch/sw.js"),
+            ("metrics", [], "/metrics"),
+        ]:
+            self.assertEqual(reverse(name, args=args), url)
+            self.assertEqual(resolve(url).url_name, name)
+
+
+class StockSnapshotTests(TestCase):
+    def setUp(self):
+        self.nord = Warehouse.objects.create(name="Lager Nord", location="Hamburg")
+        self.sued = Warehouse.objects.create(name="Lager Süd", location="München")
+        self.regal = Item.objects.create(name="Regal", sku="R1", warehouse=self.nord)
+        self.palette = Item.objects.create(name="Palette", sku="P1", warehouse=self.nord)
+        stock.book_receipt(self.regal, 5)
+        stock.book_receipt(self.palette, 4, warehouse=self.sued)
+        stock.book_receipt(self.palette, 6, warehouse=self.sued, bin="A-01")
+
+    def quantities(self, snapshot):
+        return sorted(snapshot.lines.values_list("warehouse__name", "item__sku", "quantity"))
+
+    def test_take_sums_bins_skips_empty_levels_and_keeps_one_per_day(self):
+        day = date(2026, 3, 31)
+        with self.assertNumQueries(6):  # Savepoint, Kopf suchen/anlegen, INSERT … SELECT, Zähler, Release
+            snapshot, created = snapshots.take(day)
+        self.assertTrue(created)
+        self.assertEqual(self.quantities(snapshot), [("Lager Nord", "R1", 5), ("Lager Süd", "P1", 10)])
+        self.assertEqual(snapshot.row_count, 2)
+        stock.book_correction(self.regal, 0)
+        self.assertEqual(snapshots.take(day), (snapshot, False))
+        snapshot, created = snapshots.take(day, replace=True)
+        self.assertFalse(created)
+        self.assertEqual((self.quantities(snapshot), snapshot.row_count), ([("Lager Süd", "P1", 10)], 1))
+
+    def test_stock_on_day_and_changes_between_snapshots(self):
+        march, _ = snapshots.take(date(2026, 3, 31))
+        stock.book_receipt(self.regal, 2, warehouse=self.sued)
+        stock.book_correction(self.regal, 1, warehouse=self.nord)
+        stock.book_correction(self.palette, 0, warehouse=self.sued, bin="A-01")
+        april, _ = snapshots.take(date(2026, 4, 30))
+        self.assertEqual(snapshots.snapshot_on(date(2026, 4, 15)), march)
+        self.assertEqual(snapshots.snapshot_on(date(2026, 5, 1)), april)
+        self.assertIsNone(snapshots.snapshot_on(date(2026, 3, 30)))
+        self.assertEqual(snapshots.warehouse_totals(march), {self.nord.pk: {"items": 1, "quantity": 5}, self.sued.pk: {"items": 1, "quantity": 10}})
+        changes = snapshots.changes(march, april)
+        self.assertEqual(
+            sorted((row["warehouse_id"], row["item_id"], row["before"], row["after"], row["delta"]) for row in changes),
+            sorted([
+                (self.nord.pk, self.regal.pk, 5, 1, -4),
+                (self.sued.pk, self.regal.pk, 0, 2, 2),
+                (self.sued.pk, self.palette.pk, 10, 4, -6),
+            ]),
+        )
+        self.assertEqual(snapshots.changes(march, april, self.nord).count(), 1)
+        self.assertEqual(snapshots.warehouse_changes(march, april), {self.nord.pk: -4, self.sued.pk: -4})
+
+    def test_prune_downsamples_to_month_ends_and_expires_old_months(self):
+        for day in (date(2025, 12, 30), date(2025, 12, 31), date(2026, 1, 10), date(2026, 1, 20), date(2026, 3, 1), date(2026, 3, 2)):
+            snapshots.take(day)
+        result = snapshots.prune(today=date(2026, 3, 10), daily_days=30, monthly_months=2)
+        # Tagesabzüge ab 8.2. bleiben; davor nur das Monatsende, Monate vor Januar sind abgelaufen
+        self.assertEqual(result, {"downsampled": 2, "expired": 1, "lines": 6})
+        self.assertEqual(list(StockSnapshot.objects.order_by("day").values_list("day", flat=True)), [date(2026, 1, 20), date(2026, 3, 1), date(2026, 3, 2)])
+        self.assertEqual(StockSnapshotLine.objects.count(), 6)
+        self.assertEqual(snapshots.prune(today=date(2026, 3, 10), daily_days=30, monthly_months=0)["downsampled"], 0)
+
+    def test_command_and_history_view(self):
+        out = StringIO()
+        call_command("snapshot_stock", "--day", "2026-03-31", stdout=out)
+        self.assertIn("2 Zeilen geschrieben", out.getvalue())
+        stock.book_receipt(self.palette, 1, warehouse=self.sued)
+        call_command("snapshot_stock", "--day", "2026-04-30", "--prune", stdout=out)
+        self.client.force_login(User.objects.create_user("controller"))
+        response = self.client.get("/bestandshistorie/", {"day": "2026-04-15", "warehouse": self.sued.pk})
+        self.assertEqual(response.context["snapshot"].day, date(2026, 3, 31))
+        self.assertEqual([(line.item.sku, line.quantity) for line in response.context["lines"]], [("P1", 10)])
+        response = self.client.get("/bestandshistorie/", {"day": "2026-04-30", "compare": "2026-03-31", "warehouse": self.sued.pk})
+        self.assertEqual([(row["item"].sku, row["delta"]) for row in response.context["lines"]], [("P1", 1)])
+        self.assertContains(response, "+1")
+        self.assertContains(self.client.get("/bestandshistorie/", {"day": "2026-01-01"}), "Kein Bestandsabzug")
 
-# Create your tests here.
@@ -0,0 +1,95 @@
+import uuid
+
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_datetime
+
+from .models import TouchScan
+from .stock import receive_lines
+
+MAX_SYNC_SCANS = 500
+
+
+def _parse_scan(raw):
+    if not isinstance(raw, dict):
+        return None, None
+    try:
+        scan_id = uuid.UUID(str(raw.get("id")))
+    except ValueError:
+        return None, None
+    sku = str(raw.get("sku", "")).strip()
+    quantity = raw.get("quantity")
+    try:
+        scanned_at = parse_datetime(str(raw["scanned_at"])) if raw.get("scanned_at") else None
+    except ValueError:
+        # Format stimmt, Datum nicht (z.B. Monat 13): wie ein fehlender Zeitstempel
+        scanned_at = None
+    error = ""
+    if not sku or len(sku) > 50:
+        error = "Ungültige SKU"
+    elif not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+        error = "Menge muss eine positive ganze Zahl sein"
+    if error:
+        # Abgelehnte Scans werden mit Menge 0 gespeichert, egal was das Gerät schickt
+        quantity = 0
+    return scan_id, {"sku": sku[:50], "quantity": quantity, "scanned_at": scanned_at, "error": error}
+
+
+def _result(scan, duplicate):
+    return {
+        "id": str(scan.scan_id),
+        "sku": scan.sku,
+        "status": scan.status,
+        "error": scan.error or None,
+        "item_id": scan.item_id,
+        "duplicate": duplicate,
+    }
+
+
+def sync_scans(scans, device_id="", user=None, retry=True):
+    """Bucht Scans aus der Offline-Warteschlange.
+
+    Jeder Scan wird genau einmal gebucht, egal wie oft oder in welcher Reihenfolge
+    die Batches eintreffen; Wiederholungen liefern das gespeicherte Ergebnis.
+    Reihenfolge spielt keine Rolle, weil Zugänge kommutativ sind.
+    """
+    parsed = {}
+    invalid = 0
+    for raw in scans:
+        scan_id, data = _parse_scan(raw)
+        if scan_id is None:
+            invalid += 1
+        else:
+            parsed.setdefault(scan_id, data)
+    known = {scan.scan_id: scan for scan in TouchScan.objects.filter(scan_id__in=list(parsed))}
+    fresh = {scan_id: data for scan_id, data in parsed.items() if scan_id not in known}
+    new_scans = []
+    try:
+        with transaction.atomic():
+            lines = [(data["sku"], data["quantity"]) for data in fresh.values() if not data["error"]]
+            items, _, _, unbookable = receive_lines(lines, user=user, note=f"Touch-Sync {device_id}".strip())
+            for scan_id, data in fresh.items():
+                error = data["error"] or ("Artikel unbekannt und kein Lager vorhanden" if data["sku"] in unbookable else "")
+                new_scans.append(TouchScan(
+                    scan_id=scan_id,
+                    device_id=device_id[:64],
+                    sku=data["sku"],
+                    quantity=data["quantity"],
+                    item_id=None if error else items[data["sku"]],
+                    status=TouchScan.STATUS_REJECTED if error else TouchScan.STATUS_BOOKED,
+                    error=error,
+                    scanned_at=data["scanned_at"],
+                ))
+            # Unique-Index auf scan_id: parallele Wiederholung bricht die ganze Buchung ab
+            TouchScan.objects.bulk_create(new_scans)
+    except IntegrityError:
+        if not retry:
+            raise
+        return sync_scans(scans, device_id=device_id, user=user, retry=False)
+    results = [_result(scan, True) for scan in known.values()] + [_result(scan, False) for scan in new_scans]
+    return {
+        "acked": [result["id"] for result in results],
+        "booked": sum(1 for scan in new_scans if scan.status == TouchScan.STATUS_BOOKED),
+        "duplicates": len(known),
+        "invalid": invalid,
+        "results": results,
+    }
@@ -0,0 +1,15 @@
+"""Dashboard, Anmeldung, Excel-Import und Betrieb (Health-Check, Metriken)."""
+
+from django.urls import path
+
+from .views import dashboard, login_view, logout_view, import_excel, job_status_api, health_db, metrics_view
+
+urlpatterns = [
+    path("", dashboard, name="dashboard"),
+    path("login/", login_view, name="login"),
+    path("logout/", logout_view, name="logout"),
+    path("import-excel/", import_excel, name="import_excel"),
+    path("api/jobs/<int:job_id>/", job_status_api, name="job_status_api"),
+    path("health/db/", health_db, name="health_db"),
+    path("metrics", metrics_view, name="metrics"),
+]
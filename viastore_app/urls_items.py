@@ -0,0 +1,15 @@
+"""Artikelverwaltung, Artikelsuche und Bestandsexport."""
+
+from django.urls import path
+
+from .views import add_item
+from .views_item import item_list, item_edit, item_delete, item_search_api, export_items
+
+urlpatterns = [
+    path("artikel/", item_list, name="item_list"),
+    path("artikel/<int:pk>/bearbeiten/", item_edit, name="item_edit"),
+    path("artikel/<int:pk>/loeschen/", item_delete, name="item_delete"),
+    path("artikel-anlegen/", add_item, name="add_item"),
+    path("api/item-search/", item_search_api, name="item_search_api"),
+    path("export/bestand.<str:fmt>", export_items, name="export_items"),
+]
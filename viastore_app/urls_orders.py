@@ -0,0 +1,14 @@
+"""Bestellungen, Nachschub und Bestellexport."""
+
+from django.urls import path
+
+from .views import add_order, order_list
+from .views_item import export_orders
+from .views_replenishment import replenishment_list
+
+urlpatterns = [
+    path("bestellung-anlegen/", add_order, name="add_order"),
+    path("bestellungen/", order_list, name="order_list"),
+    path("nachschub/", replenishment_list, name="replenishment_list"),
+    path("export/bestellungen.<str:fmt>", export_orders, name="export_orders"),
+]
@@ -0,0 +1,20 @@
+"""Lager, Wareneingang, Bestandskorrektur, Bestandshistorie und Bestands-APIs."""
+
+from django.urls import path
+
+from .views import add_warehouse, goods_receipt, stock_correction, stock_info, item_bestand_api
+from .views_history import stock_history
+from .views_api import stock_bulk_api, stock_changes_api
+from .views_push import stock_events
+
+urlpatterns = [
+    path("lager-anlegen/", add_warehouse, name="add_warehouse"),
+    path("wareneingang/", goods_receipt, name="goods_receipt"),
+    path("bestandskorrektur/", stock_correction, name="stock_correction"),
+    path("bestandsauskunft/", stock_info, name="stock_info"),
+    path("bestandshistorie/", stock_history, name="stock_history"),
+    path("api/item-bestand/<int:item_id>/", item_bestand_api, name="item_bestand_api"),
+    path("api/bestand/", stock_bulk_api, name="stock_bulk_api"),
+    path("api/bestand/aenderungen/", stock_changes_api, name="stock_changes_api"),
+    path("api/bestand/events/", stock_events, name="stock_events"),
+]
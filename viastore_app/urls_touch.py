@@ -0,0 +1,15 @@
+"""Touch-App für Scanner-Tablets: Wareneingang, Offline-Sync und Artikelinfo."""
+
+from django.urls import path
+
+from .views_touch import touch_main, item_info_api, google_item_info_api, receipt_batch_api, touch_sync_api, touch_service_worker
+
+urlpatterns = [
+    path("touch/", touch_main, name="touch_main"),
+    path("touch/sw.js", touch_service_worker, name="touch_service_worker"),
+    path("wareneingang-touch/", touch_main, name="goods_receipt_touch"),
+    path("api/touch/sync/", touch_sync_api, name="touch_sync_api"),
+    path("api/wareneingang/batch/", receipt_batch_api, name="receipt_batch_api"),
+    path("api/item-info/<str:sku>/", item_info_api, name="item_info_api"),
+    path("api/google-item-info/<str:sku>/", google_item_info_api, name="google_item_info_api"),
+]
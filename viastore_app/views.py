@@ -1,38 +1,71 @@
 
+import time
+from django.conf import settings
+from django.db import connection, DatabaseError
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required
-from .models import Warehouse, Item, Order
-from .forms import WarehouseForm, ItemForm, OrderForm, GoodsReceiptForm, StockCorrectionForm, ExcelImportForm
-import openpyxl
+from .models import Warehouse, Item, Order, OrderArchive, Job
+from .forms import WarehouseForm, ItemForm, OrderForm, GoodsReceiptForm, StockCorrectionForm, ExcelImportForm, OrderFilterForm
+from . import jobs, metrics, replenishment, stats, stock
+from .pagination import DEFAULT_PAGE_SIZE, paginate_keyset, page_urls
+from .views_api import conditional_json, item_etag
+from .views_item import export_query, item_page_context
 
 @login_required
 def import_excel(request):
-	message = None
+	job = None
 	if request.method == "POST":
 		form = ExcelImportForm(request.POST, request.FILES)
 		if form.is_valid():
-			file = form.cleaned_data["file"]
-			wb = openpyxl.load_workbook(file)
-			ws = wb.active
-			imported = 0
-			for row in ws.iter_rows(min_row=2, values_only=True):
-				# Beispiel: Name, SKU, Menge, Lagername
-				name, sku, quantity, warehouse_name = row
-				warehouse, _ = Warehouse.objects.get_or_create(name=warehouse_name)
-				item, created = Item.objects.get_or_create(sku=sku, defaults={"name": name, "quantity": quantity, "warehouse": warehouse})
-				if not created:
-					item.name = name
-					item.quantity = quantity
-					item.warehouse = warehouse
-					item.save()
-				imported += 1
-			message = f"{imported} Artikel importiert/aktualisiert."
+			# Import läuft im Hintergrund-Worker, die Seite fragt den Status ab
+			job = jobs.enqueue("import_excel", upload=form.cleaned_data["file"], user=request.user)
+			form = ExcelImportForm()
 	else:
 		form = ExcelImportForm()
-	return render(request, "import_excel.html", {"form": form, "message": message, "title": "Excel-Import"})
+	return render(request, "import_excel.html", {"form": form, "job": job, "title": "Excel-Import"})
+
+def health_db(request):
+	# Ohne Login, für Load-Balancer und Monitoring
+	started = time.perf_counter()
+	try:
+		with connection.cursor() as cursor:
+			cursor.execute("SELECT 1")
+			cursor.fetchone()
+			journal_mode = None
+			if connection.vendor == "sqlite":
+				cursor.execute("PRAGMA journal_mode")
+				journal_mode = cursor.fetchone()[0]
+	except DatabaseError as exc:
+		return JsonResponse({"status": "error", "profile": settings.VIASTORE_DB_PROFILE, "error": str(exc)}, status=503)
+	data = {
+		"status": "ok",
+		"profile": settings.VIASTORE_DB_PROFILE,
+		"vendor": connection.vendor,
+		"latency_ms": round((time.perf_counter() - started) * 1000, 2),
+	}
+	if journal_mode:
+		data["journal_mode"] = journal_mode
+	return JsonResponse(data)
+
+def metrics_view(request):
+	# Prometheus-Scrape per Bearer-Token; ohne Token nur für angemeldete Staff-Benutzer
+	token = settings.VIASTORE_METRICS_TOKEN
+	scraper = bool(token) and constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}")
+	if not scraper and not request.user.is_staff:
+		return HttpResponse(status=401)
+	return HttpResponse(metrics.REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@login_required
+def job_status_api(request, job_id):
+	try:
+		job = Job.objects.get(pk=job_id)
+	except Job.DoesNotExist:
+		return JsonResponse({"error": "Job nicht gefunden"}, status=404)
+	return JsonResponse(jobs.job_status(job))
 
 def logout_view(request):
 	logout(request)
@@ -57,8 +90,7 @@ def goods_receipt_touch(request):
 		if form.is_valid():
 			item = form.cleaned_data["item"]
 			quantity = form.cleaned_data["quantity"]
-			item.quantity += quantity
-			item.save()
+			stock.book_receipt(item, quantity, user=request.user)
 			message = f"Wareneingang für {item.name} ({item.sku}) erfolgreich gebucht!"
 			form = GoodsReceiptForm()
 	else:
@@ -69,8 +101,24 @@ def goods_receipt_touch(request):
 	return render(request, "goods_receipt_touch.html", context)
 @login_required
 def order_list(request):
-	orders = Order.objects.select_related('item').all().order_by('-order_date')
-	return render(request, "order_list.html", {"orders": orders, "title": "Bestellungen"})
+	filter_form = OrderFilterForm(request.GET)
+	querysets = [filter_form.filter(Order.objects.select_related("item"))]
+	if filter_form.with_archive():
+		querysets.append(filter_form.filter(OrderArchive.objects.select_related("item")))
+	try:
+		page_size = int(request.GET.get("size", DEFAULT_PAGE_SIZE))
+	except ValueError:
+		page_size = DEFAULT_PAGE_SIZE
+	# Neueste zuerst, Keyset über den Index (order_date, id)
+	page = paginate_keyset(querysets, ["-order_date", "-id"], request.GET.get("cursor"), page_size)
+	return render(request, "order_list.html", {
+		"orders": page,
+		"page": page,
+		"filter_form": filter_form,
+		"export_query": export_query(request),
+		"title": "Bestellungen",
+		**page_urls(request, page),
+	})
 from django.http import JsonResponse
 @login_required
 def item_bestand_api(request, item_id):
@@ -79,15 +127,24 @@ def item_bestand_api(request, item_id):
 		data = {
 			"name": item.name,
 			"sku": item.sku,
-			"quantity": item.quantity
+			"quantity": item.quantity,
+			"levels": [
+				{"warehouse_id": level["warehouse_id"], "warehouse": level["warehouse__name"], "bin": level["bin"], "quantity": level["quantity"]}
+				for level in stock.levels_by_item([item.pk]).get(item.pk, [])
+			],
 		}
-		return JsonResponse(data)
+		return conditional_json(request, data, item_etag(item), item.updated_at)
 	except Item.DoesNotExist:
 		return JsonResponse({"error": "Artikel nicht gefunden"}, status=404)
 @login_required
 def stock_info(request):
-	items = Item.objects.select_related('warehouse').all()
-	return render(request, "stock_info.html", {"items": items, "title": "Bestandsauskunft"})
+	context = item_page_context(request)
+	# Lagerplätze der angezeigten Seite mit einer Abfrage; bei Lagerfilter nur dieses Lager
+	warehouse = context["filter_form"].selected_warehouse()
+	levels = stock.levels_by_item([item.pk for item in context["items"]], warehouse.pk if warehouse else None)
+	for item in context["items"]:
+		item.levels = levels.get(item.pk, [])
+	return render(request, "stock_info.html", {**context, "title": "Bestandsauskunft"})
 from django.shortcuts import render, redirect
 from .models import Warehouse, Item, Order
 from .forms import WarehouseForm, ItemForm, OrderForm, GoodsReceiptForm, StockCorrectionForm
@@ -100,8 +157,7 @@ def stock_correction(request):
 		if form.is_valid():
 			item = form.cleaned_data["item"]
 			new_quantity = form.cleaned_data["new_quantity"]
-			item.quantity = new_quantity
-			item.save()
+			stock.book_correction(item, new_quantity, user=request.user)
 			if request.GET.get("ajax") == "1":
 				return render(request, "form.html", {"form": StockCorrectionForm(), "title": "Bestandskorrektur", "message": "Bestand erfolgreich korrigiert!", "ajax": True})
 			return redirect("dashboard")
@@ -122,14 +178,10 @@ def stock_correction(request):
 
 @login_required
 def dashboard(request):
-	warehouses = Warehouse.objects.count()
-	items = Item.objects.count()
-	orders = Order.objects.count()
-	context = {
-		"warehouse_count": warehouses,
-		"item_count": items,
-		"order_count": orders,
-	}
+	# Kennzahlen aus der vorberechneten Zählertabelle statt COUNT(*) auf den großen Tabellen
+	context = stats.dashboard_stats()
+	# Widget "Unter Meldebestand" aus den offenen Nachschubvorschlägen (Teilindex, zwei Abfragen)
+	context.update(replenishment.dashboard_summary())
 	return render(request, "dashboard.html", context)
 
 @login_required
@@ -151,7 +203,7 @@ def add_item(request):
 	if request.method == "POST":
 		form = ItemForm(request.POST)
 		if form.is_valid():
-			form.save()
+			stock.save_item(form, user=request.user)
 			if request.GET.get("ajax") == "1":
 				return render(request, "form.html", {"form": ItemForm(), "title": "Artikel anlegen", "message": "Artikel erfolgreich angelegt!", "ajax": True})
 			return redirect("dashboard")
@@ -181,8 +233,7 @@ def goods_receipt(request):
 		if form.is_valid():
 			item = form.cleaned_data["item"]
 			quantity = form.cleaned_data["quantity"]
-			item.quantity += quantity
-			item.save()
+			stock.book_receipt(item, quantity, user=request.user)
 			return redirect("dashboard")
 	else:
 		form = GoodsReceiptForm()
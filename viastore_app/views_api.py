@@ -0,0 +1,137 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, quote_etag
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from .models import Item
+from .pagination import paginate_keyset
+
+MAX_BULK_KEYS = 1000
+DEFAULT_FEED_SIZE = 500
+ITEM_FIELDS = ("id", "sku", "name", "quantity", "warehouse_id", "updated_at")
+
+
+def feed_overlap():
+    # Länger laufende Buchungstransaktionen als dieses Fenster kann der Feed verpassen
+    return timedelta(seconds=getattr(settings, "VIASTORE_FEED_OVERLAP_SECONDS", 60))
+
+
+def item_etag(item):
+    return quote_etag(f"{item.pk}-{item.updated_at.timestamp():.6f}")
+
+
+def collection_etag(rows, extra=""):
+    # Hash über (id, updated_at) aller Zeilen: ändert sich bei jeder Buchung, Löschung oder Neuanlage
+    digest = hashlib.sha1(extra.encode())
+    for row in rows:
+        digest.update(f"{row['id']}:{row['updated_at'].timestamp():.6f};".encode())
+    return quote_etag(digest.hexdigest())
+
+
+def conditional_json(request, data, etag, last_modified, status=200):
+    """JsonResponse mit ETag/Last-Modified; unveränderte Daten werden mit 304 beantwortet."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    if request.method in ("GET", "HEAD"):
+        not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if not_modified is not None:
+            return not_modified
+    response = JsonResponse(data, status=status)
+    response["ETag"] = etag
+    if timestamp is not None:
+        response["Last-Modified"] = http_date(timestamp)
+    # Clients dürfen cachen, müssen aber jedes Mal revalidieren
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _serialize(row):
+    return {**row, "updated_at": row["updated_at"].isoformat()}
+
+
+def _split(value):
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+def _bulk_keys(request):
+    if request.method == "POST":
+        try:
+            payload = json.loads(request.body or b"{}")
+        except ValueError:
+            return None, None
+        ids, skus = payload.get("ids") or [], payload.get("skus") or []
+    else:
+        ids, skus = _split(request.GET.get("ids")), _split(request.GET.get("skus"))
+    try:
+        ids = sorted({int(pk) for pk in ids})
+    except (TypeError, ValueError):
+        return None, None
+    return ids, sorted({str(sku) for sku in skus})
+
+
+# POST nur für lange Schlüssellisten; reiner Lesezugriff, daher ohne CSRF-Token
+@csrf_exempt
+@login_required
+@require_http_methods(["GET", "HEAD", "POST"])
+def stock_bulk_api(request):
+    """Bestände vieler Artikel (``ids`` und/oder ``skus``) mit einer Abfrage."""
+    ids, skus = _bulk_keys(request)
+    if ids is None:
+        return JsonResponse({"error": "Ungültige Anfrage"}, status=400)
+    if len(ids) + len(skus) > MAX_BULK_KEYS:
+        return JsonResponse({"error": f"Maximal {MAX_BULK_KEYS} Artikel pro Anfrage"}, status=400)
+    rows = list(Item.objects.filter(Q(pk__in=ids) | Q(sku__in=skus)).order_by("id").values(*ITEM_FIELDS)) if ids or skus else []
+    found_ids = {row["id"] for row in rows}
+    found_skus = {row["sku"] for row in rows}
+    missing = {"ids": [pk for pk in ids if pk not in found_ids], "skus": [sku for sku in skus if sku not in found_skus]}
+    data = {"items": [_serialize(row) for row in rows], "missing": missing}
+    last_modified = max((row["updated_at"] for row in rows), default=None)
+    return conditional_json(request, data, collection_etag(rows, json.dumps(missing)), last_modified)
+
+
+@login_required
+def stock_changes_api(request):
+    """Delta-Feed: Artikel mit ``updated_at >= since - overlap``, blätterbar per Cursor.
+
+    Für den nächsten Abruf ``since`` auf den gelieferten ``until``-Wert setzen.
+    ``updated_at`` stammt vom Beginn der buchenden Transaktion; committet sie erst
+    nach einem Abruf, liegt ihr Zeitstempel vor ``until``. Deshalb liefert jeder
+    Abruf die letzten ``overlap_seconds`` erneut mit – Clients verwerfen Zeilen,
+    deren ``(id, updated_at)`` sie schon kennen.
+    Gelöschte Artikel erscheinen nicht im Feed, sondern als ``missing`` im Bulk-Abruf.
+    """
+    # Nicht URL-kodiertes "+" der Zeitzone kommt als Leerzeichen an
+    raw_since = request.GET.get("since", "").strip().replace(" ", "+")
+    since = parse_datetime(raw_since) if raw_since else None
+    if raw_since and since is None:
+        return JsonResponse({"error": "since muss ein ISO-8601-Zeitstempel sein"}, status=400)
+    if since is not None and timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    try:
+        page_size = int(request.GET.get("limit", DEFAULT_FEED_SIZE))
+    except ValueError:
+        page_size = DEFAULT_FEED_SIZE
+    items = Item.objects.only(*ITEM_FIELDS)
+    overlap = feed_overlap()
+    if since is not None:
+        items = items.filter(updated_at__gte=since - overlap)
+    page = paginate_keyset(items, ["updated_at", "id"], request.GET.get("cursor"), page_size)
+    rows = [{field: getattr(item, field) for field in ITEM_FIELDS} for item in page]
+    until = max((row["updated_at"] for row in rows), default=since)
+    data = {
+        "items": [_serialize(row) for row in rows],
+        "next_cursor": page.next_cursor,
+        "until": until.isoformat() if until else None,
+        "overlap_seconds": overlap.total_seconds(),
+    }
+    return conditional_json(request, data, collection_etag(rows, request.GET.urlencode()), until)
+
@@ -0,0 +1,51 @@
+from operator import itemgetter
+
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+from django.utils import timezone
+from . import snapshots
+from .forms import StockHistoryForm
+from .models import Item, Warehouse
+from .pagination import DEFAULT_PAGE_SIZE, paginate_keyset, page_urls
+
+@login_required
+def stock_history(request):
+    form = StockHistoryForm(request.GET if "day" in request.GET else {**request.GET.dict(), "day": timezone.localdate()})
+    context = {"form": form, "title": "Bestandshistorie"}
+    if not form.is_valid():
+        return render(request, "stock_history.html", context)
+    data = form.cleaned_data
+    snapshot = snapshots.snapshot_on(data["day"])
+    baseline = snapshots.snapshot_on(data["compare"]) if data["compare"] else None
+    if snapshot is None:
+        return render(request, "stock_history.html", context)
+    if baseline is not None and baseline.pk == snapshot.pk:
+        # Beide Daten fallen auf denselben Abzug: nichts zu vergleichen
+        baseline = None
+    context.update(snapshot=snapshot, baseline=baseline)
+
+    totals = snapshots.warehouse_totals(snapshot)
+    deltas = snapshots.warehouse_changes(baseline, snapshot) if baseline else {}
+    context["warehouses"] = [
+        {"warehouse": warehouse, **totals.get(warehouse.pk, {"items": 0, "quantity": 0}), "delta": deltas.get(warehouse.pk, 0)}
+        for warehouse in Warehouse.objects.order_by("name")
+    ]
+
+    warehouse = data["warehouse"]
+    if warehouse is not None:
+        try:
+            page_size = int(request.GET.get("size", DEFAULT_PAGE_SIZE))
+        except ValueError:
+            page_size = DEFAULT_PAGE_SIZE
+        # Keyset über item_id: (snapshot, warehouse, item) ist der Unique-Index der Zeilen
+        if baseline is None:
+            rows = snapshots.lines(snapshot, warehouse).select_related("item")
+            page = paginate_keyset(rows, ["item_id"], request.GET.get("cursor"), page_size)
+        else:
+            rows = snapshots.changes(baseline, snapshot, warehouse)
+            page = paginate_keyset(rows, ["item_id"], request.GET.get("cursor"), page_size, value_getters={"item_id": itemgetter("item_id")})
+            items = Item.objects.only("sku", "name").in_bulk([row["item_id"] for row in page])
+            for row in page:
+                row["item"] = items.get(row["item_id"])
+        context.update(lines=page, page=page, **page_urls(request, page))
+    return render(request, "stock_history.html", context)
@@ -1,12 +1,39 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from .models import Item
-from .forms import ItemForm
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from .export import CONTENT_TYPES, export_filename, item_export, order_export
+from .models import Item, Order, OrderArchive
+from .forms import ItemForm, ItemFilterForm, OrderFilterForm
+from .pagination import DEFAULT_PAGE_SIZE, paginate_keyset, page_urls
+from .search import search_items
+from .stock import save_item
+
+def item_page_context(request):
+    # Gemeinsame Filter + Cursor-Pagination für Artikelübersicht und Bestandsauskunft
+    filter_form = ItemFilterForm(request.GET)
+    items = filter_form.filter(Item.objects.select_related("warehouse"))
+    try:
+        page_size = int(request.GET.get("size", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        page_size = DEFAULT_PAGE_SIZE
+    page = paginate_keyset(items, filter_form.ordering(), request.GET.get("cursor"), page_size)
+    return {"items": page, "page": page, "filter_form": filter_form, "export_query": export_query(request), **page_urls(request, page)}
+
+def export_query(request):
+    # Export übernimmt die Filter der Ansicht, aber nicht die Seitenposition
+    params = request.GET.copy()
+    for key in ("cursor", "size"):
+        params.pop(key, None)
+    return params.urlencode()
+
+def streaming_export(stream, fmt, prefix):
+    response = StreamingHttpResponse(stream, content_type=CONTENT_TYPES[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{export_filename(prefix, fmt)}"'
+    return response
 
 @login_required
 def item_list(request):
-    items = Item.objects.all().order_by('name')
-    return render(request, "item_list.html", {"items": items, "title": "Artikelübersicht"})
+    return render(request, "item_list.html", {**item_page_context(request), "title": "Artikelübersicht"})
 
 @login_required
 def item_edit(request, pk):
@@ -14,7 +41,7 @@ def item_edit(request, pk):
     if request.method == "POST":
         form = ItemForm(request.POST, instance=item)
         if form.is_valid():
-            form.save()
+            save_item(form, user=request.user)
             return redirect("item_list")
     else:
         form = ItemForm(instance=item)
@@ -27,3 +54,31 @@ def item_delete(request, pk):
         item.delete()
         return redirect("item_list")
     return render(request, "item_confirm_delete.html", {"item": item, "title": f"Artikel löschen: {item.name}"})
+
+@login_required
+def item_search_api(request):
+    try:
+        limit = int(request.GET.get("limit", 20))
+    except ValueError:
+        limit = 20
+    items = search_items(request.GET.get("q"), limit)
+    return JsonResponse({"results": [{"id": item.pk, "sku": item.sku, "name": item.name, "quantity": item.quantity} for item in items]})
+
+@login_required
+def export_items(request, fmt):
+    if fmt not in CONTENT_TYPES:
+        raise Http404
+    filter_form = ItemFilterForm(request.GET)
+    items = filter_form.filter(Item.objects.all())
+    return streaming_export(item_export(items, fmt, filter_form.ordering()), fmt, "bestand")
+
+@login_required
+def export_orders(request, fmt):
+    if fmt not in CONTENT_TYPES:
+        raise Http404
+    # Gleiche Filter wie die Bestellübersicht
+    filter_form = OrderFilterForm(request.GET)
+    querysets = [filter_form.filter(Order.objects.all())]
+    if filter_form.with_archive():
+        querysets.append(filter_form.filter(OrderArchive.objects.all()))
+    return streaming_export(order_export(querysets, fmt), fmt, "bestellungen")
@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+
+from .push import get_broker
+
+HEARTBEAT_SECONDS = 15
+
+
+def _event(data, event="stock"):
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def _stream(warehouses):
+    broker = get_broker()
+    subscription = broker.subscribe(warehouses)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                frame = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Kommentarzeile hält Proxys und die Verbindung offen
+                yield ": ping\n\n"
+                continue
+            yield _event(frame)
+    finally:
+        # Auch bei Verbindungsabbruch (CancelledError) abmelden
+        broker.unsubscribe(subscription)
+
+
+@login_required
+async def stock_events(request):
+    """Server-Sent Events mit Bestands- und Zähleränderungen, optional je Lager
+    (``?warehouse=1&warehouse=2``). Benötigt einen ASGI-Server (uvicorn, daphne)."""
+    if not isinstance(request, ASGIRequest):
+        # Unter WSGI würde Django den endlosen Stream komplett puffern;
+        # 204 weist EventSource an, keine neue Verbindung aufzubauen
+        return HttpResponse(status=204)
+    try:
+        warehouses = [int(pk) for pk in request.GET.getlist("warehouse")]
+    except ValueError:
+        warehouses = []
+    response = StreamingHttpResponse(_stream(warehouses), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # nginx soll nicht puffern
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,41 @@
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.db import IntegrityError
+from django.shortcuts import render, redirect
+from . import jobs, replenishment
+from .forms import ReplenishmentFilterForm
+from .pagination import DEFAULT_PAGE_SIZE, paginate_keyset, page_urls
+
+@login_required
+def replenishment_list(request):
+    filter_form = ReplenishmentFilterForm(request.GET)
+    if request.method == "POST":
+        action = request.POST.get("action")
+        ids = [int(value) for value in request.POST.getlist("suggestion") if value.isdigit()]
+        if action == "scan":
+            job = jobs.enqueue("replenishment_scan", user=request.user)
+            messages.success(request, f"Neuberechnung gestartet (Job {job.pk}).")
+        elif action == "confirm":
+            try:
+                messages.success(request, f"{replenishment.confirm(ids)} Bestellungen angelegt.")
+            except IntegrityError:
+                # Gleichzeitig von jemand anderem bestätigt
+                messages.error(request, "Die Vorschläge wurden inzwischen bereits bestellt. Bitte Liste prüfen.")
+        elif action == "dismiss":
+            messages.success(request, f"{replenishment.dismiss(ids)} Vorschläge verworfen.")
+        # Post/Redirect/Get: Neuladen schickt das Formular nicht erneut ab
+        return redirect(request.get_full_path())
+    suggestions = filter_form.filter(replenishment.open_suggestions().select_related("item", "warehouse", "rule"))
+    try:
+        page_size = int(request.GET.get("size", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        page_size = DEFAULT_PAGE_SIZE
+    # Niedrigster Bestand zuerst, Keyset über den Teilindex (status, on_hand, id)
+    page = paginate_keyset(suggestions, ["on_hand", "id"], request.GET.get("cursor"), page_size)
+    return render(request, "replenishment.html", {
+        "suggestions": page,
+        "page": page,
+        "filter_form": filter_form,
+        "title": "Nachschubvorschläge",
+        **page_urls(request, page),
+    })
@@ -1,44 +1,31 @@
-import requests
-from bs4 import BeautifulSoup
+import json
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import render, redirect
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from . import barcodes
+from .article_lookup import aresolve_article_name, resolve_article_name
+from .forms import TouchGoodsReceiptForm
+from .models import Item, Warehouse
+from .stock import book_receipt, book_receipt_batch, MAX_BATCH_LINES
+from .touch_sync import sync_scans, MAX_SYNC_SCANS
+from .views_api import conditional_json, item_etag
 
 @csrf_exempt
-def google_item_info_api(request, sku):
-    bezeichnung = str(sku)
-    try:
-        url = f"https://www.google.com/search?q={sku}"
-        headers = {"User-Agent": "Mozilla/5.0"}
-        resp = requests.get(url, headers=headers, timeout=5)
-        if resp.ok:
-            soup = BeautifulSoup(resp.text, "html.parser")
-            # Suche nach erstem Link zu autodoc.de
-            autodoc_link = None
-            for a in soup.find_all("a", href=True):
-                if "autodoc.de" in a["href"] and a.text.strip():
-                    autodoc_link = a
-                    break
-            if autodoc_link:
-                bezeichnung = autodoc_link.text.strip()
-    except Exception:
-        pass
-    return JsonResponse({"name": bezeichnung})
-
-from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+async def google_item_info_api(request, sku):
+    # Async (unter ASGI): wartet auf die Provider ohne Worker-Thread, gleiche SKUs teilen sich einen Lookup
+    result = await aresolve_article_name(sku)
+    return JsonResponse({"name": result.name or str(sku)})
 
 @login_required
-def item_info_api(request, sku):
-    from .models import Item
-    item = Item.objects.filter(sku=str(sku)).first()
+async def item_info_api(request, sku):
+    match = await sync_to_async(barcodes.resolve)(sku)
+    item = await Item.objects.filter(pk=match.item_id).afirst() if match else None
     if item:
-        data = {"name": item.name}
-    else:
-        data = {"error": "Artikel nicht gefunden"}
-    return JsonResponse(data)
-from django.shortcuts import render, redirect
-from django.contrib.auth.decorators import login_required
-from .forms import TouchGoodsReceiptForm
-from .models import Item
+        return conditional_json(request, {"name": item.name}, item_etag(item), item.updated_at)
+    return JsonResponse({"error": "Artikel nicht gefunden"}, status=404)
 
 @login_required
 def touch_main(request):
@@ -46,102 +33,67 @@ def touch_main(request):
     if request.method == "POST":
         form = TouchGoodsReceiptForm(request.POST)
         if form.is_valid():
-            artikelnummer = form.cleaned_data["item_name"]
+            artikelnummer = form.cleaned_data["item_name"].strip()
             quantity = form.cleaned_data["quantity"]
-            # Prüfe, ob Artikel mit dieser Nummer existiert
-            item = Item.objects.filter(sku=str(artikelnummer)).first()
-            if not item:
-                # Bezeichnung aus Web-API holen
-                import requests
-                from bs4 import BeautifulSoup
-                bezeichnung = str(artikelnummer)
-                try:
-                    url_json = f"https://world.openfoodfacts.org/api/v0/product/{artikelnummer}.json"
-                    resp = requests.get(url_json, timeout=5)
-                    if resp.ok:
-                        data = resp.json()
-                        if 'product' in data and 'product_name' in data['product'] and data['product']['product_name']:
-                            bezeichnung = data['product']['product_name']
-                        else:
-                            # Fallback: HTML-Seite von OpenFoodFacts parsen
-                            url_html = f"https://world.openfoodfacts.org/product/{artikelnummer}"
-                            resp_html = requests.get(url_html, timeout=5)
-                            if resp_html.ok:
-                                soup = BeautifulSoup(resp_html.text, "html.parser")
-                                h2 = soup.find('h2', class_='title-1')
-                                if h2 and h2.text.strip():
-                                    bezeichnung = h2.text.strip()
-                            # Fallback: autodoc.de
-                            url_autodoc = f"https://www.autodoc.de/search?keyword={artikelnummer}"
-                            resp_autodoc = requests.get(url_autodoc, timeout=5)
-                            found_bs = False
-                            if resp_autodoc.ok:
-                                soup = BeautifulSoup(resp_autodoc.text, "html.parser")
-                                for li in soup.find_all("li", class_="product-description__item"):
-                                    title = li.find("span", class_="product-description__item-title")
-                                    value = li.find("span", class_="product-description__item-value")
-                                    if title and value and "Artikelnummer" in title.text:
-                                        bezeichnung = value.text.strip()
-                                        found_bs = True
-                                        break
-                            # Wenn BeautifulSoup nichts findet, versuche Selenium
-                            if not found_bs:
-                                try:
-                                    from selenium import webdriver
-                                    from selenium.webdriver.chrome.options import Options
-                                    from selenium.webdriver.common.by import By
-                                    from webdriver_manager.chrome import ChromeDriverManager
-                                    chrome_options = Options()
-                                    chrome_options.add_argument('--headless')
-                                    chrome_options.add_argument('--no-sandbox')
-                                    chrome_options.add_argument('--disable-dev-shm-usage')
-                                    driver = webdriver.Chrome(ChromeDriverManager().install(), options=chrome_options)
-                                    driver.get(url_autodoc)
-                                    # Warte kurz, bis die Seite geladen ist
-                                    import time
-                                    time.sleep(2)
-                                    # Suche nach Produktbeschreibung
-                                    items = driver.find_elements(By.CLASS_NAME, "product-description__item")
-                                    found_artikelnummer = False
-                                    for item in items:
-                                        try:
-                                            title = item.find_element(By.CLASS_NAME, "product-description__item-title")
-                                            value = item.find_element(By.CLASS_NAME, "product-description__item-value")
-                                            if "Artikelnummer" in title.text:
-                                                bezeichnung = value.text.strip()
-                                                found_artikelnummer = True
-                                                break
-                                        except Exception:
-                                            continue
-                                    # Fallback: Produktname, falls keine Artikelnummer gefunden
-                                    if not found_artikelnummer:
-                                        try:
-                                            # Versuche Produktnamen aus erstem Suchergebnis zu holen
-                                            name_elem = driver.find_element(By.CLASS_NAME, "product-description__name")
-                                            if name_elem and name_elem.text.strip():
-                                                bezeichnung = name_elem.text.strip()
-                                        except Exception:
-                                            try:
-                                                # Alternativ: Linktext des ersten Produktes
-                                                link_elem = driver.find_element(By.CLASS_NAME, "product-link")
-                                                if link_elem and link_elem.text.strip():
-                                                    bezeichnung = link_elem.text.strip()
-                                            except Exception:
-                                                pass
-                                    driver.quit()
-                                except Exception:
-                                    pass
-                except Exception:
-                    pass
-                warehouse = None
-                from .models import Warehouse
+            # SKU, Alias oder Gebindecode (normalisiert, mit Cache)
+            match = barcodes.resolve(artikelnummer)
+            if match is None:
+                # Bezeichnung über Provider-Kette (mit Cache und Zeitbudget) holen
+                bezeichnung = resolve_article_name(artikelnummer).name or artikelnummer
                 warehouse = Warehouse.objects.first()
-                item = Item.objects.create(name=str(artikelnummer), sku=bezeichnung, quantity=0, warehouse=warehouse)
-            item.quantity += quantity
-            item.save()
-            message = f"Wareneingang für {item.name} ({item.sku}) erfolgreich gebucht!"
+                item = Item.objects.create(name=bezeichnung[:100], sku=artikelnummer, quantity=0, warehouse=warehouse)
+                match = barcodes.Match(item.pk, item.sku, item.name)
+            book_receipt(match.item_id, match.quantity(quantity), user=request.user)
+            message = f"Wareneingang für {match.name} ({match.sku}) erfolgreich gebucht!"
+            if match.pack_size != 1:
+                message += f" ({quantity} × {match.pack_size} Stück)"
             form = TouchGoodsReceiptForm()
     else:
         form = TouchGoodsReceiptForm()
     # Artikelnamen für datalist
     return render(request, "goods_receipt_touch.html", {"form": form, "title": "Wareneingang Touch", "message": message, "standalone": True})
+
+
+@login_required
+@require_POST
+def receipt_batch_api(request):
+    # Sammel-Wareneingang für Scanner-Tablets: {"batch_id": "...", "warehouse": id?, "lines": [{"sku": "...", "quantity": 3}, ...]}
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"error": "Ungültiges JSON"}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({"error": "Ungültiges JSON"}, status=400)
+    batch_id = str(payload.get("batch_id") or "").strip()
+    lines = payload.get("lines")
+    if not batch_id or len(batch_id) > 64:
+        return JsonResponse({"error": "batch_id fehlt oder ist zu lang"}, status=400)
+    if not isinstance(lines, list) or not lines or len(lines) > MAX_BATCH_LINES:
+        return JsonResponse({"error": f"lines muss 1 bis {MAX_BATCH_LINES} Positionen enthalten"}, status=400)
+    warehouse = None
+    if payload.get("warehouse"):
+        warehouse = Warehouse.objects.filter(pk=payload["warehouse"]).first()
+        if warehouse is None:
+            return JsonResponse({"error": "Lager nicht gefunden"}, status=400)
+    return JsonResponse(book_receipt_batch(batch_id, lines, user=request.user, warehouse=warehouse))
+
+
+@login_required
+@require_POST
+def touch_sync_api(request):
+    # Offline-Warteschlange der Touch-App: {"device_id": "...", "scans": [{"id": uuid, "sku": "...", "quantity": 1, "scanned_at": iso}, ...]}
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"error": "Ungültiges JSON"}, status=400)
+    scans = payload.get("scans") if isinstance(payload, dict) else None
+    if not isinstance(scans, list) or len(scans) > MAX_SYNC_SCANS:
+        return JsonResponse({"error": f"scans muss bis zu {MAX_SYNC_SCANS} Einträge enthalten"}, status=400)
+    return JsonResponse(sync_scans(scans, device_id=str(payload.get("device_id") or ""), user=request.user))
+
+
+def touch_service_worker(request):
+    # Unter /touch/ ausgeliefert, damit der Service Worker die Touch-App kontrollieren darf
+    response = render(request, "touch_sw.js", content_type="application/javascript")
+    response["Cache-Control"] = "no-cache"
+    return response
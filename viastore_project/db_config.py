@@ -0,0 +1,81 @@
+"""
+Datenbank-Profile für viastore_project, gesteuert über Umgebungsvariablen.
+
+VIASTORE_DB_PROFILE:
+    sqlite        (Standard) SQLite mit WAL, busy_timeout, synchronous=NORMAL und
+                  IMMEDIATE-Transaktionen, damit parallele Buchungen von mehreren
+                  Tablets warten statt mit "database is locked" abzubrechen.
+    sqlite-basic  SQLite mit Django-Standardeinstellungen (zum Vergleich).
+    postgres      PostgreSQL mit persistenten Verbindungen oder Connection-Pool
+                  (VIASTORE_DB_POOL=1, benötigt psycopg[pool]).
+"""
+
+import os
+
+PROFILES = ("sqlite", "sqlite-basic", "postgres")
+
+
+def _int(env, name, default):
+    return int(env.get(name, default))
+
+
+def sqlite_config(base_dir, env, tuned=True):
+    config = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": env.get("VIASTORE_DB_NAME", base_dir / "db.sqlite3"),
+        # Datei statt In-Memory, damit Tests mit parallelen Schreibern echte Sperren sehen
+        "TEST": {"NAME": base_dir / "test_db.sqlite3"},
+    }
+    if tuned:
+        busy_ms = _int(env, "VIASTORE_DB_BUSY_TIMEOUT_MS", 20000)
+        config["OPTIONS"] = {
+            "timeout": busy_ms / 1000,
+            # Schreibsperre schon bei BEGIN holen: kein Deadlock-Abbruch beim Upgrade Lese- -> Schreibsperre
+            "transaction_mode": "IMMEDIATE",
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                f"PRAGMA busy_timeout={busy_ms};"
+                "PRAGMA temp_store=MEMORY;"
+                "PRAGMA cache_size=-20000;"
+            ),
+        }
+    return config
+
+
+def postgres_config(env):
+    config = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": env.get("VIASTORE_DB_NAME", "viastore"),
+        "USER": env.get("VIASTORE_DB_USER", "viastore"),
+        "PASSWORD": env.get("VIASTORE_DB_PASSWORD", ""),
+        "HOST": env.get("VIASTORE_DB_HOST", "localhost"),
+        "PORT": env.get("VIASTORE_DB_PORT", "5432"),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
+    }
+    if env.get("VIASTORE_DB_POOL") == "1":
+        # Connection-Pool (psycopg_pool) schließt persistente Verbindungen (CONN_MAX_AGE) aus
+        config["CONN_MAX_AGE"] = 0
+        config["OPTIONS"]["pool"] = {
+            "min_size": _int(env, "VIASTORE_DB_POOL_MIN", 2),
+            "max_size": _int(env, "VIASTORE_DB_POOL_MAX", 20),
+            "timeout": _int(env, "VIASTORE_DB_POOL_TIMEOUT", 10),
+        }
+    else:
+        config["CONN_MAX_AGE"] = _int(env, "VIASTORE_DB_CONN_MAX_AGE", 600)
+    return config
+
+
+def database_config(base_dir, env=None):
+    env = os.environ if env is None else env
+    profile = env.get("VIASTORE_DB_PROFILE", "sqlite")
+    if profile == "sqlite":
+        default = sqlite_config(base_dir, env)
+    elif profile == "sqlite-basic":
+        default = sqlite_config(base_dir, env, tuned=False)
+    elif profile == "postgres":
+        default = postgres_config(env)
+    else:
+        raise ValueError(f"Unbekanntes VIASTORE_DB_PROFILE {profile!r}, erlaubt: {', '.join(PROFILES)}")
+    return profile, {"default": default}
@@ -12,8 +12,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .db_config import database_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,6 +46,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Statische Dateien vor allem anderen: keine Session, keine Messung je Datei
+    "viastore_app.assets.StaticFilesMiddleware",
+    # Zuerst, damit die Messung alle weiteren Middlewares einschließt
+    "viastore_app.middleware.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -56,7 +63,8 @@ ROOT_URLCONF = "viastore_project.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates mit Renderzeit-Messung für /metrics
+        "BACKEND": "viastore_app.metrics.InstrumentedDjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -75,12 +83,8 @@ WSGI_APPLICATION = "viastore_project.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
-}
+# Profil über VIASTORE_DB_PROFILE (sqlite | sqlite-basic | postgres), siehe db_config.py
+VIASTORE_DB_PROFILE, DATABASES = database_config(BASE_DIR)
 
 
 # Password validation
@@ -118,6 +122,51 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = "static/"
+# Ziel von collectstatic; Bootstrap, Font Awesome, Chart.js und html5-qrcode
+# liegen unter viastore_app/static/viastore_app/vendor/ (keine CDN-Zugriffe)
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    # Hash-Namen plus .gz/.br-Varianten (viastore_app.assets)
+    "staticfiles": {"BACKEND": "viastore_app.assets.CompressedManifestStaticFilesStorage"},
+}
+
+# Hochgeladene Dateien (z.B. Excel-Importe für den Hintergrund-Worker)
+MEDIA_URL = "media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
+# Hintergrund-Jobs ohne Worker direkt im Request ausführen (nur für Tests/Entwicklung)
+VIASTORE_JOBS_EAGER = False
+
+# Externe Artikelbezeichnungs-Suche (viastore_app.article_lookup)
+VIASTORE_LOOKUP_PROVIDERS = [
+    "viastore_app.article_lookup.OpenFoodFactsJsonProvider",
+    "viastore_app.article_lookup.OpenFoodFactsHtmlProvider",
+    "viastore_app.article_lookup.AutodocProvider",
+    "viastore_app.article_lookup.GoogleAutodocProvider",
+]
+# Gesamtbudget pro Lookup in Sekunden, alle Provider laufen parallel
+VIASTORE_LOOKUP_DEADLINE = 3.0
+VIASTORE_LOOKUP_CACHE_SIZE = 50000
+
+# Delta-Feed /api/bestand/aenderungen/: Überlappung je Abruf in Sekunden, muss
+# länger sein als die längste Buchungstransaktion (Zeitstempel vom Transaktionsbeginn)
+VIASTORE_FEED_OVERLAP_SECONDS = 60
+
+# Scan-Auflösung Barcode -> Artikel (viastore_app.barcodes), LRU-Cache je Prozess;
+# die TTL begrenzt veraltete Einträge in anderen Worker-Prozessen (Sekunden)
+VIASTORE_BARCODE_CACHE_SIZE = 50000
+VIASTORE_BARCODE_CACHE_TTL = 60
+
+# Performance-Metriken (/metrics im Prometheus-Format, viastore_app.middleware)
+VIASTORE_SLOW_QUERY_MS = 200
+VIASTORE_NPLUSONE_THRESHOLD = 10
+# Anteil der Requests, deren SQL-Vorlagen auf N+1-Muster geprüft werden
+VIASTORE_METRICS_SAMPLE_RATE = 0.1
+# Scraper authentifizieren sich mit "Authorization: Bearer <token>"; ohne Token
+# ist /metrics nur für angemeldete Staff-Benutzer erreichbar
+VIASTORE_METRICS_TOKEN = os.environ.get("VIASTORE_METRICS_TOKEN", "")
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field